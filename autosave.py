@@ -0,0 +1,76 @@
+# autosave.py
+#
+# Salvamento automático em segundo plano. A thread do jogo só tira um snapshot raso do
+# jogador (save_manager.snapshot_player, cópia de listas/dicionários); a conversão para o
+# formato do save, a codificação, a escrita atômica e a atualização do índice rodam numa
+# thread dedicada, então um save nunca aparece como pico no tempo de quadro.
+# Pedidos feitos enquanto um save está pendente são agrupados: só o estado mais recente é gravado.
+
+import threading
+import time
+
+import save_manager
+from rpg_model import Jogador
+
+class AutosaveService:
+    """
+    Serviço de autosave com uma thread escritora.
+    `request(jogador, motivo)` é barato e pode ser chamado a qualquer momento (timer, level-up,
+    inimigo derrotado); `flush()` espera o save pendente terminar e `close()` encerra a thread.
+    """
+    def __init__(self, compactar: bool = False):
+        self.compactar = compactar
+        self._condicao = threading.Condition()
+        self._pendente: tuple[dict, str] | None = None # (snapshot, motivo) mais recente ainda não gravado
+        self._gravando = False; self._encerrar = False
+        self.salvos = 0; self.agrupados = 0
+        self.ultimo_motivo: str | None = None; self.ultimo_erro: Exception | None = None
+        self.ultimo_tempo_ms = 0.0 # Duração do último save na thread escritora
+        self._thread = threading.Thread(target=self._executar, name="autosave", daemon=True)
+        self._thread.start()
+
+    def request(self, jogador: Jogador, motivo: str = "intervalo"):
+        """Agenda um save do estado atual de `jogador` (substitui um pedido ainda não gravado)."""
+        save_manager.assign_save_id(jogador)
+        snapshot = save_manager.snapshot_player(jogador)
+        with self._condicao:
+            if self._encerrar: return
+            if self._pendente is not None: self.agrupados += 1
+            self._pendente = (snapshot, motivo)
+            self._condicao.notify()
+
+    @property
+    def ocupado(self) -> bool:
+        with self._condicao: return self._pendente is not None or self._gravando
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Espera até não haver save pendente nem em andamento. Retorna False se o tempo acabar."""
+        with self._condicao:
+            return self._condicao.wait_for(lambda: self._pendente is None and not self._gravando, timeout)
+
+    def close(self, timeout: float | None = 10.0):
+        """Grava o que estiver pendente e encerra a thread escritora."""
+        with self._condicao:
+            self._encerrar = True; self._condicao.notify_all()
+        self._thread.join(timeout)
+
+    def _executar(self):
+        while True:
+            with self._condicao:
+                self._condicao.wait_for(lambda: self._pendente is not None or self._encerrar)
+                if self._pendente is None: return # Encerrando sem nada pendente
+                snapshot, motivo = self._pendente
+                self._pendente = None; self._gravando = True
+            inicio = time.perf_counter()
+            try:
+                save_manager.write_state(save_manager.finalize_state(snapshot), self.compactar)
+                erro = None
+            except Exception as e:
+                erro = e
+                print(f"Erro no autosave ({motivo}): {e}")
+            with self._condicao:
+                self._gravando = False
+                self.ultimo_tempo_ms = (time.perf_counter() - inicio) * 1000
+                self.ultimo_motivo = motivo; self.ultimo_erro = erro
+                if erro is None: self.salvos += 1
+                self._condicao.notify_all()
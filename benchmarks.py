@@ -0,0 +1,724 @@
+# benchmarks.py
+#
+# Medições de desempenho dos subsistemas do jogo.
+# Uso: python benchmarks.py [nome ...]   (sem argumentos roda todos)
+
+import os
+import sys
+import time
+import json
+import shutil
+import random
+import sqlite3
+import tempfile
+import tracemalloc
+
+import dice
+import db_manager
+import populate_database
+from rpg_model import NPC, NPCPool
+
+def _medir(func, repeticoes: int) -> float:
+    """Executa `func` `repeticoes` vezes e retorna chamadas por segundo."""
+    inicio = time.perf_counter()
+    for _ in range(repeticoes): func()
+    duracao = time.perf_counter() - inicio
+    return repeticoes / duracao if duracao > 0 else float("inf")
+
+def _imprimir(titulo: str, resultados: dict[str, float], unidade: str = "chamadas/s"):
+    print(f"\n== {titulo} ==")
+    for nome, valor in resultados.items():
+        print(f"  {nome:<40} {valor:>16,.3f} {unidade}")
+
+# --- Banco de dados: conexão por chamada vs. pool ---
+
+def _class_template_sem_pool(class_name: str) -> dict | None:
+    """Versão antiga de get_class_template: abre e fecha o banco a cada chamada."""
+    conn = sqlite3.connect(db_manager.DB_FILE)
+    try:
+        conn.row_factory = sqlite3.Row
+        row = conn.execute(db_manager.SQL_CLASS_TEMPLATE, (class_name.lower(),)).fetchone()
+        return dict(row) if row else None
+    finally:
+        conn.close()
+
+def _weapons_sem_pool() -> list:
+    conn = sqlite3.connect(db_manager.DB_FILE)
+    try:
+        conn.row_factory = sqlite3.Row
+        return [dict(r) for r in conn.execute(db_manager.SQL_ALL_WEAPONS).fetchall()]
+    finally:
+        conn.close()
+
+def _weapons_com_pool() -> list:
+    with db_manager.get_connection() as conn:
+        return [dict(r) for r in conn.execute(db_manager.SQL_ALL_WEAPONS).fetchall()]
+
+def bench_db(repeticoes: int = 5000):
+    db_manager.get_class_template("Guerreiro") # A primeira conexão do pool garante a tabela PersonagemSalvo
+    resultados = {
+        "get_class_template (conexão por chamada)": _medir(lambda: _class_template_sem_pool("Guerreiro"), repeticoes),
+        "get_class_template (pool)": _medir(lambda: db_manager.get_class_template("Guerreiro"), repeticoes),
+        "armas (conexão por chamada)": _medir(_weapons_sem_pool, repeticoes),
+        "armas (pool)": _medir(_weapons_com_pool, repeticoes),
+    }
+    _imprimir(f"db_manager ({repeticoes} chamadas)", resultados)
+
+# --- Catálogo: reconstrução a cada tela vs. cache em memória ---
+
+def _weapons_sem_cache() -> list:
+    with db_manager.get_connection() as conn:
+        return [db_manager._arma_from_row(r) for r in conn.execute(db_manager.SQL_ALL_WEAPONS).fetchall()]
+
+def bench_catalog(repeticoes: int = 20000):
+    db_manager.catalog.invalidate()
+    resultados = {
+        "armas (consulta + objetos a cada chamada)": _medir(_weapons_sem_cache, repeticoes),
+        "get_all_weapons (Catalog)": _medir(db_manager.get_all_weapons, repeticoes),
+        "catalog.get_by_name": _medir(lambda: db_manager.catalog.get_by_name("weapon", "Arco Curto"), repeticoes),
+    }
+    _imprimir(f"Catálogo ({repeticoes} chamadas)", resultados)
+
+# --- Sorteio de inimigos: ORDER BY RANDOM() vs. índice pré-computado ---
+
+SQL_RANDOM_ENEMY_ANTIGO = "SELECT * FROM Personagem p JOIN NPC n ON p.id = n.personagem_id WHERE n.tipo_npc = 'Monstro' ORDER BY RANDOM() LIMIT 1"
+
+def _usar_banco(db_file: str):
+    """Aponta o pool e o catálogo padrão do db_manager para outro arquivo."""
+    db_manager.close_connections()
+    db_manager._pool = db_manager.ConnectionPool(db_file)
+    db_manager.catalog = db_manager.Catalog(db_manager._pool)
+
+def _banco_com_monstros(pasta: str, quantidade: int) -> str:
+    """Copia o banco do jogo e acrescenta `quantidade` monstros de níveis 1 a 20."""
+    destino = os.path.join(pasta, f"monstros_{quantidade}.db")
+    shutil.copyfile(db_manager.DB_FILE, destino)
+    conn = sqlite3.connect(destino)
+    with conn:
+        base = conn.execute("SELECT MAX(id) FROM Personagem").fetchone()[0] or 0
+        atributos = json.dumps({"Força": 10, "Destreza": 10})
+        conn.executemany(
+            "INSERT INTO Personagem (id, nome, raca, classe_personagem, nivel, pontos_vida_maximos, pontos_vida_atuais, "
+            "pontos_mana_maximos, pontos_mana_atuais, atributos, proficiencias, tipo_personagem) VALUES (?,?,?,?,?,?,?,?,?,?,?,'NPC')",
+            [(base + i, f"Monstro {i}", "Goblin", "Ladino", 1 + i % 20, 7, 7, 0, 0, atributos, "[]") for i in range(1, quantidade + 1)])
+        conn.executemany("INSERT INTO NPC (personagem_id, tipo_npc, comportamento, dialogo) VALUES (?, 'Monstro', 'Agressivo', NULL)",
+                         [(base + i,) for i in range(1, quantidade + 1)])
+    conn.close()
+    return destino
+
+def bench_enemies(repeticoes: int = 200):
+    banco_original = db_manager.DB_FILE
+    with tempfile.TemporaryDirectory() as pasta:
+        for quantidade in (10, 1000, 100000):
+            _usar_banco(_banco_com_monstros(pasta, quantidade))
+            db_manager.get_random_enemy() # aquece o índice de monstros
+            def antigo():
+                with db_manager.get_connection() as conn: conn.execute(SQL_RANDOM_ENEMY_ANTIGO).fetchone()
+            resultados = {
+                "ORDER BY RANDOM() LIMIT 1": _medir(antigo, repeticoes),
+                "get_random_enemy": _medir(db_manager.get_random_enemy, repeticoes),
+                "get_random_enemy (níveis 5-8)": _medir(lambda: db_manager.get_random_enemy((5, 8)), repeticoes),
+                "get_random_enemies(20) (ondas/s)": _medir(lambda: db_manager.get_random_enemies(20), repeticoes),
+            }
+            _imprimir(f"Inimigos aleatórios ({quantidade} monstros)", resultados)
+        _usar_banco(banco_original)
+
+# --- Pragmas e índices: configuração padrão do SQLite vs. db_manager.PRAGMAS e migrações ---
+
+def bench_sqlite(transacoes: int = 300, repeticoes: int = 50):
+    import migrations
+    with tempfile.TemporaryDirectory() as pasta:
+        resultados = {}
+        # Escritas pequenas e frequentes (como o autosave/repositório): um commit por transação
+        for nome, pragmas in (("journal DELETE, synchronous FULL (padrão)", ("journal_mode = DELETE", "synchronous = FULL")),
+                              ("db_manager.PRAGMAS (WAL, NORMAL, mmap)", db_manager.PRAGMAS)):
+            destino = os.path.join(pasta, f"pragmas_{len(resultados)}.db"); shutil.copyfile(db_manager.DB_FILE, destino)
+            conn = sqlite3.connect(destino)
+            for pragma in pragmas: conn.execute(f"PRAGMA {pragma}")
+            inicio = time.perf_counter()
+            for i in range(transacoes):
+                conn.execute("UPDATE Personagem SET pontos_vida_atuais = ? WHERE id = 1", (i,)); conn.commit()
+            resultados[f"{nome}: commit"] = (time.perf_counter() - inicio) / transacoes * 1000
+            conn.close()
+        # Consultas de filtro/JOIN numa tabela grande, com e sem os índices da migração 4
+        conn = sqlite3.connect(_banco_com_monstros(pasta, 100000))
+        migrations.migrar(conn)
+        consultas = {"índice de monstros": (db_manager.SQL_MONSTER_INDEX, ()),
+                     "modelo de classe": (db_manager.SQL_CLASS_TEMPLATE, ("guerreiro",)),
+                     "modelo de classe inexistente": (db_manager.SQL_CLASS_TEMPLATE, ("paladino",))}
+        for rotulo, (sql, params) in consultas.items():
+            resultados[f"{rotulo} (com índices)"] = 1000 / _medir(lambda: conn.execute(sql, params).fetchall(), repeticoes)
+        for indice in ("idx_npc_tipo", "idx_personagem_tipo_classe", "idx_item_tipo"): conn.execute(f"DROP INDEX {indice}")
+        for rotulo, (sql, params) in consultas.items():
+            resultados[f"{rotulo} (sem índices)"] = 1000 / _medir(lambda: conn.execute(sql, params).fetchall(), repeticoes)
+        conn.close()
+    _imprimir(f"SQLite: {transacoes} commits pequenos e consultas com 100000 monstros", resultados, unidade="ms")
+
+# --- Carga do catálogo: commit por linha vs. importação em lote ---
+
+def _armas_geradas(quantidade: int) -> list[dict]:
+    return [{"nome": f"Arma {i}", "descricao": "Gerada para benchmark.", "peso": 1.0, "valor_moedas": i % 100,
+             "tipo_dano": "Cortante", "dado_dano": "1d8", "propriedades": ["Leve"], "alcance": "Corpo a corpo"}
+            for i in range(quantidade)]
+
+def _carga_por_linha(db_file: str, armas: list[dict]):
+    """Padrão antigo do populate_database: um INSERT e um commit por linha."""
+    conn = sqlite3.connect(db_file)
+    for a in armas:
+        cur = conn.cursor()
+        cur.execute("INSERT INTO Item(nome, descricao, peso, valor_moedas, tipo_item) VALUES(?,?,?,?,?)",
+                    (a["nome"], a["descricao"], a["peso"], a["valor_moedas"], "Arma")); conn.commit()
+        cur.execute("INSERT INTO Arma(item_id, tipo_dano, dado_dano, propriedades, alcance) VALUES(?,?,?,?,?)",
+                    (cur.lastrowid, a["tipo_dano"], a["dado_dano"], json.dumps(a["propriedades"]), a["alcance"])); conn.commit()
+    conn.close()
+
+def _carga_em_lote(db_file: str, pasta: str):
+    conn = sqlite3.connect(db_file)
+    populate_database.importar_catalogo(conn, pasta)
+    conn.close()
+
+def bench_populate(quantidade: int = 2000):
+    with tempfile.TemporaryDirectory() as pasta:
+        armas = _armas_geradas(quantidade)
+        with open(os.path.join(pasta, "armas.json"), 'w', encoding='utf-8') as f: json.dump(armas, f)
+        resultados = {}
+        for nome, carga in (("commit por linha", lambda db: _carga_por_linha(db, armas)),
+                            ("importar_catalogo (1ª carga)", lambda db: _carga_em_lote(db, pasta))):
+            destino = os.path.join(pasta, "carga.db"); shutil.copyfile(db_manager.DB_FILE, destino)
+            inicio = time.perf_counter(); carga(destino); resultados[nome] = time.perf_counter() - inicio
+            if nome.startswith("importar"):
+                inicio = time.perf_counter(); carga(destino); resultados["importar_catalogo (reexecução/upsert)"] = time.perf_counter() - inicio
+            os.remove(destino)
+        _imprimir(f"Carga de {quantidade} armas", resultados, unidade="s")
+
+# --- Dados: parse a cada rolagem vs. expressão compilada vs. lote ---
+
+def _dano_antigo(dado_dano: str) -> int:
+    """Versão antiga de Arma.calcular_dano_rolagem."""
+    try:
+        num_dados, tipo_dado = map(int, dado_dano.lower().split('d'))
+        return sum(random.randint(1, tipo_dado) for _ in range(num_dados))
+    except: return 1
+
+def bench_dice(quantidade: int = 1_000_000):
+    resultados = {}
+    inicio = time.perf_counter()
+    for _ in range(quantidade): _dano_antigo("2d6")
+    resultados["split + randint (antigo)"] = quantidade / (time.perf_counter() - inicio)
+    expressao = dice.compilar("2d6")
+    inicio = time.perf_counter()
+    for _ in range(quantidade): expressao.rolar()
+    resultados["compilar('2d6').rolar()"] = quantidade / (time.perf_counter() - inicio)
+    inicio = time.perf_counter()
+    dice.compilar("2d6").rolar_lote(quantidade)
+    resultados[f"rolar_lote ({'NumPy' if dice.np is not None else 'Python puro'})"] = quantidade / (time.perf_counter() - inicio)
+    _imprimir(f"Rolagens de 2d6 ({quantidade:,})", resultados, unidade="rolagens/s")
+
+# --- Memória por NPC: objeto com __dict__ vs. __slots__ vs. NPCPool ---
+
+class _NPCComDict:
+    """Réplica do layout antigo (sem __slots__) usada só como referência de memória."""
+    def __init__(self, id_entidade, nome, raca, classe_personagem, nivel, pontos_vida_maximos, atributos,
+                 proficiencias, tipo, comportamento, dialogo=None, pontos_mana_maximos=0):
+        self.id = id_entidade; self.nome = nome
+        self.raca = raca; self.classe_personagem = classe_personagem; self.nivel = nivel
+        self.pontos_vida_maximos = pontos_vida_maximos; self.pontos_vida_atuais = pontos_vida_maximos
+        self.pontos_mana_maximos = pontos_mana_maximos; self.pontos_mana_atuais = pontos_mana_maximos
+        self.atributos = atributos; self.proficiencias = proficiencias
+        self.inventario = []; self.magias = []
+        self.equipamento = {"Arma": None, "Armadura": None}
+        self.classe_armadura = 10
+        self.tipo = tipo; self.comportamento = comportamento; self.dialogo = dialogo
+
+def _bytes_por_item(criar, quantidade: int) -> float:
+    tracemalloc.start()
+    antes = tracemalloc.get_traced_memory()[0]
+    objetos = criar(quantidade)
+    depois = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del objetos
+    return (depois - antes) / quantidade
+
+def bench_memory(quantidade: int = 10000):
+    atributos = {"Força": 8, "Destreza": 14, "Constituição": 10, "Inteligência": 10, "Sabedoria": 8, "Carisma": 8}
+    args = ("Snaga", "Goblin", "Ladino", 1, 7)
+    def com_dict(n): return [_NPCComDict(i, *args, dict(atributos), ["Furtividade"], "Monstro", "Agressivo") for i in range(n)]
+    def com_slots(n): return [NPC(i, *args, dict(atributos), ["Furtividade"], "Monstro", "Agressivo") for i in range(n)]
+    modelo = NPC(0, *args, atributos, ["Furtividade"], "Monstro", "Agressivo")
+    def no_pool(n):
+        pool = NPCPool()
+        return pool, [pool.adicionar(modelo) for _ in range(n)]
+    resultados = {
+        "objeto com __dict__ (layout antigo)": _bytes_por_item(com_dict, quantidade),
+        "NPC com __slots__": _bytes_por_item(com_slots, quantidade),
+        "NPCPool (arrays + NPCDoPool)": _bytes_por_item(no_pool, quantidade),
+    }
+    _imprimir(f"Memória por NPC ({quantidade} NPCs)", resultados, unidade="bytes/NPC")
+
+# --- Colisão: groupcollide vs. grade espacial ---
+
+def bench_collision(projeteis: int = 2000, inimigos: int = 300, quadros: int = 60):
+    import pygame # Só este benchmark precisa do pygame
+    from spatial_hash import SpatialHash
+    rng = random.Random(42)
+    def sprite(tamanho):
+        s = pygame.sprite.Sprite()
+        s.rect = pygame.Rect(rng.randrange(0, 800), rng.randrange(0, 600), tamanho, tamanho)
+        return s
+    grupo_inimigos = pygame.sprite.Group(sprite(40) for _ in range(inimigos))
+    grupo_projeteis = pygame.sprite.Group(sprite(10) for _ in range(projeteis))
+    grade = SpatialHash(64)
+    for inimigo in grupo_inimigos: grade.inserir(inimigo)
+    resultados = {}
+    inicio = time.perf_counter()
+    for _ in range(quadros): pygame.sprite.groupcollide(grupo_projeteis, grupo_inimigos, False, False)
+    resultados["pygame.sprite.groupcollide"] = (time.perf_counter() - inicio) / quadros * 1000
+    inicio = time.perf_counter()
+    for _ in range(quadros):
+        grade.atualizar_todos(grupo_inimigos)
+        for projetil in grupo_projeteis: grade.colisoes(projetil.rect)
+    resultados["SpatialHash (atualizar + consultar)"] = (time.perf_counter() - inicio) / quadros * 1000
+    _imprimir(f"Colisão por quadro ({projeteis} projéteis × {inimigos} inimigos)", resultados, unidade="ms/quadro")
+
+# --- Projéteis: alocação a cada magia vs. ProjectilePool ---
+
+def bench_projectiles(magias: int = 20000):
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import pygame
+    pygame.display.init(); pygame.display.set_mode((1, 1))
+    import main_pygame
+    grupo = pygame.sprite.Group()
+    def sem_pool():
+        for direcao in main_pygame.SPELL_DIRECTIONS:
+            projetil = main_pygame.ProjectileSprite((400, 300), pygame.math.Vector2(direcao), 5, color=main_pygame.BLUE)
+            projetil.image = pygame.Surface((10, 10)); projetil.image.fill(main_pygame.BLUE) # como era antes do cache
+            grupo.add(projetil); projetil.kill()
+    pool = main_pygame.ProjectilePool()
+    def com_pool():
+        for direcao in main_pygame.SPELL_DIRECTIONS:
+            pool.obter((400, 300), direcao, 5, color=main_pygame.BLUE, groups=(grupo,)).kill()
+    resultados = {
+        "objeto + Surface novos (antigo)": _medir(sem_pool, magias),
+        "ProjectilePool + get_surface": _medir(com_pool, magias),
+    }
+    pygame.display.quit()
+    _imprimir(f"Magia de 4 projéteis ({magias} conjurações)", resultados, unidade="magias/s")
+
+# --- IA dos inimigos: laço em Python vs. EnemySwarm vetorizado ---
+
+def bench_swarm(tamanhos: tuple[int, ...] = (100, 500, 1000), passos: int = 60):
+    import pygame
+    import enemy_ai
+    from spatial_hash import SpatialHash
+    def medir(n: int, com_numpy: bool, passos: int) -> float:
+        np_original = enemy_ai.np
+        if not com_numpy: enemy_ai.np = None
+        try:
+            rng = random.Random(42)
+            enxame = enemy_ai.EnemySwarm(60, 3000, 50, 40, 44, SpatialHash(64))
+            for _ in range(n):
+                s = pygame.sprite.Sprite(); s.rect = pygame.Rect(0, 0, 40, 40)
+                s.rect.center = (rng.randrange(400, 800), rng.randrange(0, 600)); enxame.adicionar(s)
+            inicio = time.perf_counter()
+            for _ in range(passos): enxame.step(1 / 60, (200, 300))
+            return (time.perf_counter() - inicio) / passos * 1000
+        finally:
+            enemy_ai.np = np_original
+    resultados = {}
+    for n in tamanhos:
+        if enemy_ai.np is not None: resultados[f"{n} inimigos (NumPy)"] = medir(n, True, passos)
+        resultados[f"{n} inimigos (Python puro)"] = medir(n, False, max(1, passos // 10))
+    _imprimir("Passo da IA dos inimigos (perseguir + separar + atacar)", resultados, unidade="ms/passo")
+
+# --- Campo de fluxo: recálculo por tamanho de grade e leitura por inimigo ---
+
+def bench_flowfield(repeticoes: int = 20, inimigos: int = 500):
+    import flow_field
+    rng = random.Random(42)
+    resultados = {}
+    for tamanho_celula in (64, 32, 16, 8):
+        campo = flow_field.FlowField(800, 600, tamanho_celula)
+        # Uma parede vertical com uma passagem, para o caminho não ser só uma linha reta
+        campo.bloquear({(campo.colunas // 2, y) for y in range(campo.linhas - 2)})
+        alvos = [(rng.randrange(0, 800), rng.randrange(0, 600)) for _ in range(repeticoes)]
+        inicio = time.perf_counter()
+        for alvo in alvos: campo.origem = None; campo.atualizar(alvo)
+        resultados[f"recálculo {campo.colunas}x{campo.linhas} células ({tamanho_celula}px)"] = (time.perf_counter() - inicio) / repeticoes * 1000
+    posicoes = [(rng.uniform(0, 800), rng.uniform(0, 600)) for _ in range(inimigos)]
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        for x, y in posicoes: campo.direcao(x, y)
+    resultados[f"{inimigos} leituras com direcao()"] = (time.perf_counter() - inicio) / repeticoes * 1000
+    if flow_field.np is not None:
+        pos = flow_field.np.array(posicoes)
+        inicio = time.perf_counter()
+        for _ in range(repeticoes): campo.direcoes_em(pos)
+        resultados[f"{inimigos} leituras com direcoes_em() (NumPy)"] = (time.perf_counter() - inicio) / repeticoes * 1000
+    _imprimir("Campo de fluxo (tela 800x600)", resultados, unidade="ms")
+
+# --- Estatísticas derivadas: cache com invalidação vs. recálculo a cada ataque ---
+
+def bench_stats(repeticoes: int = 200_000):
+    jogador = db_manager.create_player_from_template(db_manager.get_class_template("Guerreiro"), "Bench")
+    armas, armaduras = db_manager.get_all_weapons(), db_manager.get_all_armors()
+    if armas: jogador.usar_item(armas[0])
+    if armaduras: jogador.usar_item(armaduras[0])
+    alvo = db_manager.get_random_enemy()
+    if alvo is None: print("\nbench_stats: nenhum monstro no banco"); return
+    alvo.pontos_vida_maximos = alvo.pontos_vida_atuais = 10**9
+    def recalculando():
+        jogador.invalidar_estatisticas(); alvo.invalidar_estatisticas(); jogador.atacar(alvo)
+    resultados = {
+        "atacar (recalculando CA e bônus)": _medir(recalculando, repeticoes),
+        "atacar (estatísticas em cache)": _medir(lambda: jogador.atacar(alvo), repeticoes),
+    }
+    _imprimir(f"Personagem.atacar ({repeticoes} ataques)", resultados)
+
+# --- Inventário: lista com busca linear vs. ColecaoPorId ---
+
+def bench_inventory(itens: int = 2000, repeticoes: int = 2000):
+    from rpg_model import Arma, ColecaoPorId
+    catalogo = [Arma(i, f"Arma {i}", "", 1.0, 1, "Cortante", "1d6", [], "Corpo a corpo").congelar() for i in range(itens)]
+    lista, colecao = list(catalogo), ColecaoPorId(catalogo)
+    procurados = [catalogo[random.randrange(itens)] for _ in range(repeticoes)]
+    iterador_lista, iterador_colecao = iter(procurados * 2), iter(procurados * 2)
+    resultados = {
+        "item in list (busca linear)": _medir(lambda: next(iterador_lista) in lista, repeticoes),
+        "item in ColecaoPorId": _medir(lambda: next(iterador_colecao) in colecao, repeticoes),
+    }
+    _imprimir(f"Pertinência num inventário com {itens} itens distintos", resultados)
+
+# --- Saves: JSON indentado gravado no lugar vs. formato v2 atômico (JSON compacto / gzip) ---
+
+def _item_por_extenso(item) -> dict:
+    """Item serializado com todos os campos, como o JSON antigo faria para guardar o inventário."""
+    campos = [c for classe in type(item).__mro__ for c in getattr(classe, "__slots__", ())]
+    return {campo: getattr(item, campo) for campo in campos}
+
+def bench_save(itens: int = 5000, repeticoes: int = 20):
+    import save_manager
+    jogador = db_manager.create_player_from_template(db_manager.get_class_template("Guerreiro"), "Bench")
+    catalogo = db_manager.get_all_weapons() + db_manager.get_all_armors()
+    jogador.inventario = [catalogo[i % len(catalogo)] for i in range(itens)]
+    with tempfile.TemporaryDirectory() as pasta:
+        antigo = os.path.join(pasta, "antigo.json")
+        def salvar_antigo():
+            estado = save_manager.player_to_state(jogador)
+            estado["inventario"] = [_item_por_extenso(item) for item in jogador.inventario]
+            with open(antigo, "w", encoding="utf-8") as f: json.dump(estado, f, indent=4, ensure_ascii=False)
+        def carregar_antigo():
+            with open(antigo, "r", encoding="utf-8") as f: json.load(f)
+        resultados, tamanhos = {}, {}
+        resultados["salvar: JSON indentado no lugar (antigo)"] = 1000 / _medir(salvar_antigo, repeticoes)
+        resultados["carregar: JSON indentado (antigo)"] = 1000 / _medir(carregar_antigo, repeticoes)
+        tamanhos["JSON indentado (antigo)"] = os.path.getsize(antigo)
+        for compactar, nome in ((False, "v2 JSON compacto"), (True, "v2 gzip")):
+            caminho = os.path.join(pasta, "save" + (save_manager.EXTENSAO_GZIP if compactar else save_manager.EXTENSAO_JSON))
+            salvar = lambda: save_manager.write_atomic(caminho, save_manager.encode_state(save_manager.player_to_state(jogador), compactar))
+            resultados[f"salvar: {nome} atômico"] = 1000 / _medir(salvar, repeticoes)
+            resultados[f"carregar: {nome}"] = 1000 / _medir(lambda: save_manager.state_to_player(save_manager.read_save(caminho)), repeticoes)
+            tamanhos[nome] = os.path.getsize(caminho)
+    _imprimir(f"Save com {itens} itens no inventário", resultados, unidade="ms")
+    _imprimir("Tamanho do arquivo", {nome: tamanho / 1024 for nome, tamanho in tamanhos.items()}, unidade="KiB")
+
+def _listar_lendo_todos(pasta: str) -> list[dict]:
+    """Versão antiga de list_saved_games: abre e decodifica cada save."""
+    import save_manager
+    saves = []
+    for filename in os.listdir(pasta):
+        if filename.endswith(".json") and not filename.startswith("."):
+            data = save_manager.read_save(os.path.join(pasta, filename))
+            saves.append({"char_name": data.get("nome"), "level": data.get("nivel"), "class": data.get("classe_personagem")})
+    return saves
+
+def bench_save_index(quantidade: int = 2000, repeticoes: int = 5):
+    import save_manager
+    jogador = db_manager.create_player_from_template(db_manager.get_class_template("Guerreiro"), "Bench")
+    jogador.inventario = db_manager.get_all_weapons() * 50
+    dados = save_manager.encode_state(save_manager.player_to_state(jogador))
+    diretorio_original = save_manager.SAVES_DIR
+    with tempfile.TemporaryDirectory() as pasta:
+        for i in range(quantidade):
+            with open(os.path.join(pasta, f"save_{i}.json"), "wb") as f: f.write(dados)
+        save_manager.SAVES_DIR = pasta
+        try:
+            inicio = time.perf_counter(); save_manager.rebuild_save_index()
+            reconstrucao = (time.perf_counter() - inicio) * 1000
+            resultados = {
+                "lendo todos os arquivos (antigo)": 1000 / _medir(lambda: _listar_lendo_todos(pasta), repeticoes),
+                "índice (list_saved_games)": 1000 / _medir(save_manager.list_saved_games, repeticoes),
+                "reconstrução do índice (uma vez)": reconstrucao,
+            }
+        finally:
+            save_manager.SAVES_DIR = diretorio_original
+    _imprimir(f"Listagem de {quantidade} saves", resultados, unidade="ms")
+
+# --- Personagens no banco: linha a linha (commit por personagem, N+1 consultas) vs. character_repository ---
+
+def _salvar_linha_a_linha(conn, jogadores: list, ids: list[int]):
+    """Uma instrução por linha e um commit por personagem."""
+    for id_, j in zip(ids, jogadores):
+        conn.execute("INSERT OR REPLACE INTO Personagem (id, nome, raca, classe_personagem, nivel, pontos_vida_maximos, pontos_vida_atuais, "
+                     "pontos_mana_maximos, pontos_mana_atuais, atributos, proficiencias, tipo_personagem) VALUES (?,?,?,?,?,?,?,?,?,?,?,'Jogador')",
+                     (id_, j.nome, j.raca, j.classe_personagem, j.nivel, j.pontos_vida_base, j.pontos_vida_atuais, j.pontos_mana_base,
+                      j.pontos_mana_atuais, json.dumps(j.atributos), json.dumps(j.proficiencias)))
+        conn.execute("INSERT OR REPLACE INTO Jogador VALUES (?,?,?,?)", (id_, j.experiencia, j.alinhamento, j.nome_jogador))
+        conn.execute("DELETE FROM Inventario WHERE personagem_id = ?", (id_,))
+        for item in dict.fromkeys(j.inventario):
+            conn.execute("INSERT INTO Inventario VALUES (?,?,?)", (id_, item.id, j.inventario.count(item)))
+        for slot, item in j.equipamento.items():
+            conn.execute("INSERT OR REPLACE INTO Equipamento VALUES (?,?,?)", (id_, slot, item.id if item else None))
+        for magia in j.magias:
+            conn.execute("INSERT OR REPLACE INTO MagiasPersonagem VALUES (?,?,'Conhecida')", (id_, magia.id))
+        conn.commit()
+
+def _carregar_n_mais_1(conn, ids: list[int]) -> list:
+    """Uma consulta pelo personagem e mais uma por item, slot e magia."""
+    jogadores = []
+    for id_ in ids:
+        r = conn.execute("SELECT * FROM Personagem p JOIN Jogador j ON j.personagem_id = p.id WHERE p.id = ?", (id_,)).fetchone()
+        j = db_manager.create_player_from_template(dict(r), r["nome"])
+        for inv in conn.execute("SELECT item_id, quantidade FROM Inventario WHERE personagem_id = ?", (id_,)).fetchall():
+            tipo = conn.execute("SELECT tipo_item FROM Item WHERE id = ?", (inv["item_id"],)).fetchone()["tipo_item"]
+            j.inventario.extend([db_manager.catalog.get("weapon" if tipo == "Arma" else "armor", inv["item_id"])] * inv["quantidade"])
+        for e in conn.execute("SELECT slot, item_id FROM Equipamento WHERE personagem_id = ?", (id_,)).fetchall():
+            if e["item_id"] is None: continue
+            tipo = conn.execute("SELECT tipo_item FROM Item WHERE id = ?", (e["item_id"],)).fetchone()["tipo_item"]
+            j.equipar(e["slot"], db_manager.catalog.get("weapon" if tipo == "Arma" else "armor", e["item_id"]))
+        for m in conn.execute("SELECT magia_id FROM MagiasPersonagem WHERE personagem_id = ?", (id_,)).fetchall():
+            j.magias.append(db_manager.catalog.get("spell", m["magia_id"]))
+        jogadores.append(j)
+    return jogadores
+
+def bench_repository(quantidade: int = 500, itens: int = 20):
+    import character_repository
+    banco_original = db_manager.DB_FILE
+    with tempfile.TemporaryDirectory() as pasta:
+        destino = os.path.join(pasta, "personagens.db"); shutil.copyfile(db_manager.DB_FILE, destino)
+        _usar_banco(destino)
+        try:
+            catalogo = db_manager.get_all_weapons() + db_manager.get_all_armors(); magias = db_manager.get_all_spells()
+            modelo = db_manager.get_class_template("Mago")
+            jogadores = []
+            for i in range(quantidade):
+                j = db_manager.create_player_from_template(modelo, f"Personagem {i}")
+                j.inventario = [catalogo[(i + k) % len(catalogo)] for k in range(itens)]
+                j.usar_item(db_manager.get_all_weapons()[i % 2])
+                for magia in magias[:3]: j.aprender_magia(magia)
+                jogadores.append(j)
+            ids = character_repository.save_players(jogadores) # Cria as linhas; as medições abaixo regravam
+            conn = db_manager._pool.obter()
+            resultados = {}
+            inicio = time.perf_counter(); _salvar_linha_a_linha(conn, jogadores, ids)
+            resultados["salvar: linha a linha, commit por personagem"] = (time.perf_counter() - inicio) * 1000
+            inicio = time.perf_counter(); character_repository.save_players(jogadores)
+            resultados["salvar: save_players (uma transação)"] = (time.perf_counter() - inicio) * 1000
+            inicio = time.perf_counter(); _carregar_n_mais_1(conn, ids)
+            resultados["carregar: N+1 consultas"] = (time.perf_counter() - inicio) * 1000
+            inicio = time.perf_counter(); character_repository.load_players(ids)
+            resultados["carregar: load_players (4 consultas)"] = (time.perf_counter() - inicio) * 1000
+        finally:
+            _usar_banco(banco_original)
+    _imprimir(f"{quantidade} personagens com {itens} itens", resultados, unidade="ms")
+
+# --- Autosave: tempo gasto na thread do jogo, save síncrono vs. AutosaveService ---
+
+def bench_autosave(itens: int = 5000, quadros: int = 120, quadro_ms: float = 1000 / 60):
+    import save_manager
+    from autosave import AutosaveService
+    jogador = db_manager.create_player_from_template(db_manager.get_class_template("Guerreiro"), "Bench")
+    catalogo = db_manager.get_all_weapons() + db_manager.get_all_armors()
+    jogador.inventario = [catalogo[i % len(catalogo)] for i in range(itens)]
+    save_manager.assign_save_id(jogador)
+    def sincrono(): save_manager.write_state(save_manager.player_to_state(jogador))
+    diretorio_original = save_manager.SAVES_DIR
+    resultados = {}
+    with tempfile.TemporaryDirectory() as pasta:
+        save_manager.SAVES_DIR = pasta
+        try:
+            servico = AutosaveService()
+            for nome, salvar in (("save síncrono", sincrono), ("AutosaveService.request", lambda: servico.request(jogador))):
+                # Um pedido de save por quadro (pior caso: inimigo derrotado em todo quadro)
+                tempos = []
+                for _ in range(quadros):
+                    inicio = time.perf_counter(); salvar()
+                    gasto = time.perf_counter() - inicio; tempos.append(gasto * 1000)
+                    time.sleep(max(0.0, quadro_ms / 1000 - gasto))
+                tempos.sort()
+                resultados[f"{nome} p50"] = tempos[len(tempos) // 2]
+                resultados[f"{nome} p99"] = tempos[min(len(tempos) - 1, int(len(tempos) * 0.99))]
+                resultados[f"{nome} máx"] = tempos[-1]
+            servico.close()
+        finally:
+            save_manager.SAVES_DIR = diretorio_original
+    _imprimir(f"Tempo na thread do jogo por save ({itens} itens, 1 pedido por quadro)", resultados, unidade="ms")
+    print(f"  autosave: {servico.salvos} gravações, {servico.agrupados} pedidos agrupados, última levou {servico.ultimo_tempo_ms:.1f} ms")
+
+# --- Texto: font.render a cada quadro vs. TextCache ---
+
+def bench_text(quadros: int = 5000):
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import pygame
+    pygame.font.init()
+    from render_cache import TextCache
+    fonte = pygame.font.Font(None, 24)
+    textos = ["PV: 12 / 12", "PM: 40 / 50", "Snaga", "PV: 7 / 7", "Novo Jogo", "Sair", "Espada Longa", "Arco Curto"]
+    cache = TextCache()
+    def sem_cache():
+        for texto in textos: fonte.render(texto, 1, (255, 255, 255))
+    def com_cache():
+        for texto in textos: cache.render(fonte, texto, (255, 255, 255))
+    resultados = {
+        "font.render a cada quadro": _medir(sem_cache, quadros),
+        "TextCache.render": _medir(com_cache, quadros),
+    }
+    _imprimir(f"HUD/menus com {len(textos)} textos ({quadros} quadros)", resultados, unidade="quadros/s")
+    print(f"  estatísticas do cache: {cache.stats()}")
+
+# --- Tela de seleção: lista inteira carregada e desenhada vs. lista virtualizada com páginas por chave ---
+
+def _banco_com_magias(pasta: str, quantidade: int) -> str:
+    """Copia o banco do jogo e acrescenta `quantidade` magias de níveis 0 a 9."""
+    destino = os.path.join(pasta, f"magias_{quantidade}.db")
+    shutil.copyfile(db_manager.DB_FILE, destino)
+    conn = sqlite3.connect(destino)
+    with conn:
+        conn.executemany(
+            "INSERT INTO Magia (nome, nivel_magia, escola_magia, tempo_conjuracao, alcance_magia, componentes, duracao_magia, "
+            "descricao_efeito, requer_concentracao, custo_mana) VALUES (?, ?, ?, '1 ação', '18 metros', '[\"V\", \"S\"]', 'Instantânea', '', 0, ?)",
+            [(f"Magia Extra {i}", i % 10, ("Evocação", "Ilusão", "Abjuração")[i % 3], 5 + i % 40) for i in range(quantidade)])
+    conn.close()
+    return destino
+
+def bench_selection(quantidade: int = 10000, quadros: int = 50):
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import pygame
+    pygame.font.init()
+    from render_cache import text_cache
+    from virtual_list import CatalogPager, VirtualList
+    from main_pygame import describe_item, SELECTION_LIST_RECT, SELECTION_ROW_HEIGHT
+    fonte = pygame.font.Font(None, 32); tela = pygame.Surface((800, 600))
+    banco_original = db_manager.DB_FILE
+    with tempfile.TemporaryDirectory() as pasta:
+        _usar_banco(_banco_com_magias(pasta, quantidade))
+        db_manager.get_class_template("Mago") # Abre a conexão antes de medir
+        # Antes: a tabela inteira é carregada e cada quadro desenha todas as linhas (a maioria fora da tela)
+        inicio = time.perf_counter(); magias = db_manager.get_all_spells()
+        carga_antiga = (time.perf_counter() - inicio) * 1000
+        def quadro_antigo():
+            for i, magia in enumerate(magias): tela.blit(text_cache.render(fonte, describe_item(magia, "spell"), (255, 255, 255)), (100, 150 + i * 40))
+        # Depois: só a primeira página antes do primeiro quadro, e só as linhas visíveis por quadro
+        pager = CatalogPager("spell")
+        lista = VirtualList(pager, SELECTION_LIST_RECT, SELECTION_ROW_HEIGHT, lambda magia: describe_item(magia, "spell"))
+        inicio = time.perf_counter(); pager.prefetch(); pager.atualizar(timeout=None)
+        carga_nova = (time.perf_counter() - inicio) * 1000
+        def quadro_novo(): lista.desenhar(tela, fonte, (255, 255, 255), (255, 255, 0))
+        resultados = {
+            "antes: carga até o 1º quadro": carga_antiga,
+            "antes: quadro (todas as linhas)": 1000 / _medir(quadro_antigo, quadros),
+            "depois: carga até o 1º quadro": carga_nova,
+            "depois: quadro (linhas visíveis)": 1000 / _medir(quadro_novo, quadros),
+        }
+        # Rolar a lista inteira página a página: o custo de cada página não cresce com a posição (sem OFFSET)
+        inicio = time.perf_counter()
+        while not pager.esgotado:
+            lista.mover(lista.linhas_visiveis); pager.atualizar(timeout=None)
+        resultados["depois: página média ao rolar até o fim"] = (time.perf_counter() - inicio) * 1000 / max(1, pager.paginas - 1)
+        pager.fechar()
+        _usar_banco(banco_original)
+    _imprimir(f"Tela de seleção com {quantidade} magias", resultados, unidade="ms")
+
+# --- Busca no catálogo: LIKE em todas as linhas vs. índice FTS5 ---
+
+def _banco_com_catalogo_grande(pasta: str, quantidade: int) -> str:
+    """Copia o banco do jogo e acrescenta `quantidade` armas e `quantidade` magias com nomes e descrições variados."""
+    import migrations
+    destino = os.path.join(pasta, f"catalogo_{quantidade}.db")
+    shutil.copyfile(db_manager.DB_FILE, destino)
+    gerador = random.Random(7)
+    armas = ("Espada", "Lâmina", "Machado", "Arco", "Lança", "Adaga", "Martelo", "Besta", "Maça", "Alabarda")
+    magias = ("Raio", "Bola", "Escudo", "Toque", "Muralha", "Nuvem", "Chama", "Sopro", "Mão", "Círculo")
+    adjetivos = ("Flamejante", "Sombria", "Glacial", "Arcana", "Sagrada", "Venenosa", "Trovejante", "Ancestral", "Rúnica", "Élfica")
+    palavras = ("dano", "fogo", "gelo", "veneno", "alvo", "área", "aliados", "inimigos", "luz", "trevas", "cura", "escudo", "vento")
+    def descricao(): return " ".join(gerador.choices(palavras, k=8)) + "."
+    conn = sqlite3.connect(destino)
+    migrations.migrar(conn) # Cria o índice de busca e os gatilhos antes das inserções
+    with conn:
+        base = conn.execute("SELECT COALESCE(MAX(id), 0) FROM Item").fetchone()[0]
+        conn.executemany("INSERT INTO Item (id, nome, descricao, peso, valor_moedas, tipo_item) VALUES (?, ?, ?, 1, ?, 'Arma')",
+                         [(base + i, f"{gerador.choice(armas)} {gerador.choice(adjetivos)} {i}", descricao(), gerador.randint(1, 500))
+                          for i in range(1, quantidade + 1)])
+        conn.executemany("INSERT INTO Arma (item_id, tipo_dano, dado_dano, propriedades, alcance) VALUES (?, 'Cortante', '1d8', '[]', 'Corpo a corpo')",
+                         [(base + i,) for i in range(1, quantidade + 1)])
+        conn.executemany(
+            "INSERT INTO Magia (nome, nivel_magia, escola_magia, tempo_conjuracao, alcance_magia, componentes, duracao_magia, "
+            "descricao_efeito, requer_concentracao, custo_mana) VALUES (?, ?, ?, '1 ação', '18 metros', '[]', 'Instantânea', ?, 0, ?)",
+            [(f"{gerador.choice(magias)} {gerador.choice(adjetivos)} {i}", i % 10, ("Evocação", "Ilusão", "Abjuração")[i % 3], descricao(), 5 + i % 40)
+             for i in range(1, quantidade + 1)])
+        conn.execute("INSERT INTO CatalogoBusca (CatalogoBusca) VALUES ('optimize')") # Como o populate_database após a importação
+    conn.close()
+    return destino
+
+def _busca_com_like(texto: str, limite: int) -> list:
+    """Busca sem índice: LIKE '%termo%' em nome e descrição de cada linha, nome casado primeiro."""
+    termos = texto.split()
+    condicao = " AND ".join("(nome LIKE ? OR texto LIKE ?)" for _ in termos)
+    params = [p for termo in termos for p in (f"%{termo}%", f"%{termo}%")]
+    sql = (f"SELECT id, nome FROM (SELECT id, nome, descricao AS texto FROM Item UNION ALL SELECT id, nome, descricao_efeito FROM Magia) "
+           f"WHERE {condicao} ORDER BY nome NOT LIKE ? LIMIT ?")
+    with db_manager.get_connection() as conn:
+        return conn.execute(sql, params + [f"%{termos[0]}%", limite]).fetchall()
+
+def bench_search(quantidade: int = 30000, repeticoes: int = 300, limite: int = 20):
+    banco_original = db_manager.DB_FILE
+    # O que o jogador digita, tecla a tecla (cada prefixo é uma busca)
+    digitacao = ["e", "es", "esp", "espa", "espad", "espada", "espada f", "espada fl", "espada fla", "r", "ra", "rai", "raio", "raio g", "raio gl"]
+    with tempfile.TemporaryDirectory() as pasta:
+        inicio = time.perf_counter(); _usar_banco(_banco_com_catalogo_grande(pasta, quantidade))
+        criacao = time.perf_counter() - inicio
+        db_manager.search_catalog("espada") # Abre a conexão e verifica o índice antes de medir
+        def por_tecla(buscar, repeticoes: int) -> float:
+            return 1000 / (_medir(lambda: [buscar(texto) for texto in digitacao], repeticoes) * len(digitacao))
+        resultados = {
+            "LIKE em todas as linhas": por_tecla(lambda texto: _busca_com_like(texto, limite), max(1, repeticoes // 50)),
+            f"search_catalog, todos os tipos (limit={limite})": por_tecla(lambda texto: db_manager.search_catalog(texto, limit=limite), repeticoes),
+            f"search_catalog, só magias (limit={limite})": por_tecla(lambda texto: db_manager.search_catalog(texto, ("spell",), limite), repeticoes),
+            f"search_catalog, só armas (limit={limite})": por_tecla(lambda texto: db_manager.search_catalog(texto, ("weapon",), limite), repeticoes),
+            "search_catalog, todos os tipos (limit=50)": por_tecla(lambda texto: db_manager.search_catalog(texto, limit=50), repeticoes),
+            "search_catalog, só armas, com filtro (custo <= 100)": por_tecla(lambda texto: db_manager.search_catalog(texto, ("weapon",), limite, custo_max=100), repeticoes),
+            "search_catalog, só armas, filtro seletivo (custo <= 2)": por_tecla(lambda texto: db_manager.search_catalog(texto, ("weapon",), limite, custo_max=2), max(1, repeticoes // 10)),
+        }
+        piores = sorted((1000 / _medir(lambda: db_manager.search_catalog(texto, limit=limite), repeticoes), texto) for texto in digitacao)[-3:]
+        for tempo, texto in reversed(piores): resultados[f"pior tecla: '{texto}'"] = tempo
+        _usar_banco(banco_original)
+    _imprimir(f"Busca no catálogo, ms por tecla ({2 * quantidade} armas e magias; base criada em {criacao:.1f} s)", resultados, unidade="ms")
+
+BENCHMARKS = {
+    "db": bench_db,
+    "catalog": bench_catalog,
+    "enemies": bench_enemies,
+    "populate": bench_populate,
+    "sqlite": bench_sqlite,
+    "dice": bench_dice,
+    "memory": bench_memory,
+    "collision": bench_collision,
+    "projectiles": bench_projectiles,
+    "text": bench_text,
+    "swarm": bench_swarm,
+    "flowfield": bench_flowfield,
+    "stats": bench_stats,
+    "inventory": bench_inventory,
+    "save": bench_save,
+    "save_index": bench_save_index,
+    "repository": bench_repository,
+    "autosave": bench_autosave,
+    "selection": bench_selection,
+    "search": bench_search,
+}
+
+if __name__ == '__main__':
+    nomes = sys.argv[1:] or list(BENCHMARKS)
+    for nome in nomes:
+        if nome not in BENCHMARKS:
+            print(f"Benchmark desconhecido: {nome}. Opções: {', '.join(BENCHMARKS)}"); sys.exit(1)
+        BENCHMARKS[nome]()
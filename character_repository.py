@@ -0,0 +1,170 @@
+# character_repository.py
+#
+# Persistência de personagens do jogador no banco relacional: linha em Personagem/Jogador,
+# inventário (Inventario), equipamento por slot (Equipamento) e magias conhecidas/preparadas
+# (MagiasPersonagem). Um lote inteiro de personagens é gravado numa única transação, com
+# upserts e executemany; a leitura de um lote usa uma consulta por tabela (com JOIN), não uma
+# por item. Itens e magias voltam como os objetos compartilhados do db_manager.catalog.
+# Os modificadores temporários (Personagem.modificadores) não são gravados aqui.
+
+import json
+import time
+
+import db_manager
+from rpg_model import Jogador, Item
+
+# Slots aceitos pela restrição CHECK da tabela Equipamento
+SLOTS_EQUIPAMENTO = ("Arma", "Armadura", "Escudo", "Amuleto", "Anel1", "Anel2")
+# Tipo de item no banco -> tipo do catálogo
+TIPOS_CATALOGO = {"Arma": "weapon", "Armadura": "armor"}
+
+SQL_PROXIMO_ID = "SELECT COALESCE(MAX(id), 0) + 1 FROM Personagem"
+SQL_UPSERT_PERSONAGEM = (
+    "INSERT INTO Personagem (id, nome, raca, classe_personagem, nivel, pontos_vida_maximos, pontos_vida_atuais, "
+    "pontos_mana_maximos, pontos_mana_atuais, atributos, proficiencias, tipo_personagem) VALUES (?,?,?,?,?,?,?,?,?,?,?,'Jogador') "
+    "ON CONFLICT(id) DO UPDATE SET nome = excluded.nome, raca = excluded.raca, classe_personagem = excluded.classe_personagem, "
+    "nivel = excluded.nivel, pontos_vida_maximos = excluded.pontos_vida_maximos, pontos_vida_atuais = excluded.pontos_vida_atuais, "
+    "pontos_mana_maximos = excluded.pontos_mana_maximos, pontos_mana_atuais = excluded.pontos_mana_atuais, "
+    "atributos = excluded.atributos, proficiencias = excluded.proficiencias")
+SQL_UPSERT_JOGADOR = (
+    "INSERT INTO Jogador (personagem_id, experiencia, alinhamento, nome_jogador) VALUES (?,?,?,?) "
+    "ON CONFLICT(personagem_id) DO UPDATE SET experiencia = excluded.experiencia, alinhamento = excluded.alinhamento, "
+    "nome_jogador = excluded.nome_jogador")
+SQL_UPSERT_SALVO = (
+    "INSERT INTO PersonagemSalvo (personagem_id, modelo_id, salvo_em) VALUES (?,?,?) "
+    "ON CONFLICT(personagem_id) DO UPDATE SET modelo_id = excluded.modelo_id, salvo_em = excluded.salvo_em")
+# As tabelas filhas são regravadas por completo: itens que saíram do inventário somem junto.
+# Os ids do lote vão como um único array JSON (o texto SQL não muda com o tamanho do lote)
+SQL_APAGAR_INVENTARIO = "DELETE FROM Inventario WHERE personagem_id IN (SELECT value FROM json_each(?))"
+SQL_APAGAR_EQUIPAMENTO = "DELETE FROM Equipamento WHERE personagem_id IN (SELECT value FROM json_each(?))"
+SQL_APAGAR_MAGIAS = "DELETE FROM MagiasPersonagem WHERE personagem_id IN (SELECT value FROM json_each(?))"
+SQL_INSERIR_INVENTARIO = "INSERT INTO Inventario (personagem_id, item_id, quantidade) VALUES (?,?,?)"
+SQL_INSERIR_EQUIPAMENTO = "INSERT INTO Equipamento (personagem_id, slot, item_id) VALUES (?,?,?)"
+SQL_INSERIR_MAGIAS = "INSERT INTO MagiasPersonagem (personagem_id, magia_id, status) VALUES (?,?,?)"
+
+SQL_CARREGAR_PERSONAGENS = (
+    "SELECT p.*, j.experiencia, j.alinhamento, j.nome_jogador, s.modelo_id FROM PersonagemSalvo s "
+    "JOIN Personagem p ON p.id = s.personagem_id LEFT JOIN Jogador j ON j.personagem_id = p.id "
+    "WHERE s.personagem_id IN (SELECT value FROM json_each(?))")
+# ORDER BY rowid: as linhas voltam na ordem em que foram gravadas (a ordem das listas do personagem)
+SQL_CARREGAR_INVENTARIO = (
+    "SELECT inv.personagem_id, inv.item_id, inv.quantidade, i.tipo_item FROM Inventario inv JOIN Item i ON i.id = inv.item_id "
+    "WHERE inv.personagem_id IN (SELECT value FROM json_each(?)) ORDER BY inv.personagem_id, inv.rowid")
+SQL_CARREGAR_EQUIPAMENTO = (
+    "SELECT e.personagem_id, e.slot, e.item_id, i.tipo_item FROM Equipamento e LEFT JOIN Item i ON i.id = e.item_id "
+    "WHERE e.personagem_id IN (SELECT value FROM json_each(?))")
+SQL_CARREGAR_MAGIAS = (
+    "SELECT personagem_id, magia_id, status FROM MagiasPersonagem "
+    "WHERE personagem_id IN (SELECT value FROM json_each(?)) ORDER BY personagem_id, rowid")
+SQL_LISTAR = (
+    "SELECT p.id, p.nome, p.classe_personagem, p.nivel, s.salvo_em FROM PersonagemSalvo s "
+    "JOIN Personagem p ON p.id = s.personagem_id ORDER BY s.salvo_em DESC, p.id DESC")
+
+def _item_do_banco(tipo_item: str | None, item_id: int | None) -> Item | None:
+    kind = TIPOS_CATALOGO.get(tipo_item)
+    return db_manager.catalog.get(kind, item_id) if kind and item_id is not None else None
+
+def save_players(jogadores: list[Jogador]) -> list[int]:
+    """
+    Grava (insere ou atualiza) todos os `jogadores` numa única transação e retorna os ids das linhas.
+    Personagens ainda não gravados recebem um id novo em `personagem_id`; se algo falhar, nada muda no banco.
+    """
+    if not jogadores: return []
+    salvo_em = time.time()
+    with db_manager.get_connection() as conn:
+        # IMMEDIATE: reserva a escrita antes de ler o próximo id livre
+        if not conn.in_transaction: conn.execute("BEGIN IMMEDIATE")
+        proximo_id = conn.execute(SQL_PROXIMO_ID).fetchone()[0]
+        ids = []
+        for jogador in jogadores:
+            if jogador.personagem_id is None: ids.append(proximo_id); proximo_id += 1
+            else: ids.append(jogador.personagem_id)
+        personagens, detalhes, salvos, inventario, equipamento, magias = [], [], [], [], [], []
+        for id_, j in zip(ids, jogadores):
+            personagens.append((id_, j.nome, j.raca, j.classe_personagem, j.nivel, j.pontos_vida_base, j.pontos_vida_atuais,
+                                j.pontos_mana_base, j.pontos_mana_atuais, json.dumps(j.atributos, ensure_ascii=False),
+                                json.dumps(j.proficiencias, ensure_ascii=False)))
+            detalhes.append((id_, j.experiencia, j.alinhamento, j.nome_jogador))
+            salvos.append((id_, j.id, salvo_em))
+            # Inventario tem um item por linha, com a quantidade (a ColecaoPorId já guarda assim)
+            inventario.extend((id_, item_id, quantidade) for item_id, quantidade in j.inventario.quantidades().items() if item_id is not None)
+            equipamento.extend((id_, slot, item.id if item is not None else None)
+                               for slot, item in j.equipamento.items() if slot in SLOTS_EQUIPAMENTO)
+            preparadas = j.magias_preparadas
+            magias.extend((id_, magia.id, "Preparada" if magia in preparadas else "Conhecida") for magia in j.magias.unicos())
+            magias.extend((id_, magia.id, "Preparada") for magia in preparadas.unicos() if magia not in j.magias)
+        lote = json.dumps(ids)
+        conn.executemany(SQL_UPSERT_PERSONAGEM, personagens)
+        conn.executemany(SQL_UPSERT_JOGADOR, detalhes)
+        conn.executemany(SQL_UPSERT_SALVO, salvos)
+        for sql in (SQL_APAGAR_INVENTARIO, SQL_APAGAR_EQUIPAMENTO, SQL_APAGAR_MAGIAS): conn.execute(sql, (lote,))
+        conn.executemany(SQL_INSERIR_INVENTARIO, inventario)
+        conn.executemany(SQL_INSERIR_EQUIPAMENTO, equipamento)
+        conn.executemany(SQL_INSERIR_MAGIAS, magias)
+    # Só depois do commit: uma transação desfeita não deixa ids inexistentes nos objetos
+    for id_, jogador in zip(ids, jogadores): jogador.personagem_id = id_
+    return ids
+
+def save_player(jogador: Jogador) -> int:
+    return save_players([jogador])[0]
+
+def load_players(ids: list[int]) -> list[Jogador]:
+    """Carrega os personagens de `ids` (na mesma ordem; ids inexistentes são ignorados) com quatro consultas."""
+    if not ids: return []
+    lote = json.dumps(sorted(set(ids)))
+    with db_manager.get_connection() as conn:
+        linhas = {r["id"]: r for r in conn.execute(SQL_CARREGAR_PERSONAGENS, (lote,))}
+        linhas_inventario = conn.execute(SQL_CARREGAR_INVENTARIO, (lote,)).fetchall()
+        linhas_equipamento = conn.execute(SQL_CARREGAR_EQUIPAMENTO, (lote,)).fetchall()
+        linhas_magias = conn.execute(SQL_CARREGAR_MAGIAS, (lote,)).fetchall()
+
+    jogadores = {}
+    for id_, r in linhas.items():
+        jogador = Jogador(
+            id_entidade=r["modelo_id"] if r["modelo_id"] is not None else id_, nome=r["nome"], raca=r["raca"],
+            classe_personagem=r["classe_personagem"], nivel=r["nivel"], pontos_vida_maximos=r["pontos_vida_maximos"],
+            atributos=json.loads(r["atributos"]), proficiencias=json.loads(r["proficiencias"]),
+            experiencia=r["experiencia"] or 0, alinhamento=r["alinhamento"], nome_jogador=r["nome_jogador"],
+            pontos_mana_maximos=r["pontos_mana_maximos"] or 0)
+        jogador.personagem_id = id_
+        jogadores[id_] = jogador
+    for r in linhas_inventario:
+        item = _item_do_banco(r["tipo_item"], r["item_id"])
+        if item is not None: jogadores[r["personagem_id"]].inventario.adicionar(item, r["quantidade"])
+    for r in linhas_equipamento:
+        jogadores[r["personagem_id"]].equipar(r["slot"], _item_do_banco(r["tipo_item"], r["item_id"]))
+    for r in linhas_magias:
+        magia = db_manager.catalog.get("spell", r["magia_id"])
+        if magia is None: continue
+        jogador = jogadores[r["personagem_id"]]
+        jogador.magias.adicionar(magia)
+        if r["status"] == "Preparada": jogador.magias_preparadas.adicionar(magia)
+    # Por último: equipar limita os PV/PM atuais aos máximos de cada momento
+    for id_, jogador in jogadores.items():
+        jogador.pontos_vida_atuais = linhas[id_]["pontos_vida_atuais"]
+        jogador.pontos_mana_atuais = linhas[id_]["pontos_mana_atuais"] or 0
+    return [jogadores[i] for i in ids if i in jogadores]
+
+def load_player(personagem_id: int) -> Jogador | None:
+    jogadores = load_players([personagem_id])
+    return jogadores[0] if jogadores else None
+
+def list_players() -> list[dict]:
+    """Resumo dos personagens gravados (id, nome, classe, nível e salvo_em), do mais recente ao mais antigo."""
+    try:
+        with db_manager.get_connection() as conn:
+            return [dict(r) for r in conn.execute(SQL_LISTAR)]
+    except: return []
+
+def delete_players(ids: list[int]):
+    """Apaga os personagens e todas as linhas ligadas a eles (sem depender de PRAGMA foreign_keys)."""
+    if not ids: return
+    with db_manager.get_connection() as conn:
+        # Só ids marcados em PersonagemSalvo: os modelos de classe nunca são removidos
+        salvos = [r[0] for r in conn.execute(
+            "SELECT personagem_id FROM PersonagemSalvo WHERE personagem_id IN (SELECT value FROM json_each(?))", (json.dumps(sorted(set(ids))),))]
+        if not salvos: return
+        lote = json.dumps(salvos)
+        for tabela in ("Inventario", "Equipamento", "MagiasPersonagem", "Jogador", "PersonagemSalvo"):
+            conn.execute(f"DELETE FROM {tabela} WHERE personagem_id IN (SELECT value FROM json_each(?))", (lote,))
+        conn.execute("DELETE FROM Personagem WHERE id IN (SELECT value FROM json_each(?))", (lote,))
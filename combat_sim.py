@@ -0,0 +1,122 @@
+# combat_sim.py
+#
+# Simulador de combate sem pygame, para testes de balanceamento.
+# Resolve lutas completas turno a turno com as mesmas regras do jogo
+# (Personagem.resolver_ataque / receber_dano / Arma.calcular_dano_rolagem) e agrega os resultados.
+#
+# Uso: python combat_sim.py [tentativas_por_combinacao] [processos]
+
+import sys
+import random
+import itertools
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import db_manager
+from rpg_model import Personagem, Jogador, NPC, Arma, Armadura, modificador_atributo
+
+MAX_TURNOS = 200 # Lutas que passam disso contam como empate
+
+def _iniciativa(personagem: Personagem) -> int:
+    return random.randint(1, 20) + modificador_atributo(personagem.atributos.get("Destreza", 10))
+
+def _percentil(valores_ordenados: list[int], p: float) -> float | None:
+    if not valores_ordenados: return None
+    indice = min(len(valores_ordenados) - 1, int(round(p / 100 * (len(valores_ordenados) - 1))))
+    return valores_ordenados[indice]
+
+def _atacar_e_medir(atacante: Personagem, alvo: Personagem, histograma: Counter):
+    # O dano rolado, não a diferença de PV: os PV param em 0, e o golpe final contaria só o que restava ao alvo
+    dano = atacante.resolver_ataque(alvo)
+    if dano is not None: histograma[dano] += 1
+
+def simulate_encounter(jogador: Jogador, npc: NPC, n_trials: int, max_turnos: int = MAX_TURNOS,
+                       seed: int | None = None) -> dict:
+    """
+    Simula `n_trials` lutas entre `jogador` e `npc` e retorna um resumo:
+      vitorias / derrotas / empates e taxa_vitoria (do ponto de vista do jogador),
+      turnos_para_vencer: Counter {turnos: lutas} das vitórias, com media e percentis p50/p95/p99,
+      dano_jogador / dano_npc: Counter {dano rolado: acertos}.
+    Os dois personagens começam cada luta com os PV/PM atuais e são restaurados ao final.
+    Um "turno" é uma rodada em que os dois lados agem, na ordem da iniciativa.
+    """
+    if seed is not None: random.seed(seed)
+    estado_inicial = [(p, p.pontos_vida_atuais, p.pontos_mana_atuais) for p in (jogador, npc)]
+    vitorias = derrotas = empates = 0
+    turnos_vitoria: Counter = Counter()
+    dano_jogador: Counter = Counter(); dano_npc: Counter = Counter()
+    try:
+        for _ in range(n_trials):
+            for personagem, pv, pm in estado_inicial:
+                personagem.pontos_vida_atuais = pv; personagem.pontos_mana_atuais = pm
+            jogador_primeiro = _iniciativa(jogador) >= _iniciativa(npc)
+            ordem = ((jogador, npc, dano_jogador), (npc, jogador, dano_npc))
+            if not jogador_primeiro: ordem = ordem[::-1]
+            for turno in range(1, max_turnos + 1):
+                for atacante, alvo, histograma in ordem:
+                    _atacar_e_medir(atacante, alvo, histograma)
+                    if alvo.pontos_vida_atuais <= 0: break
+                if npc.pontos_vida_atuais <= 0:
+                    vitorias += 1; turnos_vitoria[turno] += 1; break
+                if jogador.pontos_vida_atuais <= 0:
+                    derrotas += 1; break
+            else:
+                empates += 1
+    finally:
+        for personagem, pv, pm in estado_inicial:
+            personagem.pontos_vida_atuais = pv; personagem.pontos_mana_atuais = pm
+
+    turnos_ordenados = sorted(turnos_vitoria.elements())
+    return {
+        "jogador": jogador.nome, "npc": npc.nome, "tentativas": n_trials,
+        "vitorias": vitorias, "derrotas": derrotas, "empates": empates,
+        "taxa_vitoria": vitorias / n_trials if n_trials else 0.0,
+        "turnos_para_vencer": turnos_vitoria,
+        "turnos_media": sum(turnos_ordenados) / len(turnos_ordenados) if turnos_ordenados else None,
+        "turnos_p50": _percentil(turnos_ordenados, 50),
+        "turnos_p95": _percentil(turnos_ordenados, 95),
+        "turnos_p99": _percentil(turnos_ordenados, 99),
+        "dano_jogador": dano_jogador, "dano_npc": dano_npc,
+    }
+
+# --- Varredura de todas as combinações do banco ---
+
+def _simular_combinacao(args) -> dict:
+    """Executado nos processos do pool: monta o jogador equipado e simula contra o monstro."""
+    template, arma, armadura, npc, n_trials, seed = args
+    jogador = db_manager.create_player_from_template(template, template["classe_personagem"])
+    if arma is not None: jogador.usar_item(arma)
+    if armadura is not None: jogador.usar_item(armadura)
+    resultado = simulate_encounter(jogador, npc, n_trials, seed=seed)
+    resultado.update(classe=template["classe_personagem"],
+                     arma=arma.nome if arma else None, armadura=armadura.nome if armadura else None)
+    return resultado
+
+def combinacoes_do_banco(incluir_sem_equipamento: bool = True) -> list[tuple]:
+    """Todas as combinações classe × arma × armadura × monstro cadastradas no banco."""
+    extras = [None] if incluir_sem_equipamento else []
+    armas: list[Arma | None] = db_manager.get_all_weapons() + extras
+    armaduras: list[Armadura | None] = db_manager.get_all_armors() + extras
+    return list(itertools.product(db_manager.get_class_templates(), armas, armaduras, db_manager.get_all_monsters()))
+
+def sweep(n_trials: int = 1000, processos: int | None = None, seed: int = 0) -> list[dict]:
+    """
+    Simula todas as combinações do banco em um pool de processos.
+    Cada combinação recebe uma semente própria (seed + índice), então o resultado é reprodutível.
+    """
+    tarefas = [(t, a, ar, m, n_trials, seed + i) for i, (t, a, ar, m) in enumerate(combinacoes_do_banco())]
+    if not tarefas: return []
+    with ProcessPoolExecutor(max_workers=processos) as pool:
+        return list(pool.map(_simular_combinacao, tarefas, chunksize=max(1, len(tarefas) // 64)))
+
+def main():
+    n_trials = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    processos = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    resultados = sweep(n_trials, processos)
+    print(f"{'Classe':<12} {'Arma':<16} {'Armadura':<20} {'Monstro':<12} {'Vitória':>8} {'Turnos p50':>10} {'p95':>5}")
+    for r in sorted(resultados, key=lambda r: r["taxa_vitoria"], reverse=True):
+        print(f"{r['classe']:<12} {str(r['arma']):<16} {str(r['armadura']):<20} {r['npc']:<12} "
+              f"{r['taxa_vitoria']:>8.1%} {str(r['turnos_p50']):>10} {str(r['turnos_p95']):>5}")
+
+if __name__ == '__main__':
+    main()
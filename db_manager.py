@@ -2,50 +2,491 @@
 
 import sqlite3
 import json
+import time
+import random
+import re
+import bisect
+import unicodedata
+import threading
+import atexit
+from contextlib import contextmanager
+from typing import Any, Callable
 from rpg_model import Jogador, Arma, Armadura, Magia, NPC
+import migrations
 
 DB_FILE = "rpg_database.db"
 
+# Quantidade de instruções preparadas mantidas em cache por conexão.
+# O sqlite3 reaproveita o statement compilado sempre que recebe exatamente o mesmo texto SQL,
+# por isso as consultas abaixo ficam em constantes do módulo.
+STATEMENT_CACHE_SIZE = 256
+
+# Ajustes aplicados a cada conexão do pool. WAL deixa leituras e a escrita (autosave, repositório)
+# acontecerem ao mesmo tempo e, com synchronous=NORMAL, só sincroniza o disco nos checkpoints;
+# mmap_size e cache_size (negativo = KiB) mantêm o banco, que é pequeno, inteiro em memória.
+PRAGMAS = ("journal_mode = WAL", "synchronous = NORMAL", "mmap_size = 67108864", "cache_size = -16384", "temp_store = MEMORY")
+
+# Personagens salvos pelo character_repository também são linhas 'Jogador' da tabela Personagem;
+# a tabela PersonagemSalvo os marca, para que não sejam confundidos com os modelos de classe.
+SQL_NAO_SALVO = "NOT EXISTS (SELECT 1 FROM PersonagemSalvo s WHERE s.personagem_id = Personagem.id)"
+SQL_CLASS_TEMPLATE = f"SELECT * FROM Personagem WHERE lower(classe_personagem) = ? AND tipo_personagem = 'Jogador' AND {SQL_NAO_SALVO} ORDER BY id LIMIT 1"
+SQL_CLASS_TEMPLATES = f"SELECT * FROM Personagem WHERE tipo_personagem = 'Jogador' AND {SQL_NAO_SALVO} ORDER BY id"
+SQL_ALL_ARMORS = "SELECT * FROM Item i JOIN Armadura a ON i.id = a.item_id WHERE i.tipo_item = 'Armadura'"
+SQL_ALL_SPELLS = "SELECT * FROM Magia"
+SQL_ALL_WEAPONS = "SELECT * FROM Item i JOIN Arma a ON i.id = a.item_id WHERE i.tipo_item = 'Arma'"
+# Páginas do catálogo por chave ("keyset"): a próxima página começa depois do último id já lido, então o custo
+# não cresce com a posição na lista (ao contrário de OFFSET). Cada filtro é "(? IS NULL OR ...)": um filtro
+# passado como None não restringe nada e o texto SQL continua o mesmo para qualquer combinação de filtros.
+# Parâmetros: (depois_id, *filtros, limite), com os filtros de Catalog._filtros: (tipo, tipo, nivel, nivel, custo_max,
+# custo_max) para magias e (tipo, tipo, custo_max, custo_max) para armas e armaduras, que não têm nível.
+SQL_WEAPON_PAGE = ("SELECT * FROM Item i JOIN Arma a ON i.id = a.item_id WHERE i.tipo_item = 'Arma' AND i.id > ? "
+                   "AND (? IS NULL OR lower(a.tipo_dano) = ?) AND (? IS NULL OR i.valor_moedas <= ?) ORDER BY i.id LIMIT ?")
+SQL_ARMOR_PAGE = ("SELECT * FROM Item i JOIN Armadura a ON i.id = a.item_id WHERE i.tipo_item = 'Armadura' AND i.id > ? "
+                  "AND (? IS NULL OR lower(a.tipo_armadura) = ?) AND (? IS NULL OR i.valor_moedas <= ?) ORDER BY i.id LIMIT ?")
+SQL_SPELL_PAGE = ("SELECT * FROM Magia WHERE id > ? "
+                  "AND (? IS NULL OR lower(escola_magia) = ?) AND (? IS NULL OR nivel_magia = ?) AND (? IS NULL OR custo_mana <= ?) ORDER BY id LIMIT ?")
+# Valores distintos de cada filtro (linhas (filtro, valor)), para a tela oferecer só opções que existem
+SQL_WEAPON_FILTERS = ("SELECT DISTINCT 'tipo', lower(tipo_dano) FROM Arma UNION "
+                      "SELECT DISTINCT 'custo', valor_moedas FROM Item WHERE tipo_item = 'Arma' ORDER BY 1, 2")
+SQL_ARMOR_FILTERS = ("SELECT DISTINCT 'tipo', lower(tipo_armadura) FROM Armadura UNION "
+                     "SELECT DISTINCT 'custo', valor_moedas FROM Item WHERE tipo_item = 'Armadura' ORDER BY 1, 2")
+SQL_SPELL_FILTERS = ("SELECT DISTINCT 'tipo', lower(escola_magia) FROM Magia UNION SELECT DISTINCT 'nivel', nivel_magia FROM Magia UNION "
+                     "SELECT DISTINCT 'custo', custo_mana FROM Magia ORDER BY 1, 2")
+# Busca textual no índice FTS5 CatalogoBusca (migração 5). O rowid do índice é (código do tipo << 40) | id, e cada
+# tipo ocupa uma faixa de rowids (migrations.faixa_busca). A busca lê, na ordem do índice e com LIMIT, só os primeiros
+# candidatos da faixa que passam nos filtros (rowid e nome, para ordenar em Python): funções de relevância como bm25
+# leem a lista inteira de documentos de cada termo, o que num prefixo curto ("es") são dezenas de milhares de linhas,
+# mesmo com LIMIT. Os escolhidos são resolvidos pelo id com SQL_*_BY_IDS, que devolvem exatamente as colunas de
+# SQL_ALL_* (o mapa de identidade do Catalog compara a linha inteira).
+_MASCARA_ID_BUSCA = (1 << migrations.BITS_ID_BUSCA) - 1
+# Sem filtros, os candidatos vêm só do índice, sem JOIN. Parâmetros: (expressão FTS, primeiro rowid, último rowid, limite).
+SQL_SEARCH_CANDIDATES = "SELECT rowid, nome FROM CatalogoBusca WHERE CatalogoBusca MATCH ? AND rowid BETWEEN ? AND ? LIMIT ?"
+# Com filtros, o JOIN com a tabela do tipo aplica os filtros ainda no SQL.
+# Parâmetros: (expressão FTS, *filtros, limite), como nas páginas.
+SQL_WEAPON_SEARCH = (f"SELECT b.rowid, b.nome FROM CatalogoBusca b JOIN Item i ON i.id = b.rowid & {_MASCARA_ID_BUSCA} JOIN Arma a ON i.id = a.item_id "
+                     "WHERE CatalogoBusca MATCH ? AND b.rowid BETWEEN {} AND {} AND (? IS NULL OR lower(a.tipo_dano) = ?) ".format(*migrations.faixa_busca("Arma")) +
+                     "AND (? IS NULL OR i.valor_moedas <= ?) LIMIT ?")
+SQL_ARMOR_SEARCH = (f"SELECT b.rowid, b.nome FROM CatalogoBusca b JOIN Item i ON i.id = b.rowid & {_MASCARA_ID_BUSCA} JOIN Armadura a ON i.id = a.item_id "
+                    "WHERE CatalogoBusca MATCH ? AND b.rowid BETWEEN {} AND {} AND (? IS NULL OR lower(a.tipo_armadura) = ?) ".format(*migrations.faixa_busca("Armadura")) +
+                    "AND (? IS NULL OR i.valor_moedas <= ?) LIMIT ?")
+SQL_SPELL_SEARCH = (f"SELECT b.rowid, b.nome FROM CatalogoBusca b JOIN Magia m ON m.id = b.rowid & {_MASCARA_ID_BUSCA} "
+                    "WHERE CatalogoBusca MATCH ? AND b.rowid BETWEEN {} AND {} AND (? IS NULL OR lower(m.escola_magia) = ?) ".format(*migrations.faixa_busca("Magia")) +
+                    "AND (? IS NULL OR m.nivel_magia = ?) AND (? IS NULL OR m.custo_mana <= ?) LIMIT ?")
+SQL_WEAPONS_BY_IDS = SQL_ALL_WEAPONS + " AND i.id IN (SELECT value FROM json_each(?))"
+SQL_ARMORS_BY_IDS = SQL_ALL_ARMORS + " AND i.id IN (SELECT value FROM json_each(?))"
+SQL_SPELLS_BY_IDS = SQL_ALL_SPELLS + " WHERE id IN (SELECT value FROM json_each(?))"
+# Contadores de alteração do catálogo (migração 6), comparados pelo Catalog.reload_if_changed
+SQL_CATALOG_VERSIONS = "SELECT grupo, versao FROM CatalogoVersao"
+SQL_HAS_SEARCH_INDEX = "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'CatalogoBusca'"
+# Índice (nível, id) dos monstros, lido uma vez pelo Catalog; o sorteio é feito em Python
+SQL_MONSTER_INDEX = "SELECT p.id, p.nivel FROM Personagem p JOIN NPC n ON p.id = n.personagem_id WHERE n.tipo_npc = 'Monstro' ORDER BY p.nivel, p.id"
+# Busca uma onda inteira de uma vez: os ids sorteados vão como um único array JSON,
+# o que mantém o texto SQL constante (e o statement no cache) para qualquer tamanho de onda
+SQL_ENEMIES_BY_IDS = "SELECT * FROM Personagem p JOIN NPC n ON p.id = n.personagem_id WHERE p.id IN (SELECT value FROM json_each(?))"
+
+def _sem_acentos(texto: str) -> str:
+    return "".join(c for c in unicodedata.normalize("NFD", texto.lower()) if not unicodedata.combining(c))
+
+def _palavras(texto) -> list[str]:
+    return re.findall(r"\w+", _sem_acentos(str(texto))) if texto else []
+
+_PRIMEIRA_PALAVRA = re.compile(r"\w+")
+
+def _relevancia(nome: str, termos: list[str], pelo_nome: bool) -> tuple[int, int]:
+    """
+    Chave de ordenação da busca (menor = mais relevante): primeiro os nomes que começam pelo primeiro termo,
+    depois os demais que casam pelo nome, por último os que só casam pela descrição/escola; em cada grupo, os nomes
+    mais curtos (mais próximos do texto digitado). `termos` já vêm sem acentos.
+    """
+    if not pelo_nome: return (2, len(nome))
+    primeira = _PRIMEIRA_PALAVRA.search(nome)
+    return (0 if primeira and _sem_acentos(primeira.group()).startswith(termos[0]) else 1, len(nome))
+
+class ConnectionPool:
+    """
+    Mantém uma conexão SQLite de longa duração por thread, em vez de abrir e fechar
+    o arquivo a cada consulta. Cada thread recebe a sua própria conexão (o sqlite3
+    não permite compartilhar uma conexão entre threads com segurança).
+    """
+    def __init__(self, db_file: str, cached_statements: int = STATEMENT_CACHE_SIZE):
+        self.db_file = db_file; self.cached_statements = cached_statements
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._conexoes: list[sqlite3.Connection] = []
+
+    def _abrir(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_file, cached_statements=self.cached_statements, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        try:
+            for pragma in PRAGMAS: conn.execute(f"PRAGMA {pragma}")
+            migrations.migrar(conn)
+        except sqlite3.Error as e: print(f"Aviso: não foi possível configurar/migrar o banco '{self.db_file}': {e}")
+        with self._lock: self._conexoes.append(conn)
+        return conn
+
+    def obter(self) -> sqlite3.Connection:
+        """Retorna a conexão da thread atual, abrindo-a na primeira chamada."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._abrir(); self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def conexao(self):
+        """
+        Context manager usado por todos os getters. Confirma a transação pendente ao sair
+        normalmente e desfaz em caso de erro; a conexão em si continua aberta.
+        """
+        conn = self.obter()
+        try:
+            yield conn
+        except Exception:
+            if conn.in_transaction: conn.rollback()
+            raise
+        else:
+            if conn.in_transaction: conn.commit()
+
+    def close_all(self):
+        """Fecha todas as conexões abertas pelo pool (de todas as threads)."""
+        with self._lock:
+            conexoes, self._conexoes = self._conexoes, []
+        for conn in conexoes:
+            try: conn.close()
+            except sqlite3.Error: pass
+        self._local = threading.local()
+
+_pool = ConnectionPool(DB_FILE)
+atexit.register(_pool.close_all)
+
+def get_connection():
+    """Atalho para `with get_connection() as conn:` usando o pool padrão do módulo."""
+    return _pool.conexao()
+
+def close_connections():
+    _pool.close_all()
+
 def get_class_template(class_name: str) -> dict | None:
-    conn = None
     try:
-        conn = sqlite3.connect(DB_FILE)
-        conn.row_factory = sqlite3.Row
-        cur = conn.cursor()
-        sql = "SELECT * FROM Personagem WHERE lower(classe_personagem) = ? AND tipo_personagem = 'Jogador' LIMIT 1"
-        cur.execute(sql, (class_name.lower(),))
-        template = cur.fetchone()
-        return dict(template) if template else None
+        with get_connection() as conn:
+            template = conn.execute(SQL_CLASS_TEMPLATE, (class_name.lower(),)).fetchone()
+            return dict(template) if template else None
     except: return None
-    finally:
-        if conn: conn.close()
 
-# Em db_manager.py, substitua a função antiga por esta versão final
+def get_class_templates() -> list[dict]:
+    """Todos os modelos de classe jogável (as linhas 'Jogador' da tabela Personagem)."""
+    try:
+        with get_connection() as conn:
+            return [dict(r) for r in conn.execute(SQL_CLASS_TEMPLATES)]
+    except: return []
+
+def create_player_from_template(template: dict, nome: str) -> Jogador:
+    """Cria um Jogador novo a partir de um modelo de classe (ver get_class_template)."""
+    return Jogador(
+        id_entidade=template["id"], nome=nome, raca=template["raca"],
+        classe_personagem=template["classe_personagem"], nivel=template["nivel"],
+        pontos_vida_maximos=template["pontos_vida_maximos"],
+        pontos_mana_maximos=template["pontos_mana_maximos"],
+        atributos=json.loads(template["atributos"]), proficiencias=json.loads(template["proficiencias"]),
+        experiencia=template.get("experiencia", 0), alinhamento=template.get("alinhamento", "Neutro"),
+        nome_jogador=template.get("nome_jogador", "Jogador")
+    )
+
+def _armadura_from_row(r) -> Armadura:
+    return Armadura(
+        id_entidade=r["id"], nome=r["nome"], descricao=r["descricao"], peso=r["peso"],
+        valor_moedas=r["valor_moedas"], tipo_armadura=r["tipo_armadura"],
+        bonus_ca_base=r["bonus_ca_base"], requer_destreza_bonus=r["requer_destreza_bonus"],
+        max_bonus_destreza=r["max_bonus_destreza"], penalidade_furtividade=r["penalidade_furtividade"],
+        requisito_forca=r["requisito_forca"], 
+        # --- LINHA CORRIGIDA ---
+        bonus_pv=r["bonus_pv"] # Acessando diretamente, sem o .get()
+    )
+
+def _magia_from_row(r) -> Magia:
+    return Magia(
+        id_entidade=r["id"], nome=r["nome"], nivel_magia=r["nivel_magia"],
+        escola_magia=r["escola_magia"], tempo_conjuracao=r["tempo_conjuracao"],
+        alcance_magia=r["alcance_magia"], componentes=json.loads(r["componentes"]),
+        duracao_magia=r["duracao_magia"], descricao_efeito=r["descricao_efeito"],
+        requer_concentracao=r["requer_concentracao"], custo_mana=r["custo_mana"]
+    )
+
+def _arma_from_row(r) -> Arma:
+    return Arma(
+        id_entidade=r["id"], nome=r["nome"], descricao=r["descricao"], peso=r["peso"],
+        valor_moedas=r["valor_moedas"], tipo_dano=r["tipo_dano"],
+        dado_dano=r["dado_dano"], propriedades=json.loads(r["propriedades"]),
+        alcance=r["alcance"]
+    )
+
+class Catalog:
+    """
+    Cache em memória do conteúdo estático do jogo (armas, armaduras e magias).
+    Cada tabela é lida do banco uma única vez, na primeira consulta, e os objetos
+    resultantes são compartilhados por todas as telas e encontros.
+
+    É também o mapa de identidade do conteúdo: há uma única instância imutável (congelada) por
+    id, e ela sobrevive a `invalidate`/`reload_if_changed` enquanto a linha do banco não mudar.
+    Inventários e grimórios guardam essas instâncias, então comparar por identidade ou por id dá
+    o mesmo resultado, mesmo depois de recarregar o catálogo.
+
+    Tipos aceitos: "weapon", "armor" e "spell" (os mesmos usados pela selection_screen).
+    """
+    # tipo -> (consulta, construtor, atributo usado por get_by_type)
+    TABELAS = {
+        "weapon": (SQL_ALL_WEAPONS, _arma_from_row, "tipo_dano"),
+        "armor": (SQL_ALL_ARMORS, _armadura_from_row, "tipo_armadura"),
+        "spell": (SQL_ALL_SPELLS, _magia_from_row, "escola_magia"),
+    }
+
+    # tipo -> (página por chave, valores dos filtros); ver `page` e `filters`
+    PAGINAS = {
+        "weapon": (SQL_WEAPON_PAGE, SQL_WEAPON_FILTERS),
+        "armor": (SQL_ARMOR_PAGE, SQL_ARMOR_FILTERS),
+        "spell": (SQL_SPELL_PAGE, SQL_SPELL_FILTERS),
+    }
+    COM_NIVEL = {"spell"} # Tipos com o filtro `nivel` (armas e armaduras não têm nível)
+    # tipo -> (tipo no CatalogoBusca (ver migrations.faixa_busca), objetos por id, candidatos da busca, atributos de texto usados sem o FTS5)
+    BUSCAS = {
+        "weapon": ("Arma", SQL_WEAPONS_BY_IDS, SQL_WEAPON_SEARCH, ("descricao",)),
+        "armor": ("Armadura", SQL_ARMORS_BY_IDS, SQL_ARMOR_SEARCH, ("descricao",)),
+        "spell": ("Magia", SQL_SPELLS_BY_IDS, SQL_SPELL_SEARCH, ("descricao_efeito", "escola_magia")),
+    }
+    # grupo da CatalogoVersao (ver migrations.VERSOES_CATALOGO) -> tipos do cache que dependem dele
+    GRUPOS = {"item": ("weapon", "armor"), "magia": ("spell",), "monstro": ("monster",)}
+
+    def __init__(self, pool: ConnectionPool, intervalo_verificacao: float = 1.0):
+        self._pool = pool
+        # Intervalo mínimo (em segundos) entre duas leituras dos contadores de alteração
+        self.intervalo_verificacao = intervalo_verificacao
+        self._lock = threading.RLock()
+        self._por_id: dict[str, dict[int, Any]] = {}
+        self._por_nome: dict[str, dict[str, Any]] = {}
+        self._por_tipo: dict[str, dict[str, list]] = {}
+        # Monstros ordenados por nível: listas paralelas de níveis e ids (para bisect)
+        self._monstros: tuple[list[int], list[int]] | None = None
+        # (tipo, id) -> (linha do banco, instância): reaproveitada se a linha for igual
+        self._instancias: dict[tuple[str, int], tuple[tuple, Any]] = {}
+        self._versoes: dict[str, int] | None = None # Lidas na primeira verificação, depois que o pool migrou o banco
+        self._proxima_verificacao = 0.0
+        self._tem_indice_busca: bool | None = None # O banco tem o CatalogoBusca (FTS5)? Verificado na primeira busca
+
+    def _ler_versoes(self) -> dict[str, int] | None:
+        try:
+            with self._pool.conexao() as conn:
+                return {r["grupo"]: r["versao"] for r in conn.execute(SQL_CATALOG_VERSIONS)}
+        except sqlite3.Error: return None
+
+    def _carregar(self, kind: str):
+        if kind not in self.TABELAS: raise KeyError(f"Tipo de catálogo desconhecido: {kind}")
+        with self._lock:
+            if kind in self._por_id: return
+            sql, construtor, campo_tipo = self.TABELAS[kind]
+            with self._pool.conexao() as conn:
+                rows = conn.execute(sql).fetchall()
+            por_id, por_nome, por_tipo = {}, {}, {}
+            for r in rows:
+                obj = self._instancia(kind, r, construtor)
+                por_id[obj.id] = obj
+                por_nome[obj.nome.lower()] = obj
+                por_tipo.setdefault(str(getattr(obj, campo_tipo)).lower(), []).append(obj)
+            self._por_nome[kind] = por_nome; self._por_tipo[kind] = por_tipo
+            self._por_id[kind] = por_id # Por último: marca a tabela como carregada
+
+    def _instancia(self, kind: str, row, construtor: Callable, linha: tuple | None = None):
+        linha = tuple(row) if linha is None else linha
+        anterior = self._instancias.get((kind, row["id"]))
+        if anterior is not None and anterior[0] == linha: return anterior[1]
+        obj = construtor(row).congelar()
+        self._instancias[(kind, obj.id)] = (linha, obj)
+        return obj
+
+    def _tabela(self, kind: str) -> dict[int, Any]:
+        self.reload_if_changed()
+        if kind not in self._por_id: self._carregar(kind)
+        return self._por_id[kind]
+
+    def all(self, kind: str) -> list:
+        """Todos os objetos de um tipo, na ordem do banco. A lista é nova; os objetos são compartilhados."""
+        return list(self._tabela(kind).values())
+
+    def get(self, kind: str, id_entidade: int):
+        return self._tabela(kind).get(id_entidade)
+
+    def get_by_name(self, kind: str, nome: str):
+        self._tabela(kind)
+        return self._por_nome[kind].get(nome.lower())
+
+    def get_by_type(self, kind: str, tipo: str) -> list:
+        self._tabela(kind)
+        return list(self._por_tipo[kind].get(tipo.lower(), []))
+
+    def _filtros(self, kind: str, tipo: str | None, nivel: int | None, custo_max: int | None) -> tuple:
+        """Parâmetros dos filtros nas consultas de página e de busca de `kind`."""
+        if kind in self.COM_NIVEL: return (tipo, tipo, nivel, nivel, custo_max, custo_max)
+        if nivel is not None: raise ValueError(f"O filtro 'nivel' só existe para {', '.join(sorted(self.COM_NIVEL))}, não para '{kind}'")
+        return (tipo, tipo, custo_max, custo_max)
+
+    def page(self, kind: str, depois_id: int = 0, limite: int = 20, tipo: str | None = None,
+             nivel: int | None = None, custo_max: int | None = None) -> list:
+        """
+        Até `limite` objetos de `kind` com id maior que `depois_id`, em ordem de id, lidos direto do banco
+        (sem carregar a tabela inteira). Filtros None não restringem; `nivel` só existe para magias
+        (ValueError nos outros tipos, em vez de uma página sempre vazia).
+        Os objetos passam pelo mapa de identidade: são as mesmas instâncias de `all`/`get`.
+        """
+        if kind not in self.PAGINAS: raise KeyError(f"Tipo de catálogo desconhecido: {kind}")
+        tipo = tipo.lower() if tipo is not None else None
+        with self._pool.conexao() as conn:
+            rows = conn.execute(self.PAGINAS[kind][0], (depois_id, *self._filtros(kind, tipo, nivel, custo_max), limite)).fetchall()
+        construtor = self.TABELAS[kind][1]
+        with self._lock: return [self._instancia(kind, r, construtor) for r in rows]
+
+    def filters(self, kind: str) -> dict[str, list]:
+        """Valores distintos de cada filtro de `page` ("tipo", "nivel", "custo"), em ordem crescente."""
+        if kind not in self.PAGINAS: raise KeyError(f"Tipo de catálogo desconhecido: {kind}")
+        filtros = {"tipo": [], "nivel": [], "custo": []}
+        with self._pool.conexao() as conn:
+            for filtro, valor in conn.execute(self.PAGINAS[kind][1]):
+                if valor is not None: filtros[filtro].append(valor)
+        return filtros
+
+    def search(self, texto: str, kinds: tuple[str, ...] | None = None, limite: int = 20, tipo: str | None = None,
+               nivel: int | None = None, custo_max: int | None = None) -> list:
+        """
+        Até `limite` objetos de `kinds` (todos os tipos, se None) que contêm `texto`, do mais relevante para o menos.
+        Cada palavra digitada vale como prefixo ("esp lon" acha "Espada Longa"), sem diferenciar acentos nem
+        maiúsculas, e todas precisam aparecer no nome, na descrição ou na escola. Os filtros são os mesmos de `page`.
+
+        O custo é limitado, com ou sem filtros: lê de cada tipo até 2*`limite` candidatos (ou `limite`, buscando em
+        vários tipos) que casam pelo nome, completa com os que casam pela descrição/escola se faltar, e ordena esse
+        conjunto com `_relevancia`. Entre muitos resultados, os candidatos são os primeiros do índice (os de menor id),
+        não os mais relevantes de todo o catálogo; cada tecla a mais estreita a busca. Um filtro que quase nada satisfaz
+        (ex.: custo_max abaixo do preço de quase todos os itens) faz a leitura percorrer o índice até achar os
+        candidatos: essa busca fica fora da meta de 1 ms por tecla (alguns ms com 60 mil itens, ver bench_search).
+        """
+        kinds = tuple(self.PAGINAS) if kinds is None else tuple(kinds)
+        for kind in kinds:
+            if kind not in self.BUSCAS: raise KeyError(f"Tipo de catálogo desconhecido: {kind}")
+            self._filtros(kind, tipo, nivel, custo_max) # ValueError se `nivel` vier para um tipo sem nível
+        termos = re.findall(r"\w+", texto.lower())
+        if not termos or not kinds or limite <= 0: return []
+        if self._tem_indice_busca is None:
+            with self._pool.conexao() as conn: self._tem_indice_busca = conn.execute(SQL_HAS_SEARCH_INDEX).fetchone() is not None
+        tipo = tipo.lower() if tipo is not None else None
+        if not self._tem_indice_busca:
+            return self._buscar_sem_indice(termos, kinds, limite, tipo, nivel, custo_max)
+        expressao = " ".join(f'"{termo}"*' for termo in termos)
+        termos = [_sem_acentos(termo) for termo in termos]
+        filtrar = tipo is not None or nivel is not None or custo_max is not None
+        por_codigo = {migrations.CODIGOS_BUSCA[self.BUSCAS[kind][0]]: kind for kind in kinds}
+        por_tipo = max(limite, 2 * limite // len(kinds)) # Candidatos lidos de cada tipo
+        with self._pool.conexao() as conn:
+            # rowid -> (relevância, rowid); na segunda etapa entram os que só casam pela descrição/escola
+            candidatos: dict[int, tuple] = {}
+            for etapa, expressao_fts in enumerate((f"{{nome}} : ({expressao})", expressao)):
+                if etapa and len(candidatos) >= limite: break
+                for kind in kinds:
+                    if filtrar: sql, params = self.BUSCAS[kind][2], (expressao_fts, *self._filtros(kind, tipo, nivel, custo_max), por_tipo)
+                    else: sql, params = SQL_SEARCH_CANDIDATES, (expressao_fts, *migrations.faixa_busca(self.BUSCAS[kind][0]), por_tipo)
+                    for rowid, nome in conn.execute(sql, params):
+                        if rowid not in candidatos: candidatos[rowid] = (_relevancia(nome, termos, etapa == 0), rowid)
+            melhores = [rowid for _, rowid in sorted(candidatos.values())[:limite]]
+            ids_por_tipo: dict[str, list[int]] = {}
+            for rowid in melhores: ids_por_tipo.setdefault(por_codigo[rowid >> migrations.BITS_ID_BUSCA], []).append(rowid & _MASCARA_ID_BUSCA)
+            objetos = {}
+            for kind, ids in ids_por_tipo.items():
+                rows = conn.execute(self.BUSCAS[kind][1], (json.dumps(ids),)).fetchall()
+                construtor = self.TABELAS[kind][1]
+                with self._lock:
+                    for r in rows: objetos[(kind, r["id"])] = self._instancia(kind, r, construtor)
+        chaves = [(por_codigo[rowid >> migrations.BITS_ID_BUSCA], rowid & _MASCARA_ID_BUSCA) for rowid in melhores]
+        return [objetos[chave] for chave in chaves if chave in objetos]
+
+    def _buscar_sem_indice(self, termos: list[str], kinds: tuple[str, ...], limite: int, tipo, nivel, custo_max) -> list:
+        """Busca equivalente para bancos sem FTS5: percorre as páginas filtradas e compara prefixos em Python."""
+        termos = [_sem_acentos(termo) for termo in termos]
+        achados = []
+        for kind in kinds:
+            atributos = self.BUSCAS[kind][3]
+            depois_id = 0
+            while True:
+                pagina = self.page(kind, depois_id, 500, tipo, nivel, custo_max)
+                for obj in pagina:
+                    nome = _palavras(obj.nome)
+                    palavras = nome + [p for atributo in atributos for p in _palavras(getattr(obj, atributo))]
+                    if all(any(p.startswith(termo) for p in palavras) for termo in termos):
+                        pelo_nome = all(any(p.startswith(termo) for p in nome) for termo in termos)
+                        achados.append(((_relevancia(obj.nome, termos, pelo_nome), obj.id), obj))
+                if len(pagina) < 500: break
+                depois_id = pagina[-1].id
+        achados.sort(key=lambda achado: achado[0])
+        return [obj for _, obj in achados[:limite]]
+
+    def _indice_monstros(self) -> tuple[list[int], list[int]]:
+        self.reload_if_changed()
+        indice = self._monstros
+        if indice is None:
+            with self._lock, self._pool.conexao() as conn:
+                rows = conn.execute(SQL_MONSTER_INDEX).fetchall()
+                indice = self._monstros = ([r["nivel"] for r in rows], [r["id"] for r in rows])
+        return indice
+
+    def monster_ids(self, nivel_range: tuple[int, int] | None = None) -> list[int]:
+        """Ids de todos os monstros (opcionalmente só os do intervalo de níveis), ordenados por nível."""
+        niveis, ids = self._indice_monstros()
+        if nivel_range is None: return list(ids)
+        return ids[bisect.bisect_left(niveis, nivel_range[0]):bisect.bisect_right(niveis, nivel_range[1])]
+
+    def sample_monster_ids(self, n: int, nivel_range: tuple[int, int] | None = None,
+                           peso: Callable[[int], float] | None = None) -> list[int]:
+        """
+        Sorteia `n` ids de monstros (com reposição) cujo nível está em `nivel_range` (inclusivo).
+        Sem `peso`, o custo não depende do tamanho da tabela: o intervalo de níveis é localizado
+        por busca binária e cada sorteio é um índice aleatório. Com `peso` (nível -> peso),
+        os monstros do intervalo são sorteados proporcionalmente ao peso do seu nível.
+        """
+        niveis, ids = self._indice_monstros()
+        inicio, fim = 0, len(ids)
+        if nivel_range is not None:
+            inicio = bisect.bisect_left(niveis, nivel_range[0])
+            fim = bisect.bisect_right(niveis, nivel_range[1])
+        if n <= 0 or inicio >= fim: return []
+        if peso is None:
+            return [ids[random.randrange(inicio, fim)] for _ in range(n)]
+        return random.choices(ids[inicio:fim], weights=[peso(nivel) for nivel in niveis[inicio:fim]], k=n)
+
+    def invalidate(self, kind: str | None = None):
+        """Descarta o cache de um tipo (ou de todos); a próxima consulta relê o banco."""
+        with self._lock:
+            if kind is None or kind == "monster": self._monstros = None
+            for cache in (self._por_id, self._por_nome, self._por_tipo):
+                if kind is None: cache.clear()
+                else: cache.pop(kind, None)
+
+    def reload_if_changed(self) -> bool:
+        """
+        Invalida os tipos cujas tabelas mudaram desde a última verificação (por esta ou por outra conexão),
+        comparando os contadores da CatalogoVersao; gravar personagens do jogador não invalida nada.
+        Os contadores são lidos no máximo uma vez a cada `intervalo_verificacao` segundos.
+        """
+        agora = time.monotonic()
+        if agora < self._proxima_verificacao: return False
+        self._proxima_verificacao = agora + self.intervalo_verificacao
+        versoes = self._ler_versoes()
+        if versoes is None: return False # Banco sem a migração 6: o cache vale até um `invalidate` explícito
+        anteriores, self._versoes = self._versoes, versoes
+        if anteriores is None or anteriores == versoes: return False
+        for grupo, versao in versoes.items():
+            if anteriores.get(grupo) != versao:
+                for kind in self.GRUPOS.get(grupo, ()): self.invalidate(kind)
+        return True
+
+catalog = Catalog(_pool)
 
 def get_all_armors() -> list[Armadura]:
-    conn = None
     try:
-        conn = sqlite3.connect(DB_FILE)
-        conn.row_factory = sqlite3.Row
-        cur = conn.cursor()
-        sql = "SELECT * FROM Item i JOIN Armadura a ON i.id = a.item_id WHERE i.tipo_item = 'Armadura'"
-        cur.execute(sql)
-        rows = cur.fetchall()
-        
-        armaduras = []
-        for r in rows:
-            armadura_obj = Armadura(
-                id_entidade=r["id"], nome=r["nome"], descricao=r["descricao"], peso=r["peso"],
-                valor_moedas=r["valor_moedas"], tipo_armadura=r["tipo_armadura"],
-                bonus_ca_base=r["bonus_ca_base"], requer_destreza_bonus=r["requer_destreza_bonus"],
-                max_bonus_destreza=r["max_bonus_destreza"], penalidade_furtividade=r["penalidade_furtividade"],
-                requisito_forca=r["requisito_forca"], 
-                # --- LINHA CORRIGIDA ---
-                bonus_pv=r["bonus_pv"] # Acessando diretamente, sem o .get()
-            )
-            armaduras.append(armadura_obj)
-        return armaduras
-        
+        return catalog.all("armor")
     except Exception as e:
         # Mantemos o bloco de exceção para capturar outros possíveis erros futuros
         print("\n" + "="*50)
@@ -54,71 +495,66 @@ def get_all_armors() -> list[Armadura]:
         traceback.print_exc()
         print("="*50 + "\n")
         return []
-    finally:
-        if conn: conn.close()
 
 def get_all_spells() -> list[Magia]:
-    conn = None
-    try:
-        conn = sqlite3.connect(DB_FILE)
-        conn.row_factory = sqlite3.Row
-        cur = conn.cursor()
-        sql = "SELECT * FROM Magia"
-        cur.execute(sql)
-        rows = cur.fetchall()
-        return [Magia(
-            id_entidade=r["id"], nome=r["nome"], nivel_magia=r["nivel_magia"],
-            escola_magia=r["escola_magia"], tempo_conjuracao=r["tempo_conjuracao"],
-            alcance_magia=r["alcance_magia"], componentes=json.loads(r["componentes"]),
-            duracao_magia=r["duracao_magia"], descricao_efeito=r["descricao_efeito"],
-            requer_concentracao=r["requer_concentracao"], custo_mana=r["custo_mana"]
-        ) for r in rows]
+    try: return catalog.all("spell")
     except: return []
-    finally:
-        if conn: conn.close()
 
 def get_all_weapons() -> list[Arma]:
-    conn = None
-    try:
-        conn = sqlite3.connect(DB_FILE)
-        conn.row_factory = sqlite3.Row
-        cur = conn.cursor()
-        sql = "SELECT * FROM Item i JOIN Arma a ON i.id = a.item_id WHERE i.tipo_item = 'Arma'"
-        cur.execute(sql)
-        rows = cur.fetchall()
-        return [Arma(
-            id_entidade=r["id"], nome=r["nome"], descricao=r["descricao"], peso=r["peso"],
-            valor_moedas=r["valor_moedas"], tipo_dano=r["tipo_dano"],
-            dado_dano=r["dado_dano"], propriedades=json.loads(r["propriedades"]),
-            alcance=r["alcance"]
-        ) for r in rows]
+    try: return catalog.all("weapon")
     except: return []
-    finally:
-        if conn: conn.close()
 
-def get_random_enemy() -> NPC | None:
-    conn = None
-    try:
-        conn = sqlite3.connect(DB_FILE)
-        conn.row_factory = sqlite3.Row
-        cur = conn.cursor()
-        sql = "SELECT * FROM Personagem p JOIN NPC n ON p.id = n.personagem_id WHERE n.tipo_npc = 'Monstro' ORDER BY RANDOM() LIMIT 1"
-        cur.execute(sql)
-        row = cur.fetchone()
-        if row:
-            enemy = NPC(
-                id_entidade=row["id"], nome=row["nome"], raca=row["raca"],
-                classe_personagem=row["classe_personagem"], nivel=row["nivel"],
-                pontos_vida_maximos=row["pontos_vida_maximos"],
-                pontos_mana_maximos=row["pontos_mana_maximos"],
-                atributos=json.loads(row["atributos"]),
-                proficiencias=json.loads(row["proficiencias"]),
-                tipo=row["tipo_npc"], comportamento=row["comportamento"], dialogo=row["dialogo"]
-            )
-            enemy.pontos_vida_atuais = row["pontos_vida_atuais"]
-            enemy.pontos_mana_atuais = row["pontos_mana_atuais"]
-            return enemy
-        return None
-    except: return None
-    finally:
-        if conn: conn.close()
\ No newline at end of file
+def get_catalog_page(kind: str, depois_id: int = 0, limite: int = 20, tipo: str | None = None,
+                     nivel: int | None = None, custo_max: int | None = None) -> list:
+    """Uma página de armas, armaduras ou magias (ver Catalog.page). Em caso de erro, a página vem vazia."""
+    try: return catalog.page(kind, depois_id, limite, tipo, nivel, custo_max)
+    except ValueError: raise # Filtro que não existe para o tipo: erro de quem chama, não do banco
+    except: return []
+
+def get_catalog_filters(kind: str) -> dict[str, list]:
+    try: return catalog.filters(kind)
+    except: return {"tipo": [], "nivel": [], "custo": []}
+
+def search_catalog(query: str, kinds: tuple[str, ...] | None = None, limit: int = 20, **filtros) -> list:
+    """Busca textual ordenada por relevância em armas, armaduras e magias (ver Catalog.search)."""
+    try: return catalog.search(query, kinds, limit, **filtros)
+    except ValueError: raise
+    except: return []
+
+def _npc_from_row(row) -> NPC:
+    enemy = NPC(
+        id_entidade=row["id"], nome=row["nome"], raca=row["raca"],
+        classe_personagem=row["classe_personagem"], nivel=row["nivel"],
+        pontos_vida_maximos=row["pontos_vida_maximos"],
+        pontos_mana_maximos=row["pontos_mana_maximos"],
+        atributos=json.loads(row["atributos"]),
+        proficiencias=json.loads(row["proficiencias"]),
+        tipo=row["tipo_npc"], comportamento=row["comportamento"], dialogo=row["dialogo"]
+    )
+    enemy.pontos_vida_atuais = row["pontos_vida_atuais"]
+    enemy.pontos_mana_atuais = row["pontos_mana_atuais"]
+    return enemy
+
+def get_random_enemies(n: int, nivel_range: tuple[int, int] | None = None,
+                       peso: Callable[[int], float] | None = None) -> list[NPC]:
+    """
+    Monta uma onda de `n` inimigos sorteados (ver Catalog.sample_monster_ids) com uma única consulta.
+    Cada inimigo é um objeto novo, mesmo quando o mesmo monstro é sorteado mais de uma vez.
+    """
+    try: return get_enemies_by_ids(catalog.sample_monster_ids(n, nivel_range, peso))
+    except: return []
+
+def get_enemies_by_ids(ids: list[int]) -> list[NPC]:
+    """Um NPC novo para cada id (ids repetidos geram objetos distintos), com uma única consulta."""
+    if not ids: return []
+    with get_connection() as conn:
+        rows = {row["id"]: row for row in conn.execute(SQL_ENEMIES_BY_IDS, (json.dumps(sorted(set(ids))),))}
+    return [_npc_from_row(rows[i]) for i in ids if i in rows]
+
+def get_all_monsters(nivel_range: tuple[int, int] | None = None) -> list[NPC]:
+    try: return get_enemies_by_ids(catalog.monster_ids(nivel_range))
+    except: return []
+
+def get_random_enemy(nivel_range: tuple[int, int] | None = None) -> NPC | None:
+    enemies = get_random_enemies(1, nivel_range)
+    return enemies[0] if enemies else None
\ No newline at end of file
@@ -0,0 +1,130 @@
+# dice.py
+#
+# Motor de rolagem de dados. Uma notação ("1d8", "2d6+3", "1d8+1d4-1", "4d6kh3") é
+# compilada uma única vez e fica em cache; depois disso cada rolagem só sorteia números.
+#
+# Sintaxe aceita:
+#   NdX        N dados de X faces (N omitido = 1)
+#   NdXkhK     mantém os K maiores (ex.: 2d20kh1 = vantagem)
+#   NdXklK     mantém os K menores (ex.: 2d20kl1 = desvantagem)
+#   +C / -C    modificador constante
+# Texto em volta é ignorado quando a notação está entre parênteses, como em "Versátil (1d10)".
+
+import random
+import re
+from functools import lru_cache
+
+try:
+    import numpy as np
+except ImportError: # NumPy é opcional: sem ele as rolagens em lote usam Python puro
+    np = None
+
+_TERMO = re.compile(r"([+-]?)(?:(\d*)d(\d+)(?:(kh|kl)(\d+))?|(\d+))")
+_PARENTESES = re.compile(r"\(([^()]*)\)")
+
+class TermoDados:
+    """Um grupo de dados iguais dentro da expressão, ex.: o '-2d6kh1' de '1d20-2d6kh1'."""
+    __slots__ = ("quantidade", "faces", "sinal", "manter", "manter_maiores")
+
+    def __init__(self, quantidade: int, faces: int, sinal: int = 1, manter: int | None = None, manter_maiores: bool = True):
+        self.quantidade = quantidade; self.faces = faces; self.sinal = sinal
+        self.manter = manter; self.manter_maiores = manter_maiores
+
+    def rolar(self, sorteio) -> int:
+        """Rola o termo usando `sorteio` (uma função como random.random)."""
+        faces = self.faces
+        if self.manter is None:
+            total = self.quantidade # soma de int(sorteio() * faces) + 1 para cada dado
+            for _ in range(self.quantidade): total += int(sorteio() * faces)
+            return self.sinal * total
+        rolagens = sorted((int(sorteio() * faces) + 1 for _ in range(self.quantidade)), reverse=self.manter_maiores)
+        return self.sinal * sum(rolagens[:self.manter])
+
+    def rolar_lote(self, n: int, gerador):
+        """Versão vetorizada (NumPy): retorna um array com `n` resultados."""
+        rolagens = gerador.integers(1, self.faces + 1, size=(n, self.quantidade))
+        if self.manter is not None:
+            rolagens.sort(axis=1)
+            rolagens = rolagens[:, -self.manter:] if self.manter_maiores else rolagens[:, :self.manter]
+        return self.sinal * rolagens.sum(axis=1)
+
+class ExpressaoDados:
+    """Expressão de dados já compilada. Obtenha instâncias por `compilar(notacao)`."""
+    __slots__ = ("notacao", "termos", "constante")
+
+    def __init__(self, notacao: str, termos: list[TermoDados], constante: int):
+        self.notacao = notacao; self.termos = tuple(termos); self.constante = constante
+
+    def __repr__(self): return f"ExpressaoDados({self.notacao!r})"
+
+    @property
+    def minimo(self) -> int:
+        return self.constante + sum(t.sinal * (t.manter or t.quantidade) * (1 if t.sinal > 0 else t.faces) for t in self.termos)
+
+    @property
+    def maximo(self) -> int:
+        return self.constante + sum(t.sinal * (t.manter or t.quantidade) * (t.faces if t.sinal > 0 else 1) for t in self.termos)
+
+    def _rolar_uma(self, sorteio) -> int:
+        total = self.constante
+        for termo in self.termos: total += termo.rolar(sorteio)
+        return total
+
+    def rolar(self, vantagem: bool = False, desvantagem: bool = False, rng: random.Random | None = None) -> int:
+        """
+        Rola a expressão uma vez. Com vantagem (ou desvantagem) a expressão inteira é rolada
+        duas vezes e fica o maior (ou menor) resultado; as duas juntas se anulam.
+        """
+        sorteio = rng.random if rng is not None else random.random
+        if vantagem == desvantagem: return self._rolar_uma(sorteio)
+        a, b = self._rolar_uma(sorteio), self._rolar_uma(sorteio)
+        return max(a, b) if vantagem else min(a, b)
+
+    def rolar_lote(self, n: int, vantagem: bool = False, desvantagem: bool = False, seed: int | None = None):
+        """
+        Rola a expressão `n` vezes de uma só vez. Com NumPy disponível retorna um `numpy.ndarray`
+        de inteiros gerado sem laço em Python; sem NumPy retorna uma `list[int]`.
+        """
+        if np is None:
+            rng = random.Random(seed) if seed is not None else None
+            return [self.rolar(vantagem, desvantagem, rng) for _ in range(n)]
+        gerador = np.random.default_rng(seed)
+        def lote():
+            total = np.full(n, self.constante, dtype=np.int64)
+            for termo in self.termos: total += termo.rolar_lote(n, gerador)
+            return total
+        if vantagem == desvantagem: return lote()
+        return np.maximum(lote(), lote()) if vantagem else np.minimum(lote(), lote())
+
+def _normalizar(notacao: str) -> str:
+    texto = notacao.lower()
+    dentro = _PARENTESES.findall(texto)
+    if dentro: texto = dentro[-1]
+    return re.sub(r"\s*([+-])\s*", r"\1", texto).strip()
+
+@lru_cache(maxsize=1024)
+def compilar(notacao: str) -> ExpressaoDados:
+    """Compila (e guarda em cache) uma notação de dados. Lança ValueError se ela for inválida."""
+    texto = _normalizar(notacao)
+    termos, constante, pos = [], 0, 0
+    while pos < len(texto):
+        m = _TERMO.match(texto, pos)
+        if not m or m.end() == pos or (pos > 0 and not m.group(1)):
+            raise ValueError(f"Notação de dados inválida: {notacao!r}")
+        sinal = -1 if m.group(1) == "-" else 1
+        if m.group(6) is not None:
+            constante += sinal * int(m.group(6))
+        else:
+            quantidade, faces = int(m.group(2) or 1), int(m.group(3))
+            manter = int(m.group(5)) if m.group(4) else None
+            if quantidade < 1 or faces < 1 or (manter is not None and not 1 <= manter <= quantidade):
+                raise ValueError(f"Notação de dados inválida: {notacao!r}")
+            termos.append(TermoDados(quantidade, faces, sinal, manter, m.group(4) != "kl"))
+        pos = m.end()
+    if not termos and not texto:
+        raise ValueError(f"Notação de dados inválida: {notacao!r}")
+    return ExpressaoDados(notacao, termos, constante)
+
+def rolar(notacao: str, vantagem: bool = False, desvantagem: bool = False) -> int:
+    """Atalho: compila (com cache) e rola uma vez."""
+    return compilar(notacao).rolar(vantagem, desvantagem)
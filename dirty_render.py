@@ -0,0 +1,57 @@
+# dirty_render.py
+#
+# Apoio ao modo de renderização por retângulos sujos ("dirty rects"): em vez de redesenhar
+# e enviar a tela inteira a cada quadro, só as regiões que mudaram vão para o display,
+# e telas paradas (menus) esperam por eventos sem redesenhar nada.
+
+import time
+from collections import deque
+import pygame
+
+IDLE_TIMEOUT_MS = 250 # Tempo máximo bloqueado esperando eventos numa tela parada
+
+# Eventos que obrigam uma tela estática a se redesenhar (tecla ou janela exposta/restaurada)
+REDRAW_EVENTS = {pygame.KEYDOWN, pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED, pygame.WINDOWRESTORED, pygame.WINDOWSHOWN}
+
+class FrameStats:
+    """Tempo de renderização e área enviada ao display por quadro (para comparar os modos)."""
+    def __init__(self, area_tela: int, limite: int = 600):
+        self.area_tela = area_tela
+        self.tempos_ms: deque[float] = deque(maxlen=limite); self.pixels: deque[int] = deque(maxlen=limite)
+
+    def registrar(self, inicio: float, pixels: int):
+        self.tempos_ms.append((time.perf_counter() - inicio) * 1000); self.pixels.append(pixels)
+
+    def resumo(self) -> dict:
+        if not self.tempos_ms: return {"quadros": 0}
+        ordenados = sorted(self.tempos_ms)
+        return {
+            "quadros": len(ordenados),
+            "render_media_ms": sum(ordenados) / len(ordenados),
+            "render_p95_ms": ordenados[min(len(ordenados) - 1, int(len(ordenados) * 0.95))],
+            "fracao_tela_enviada": sum(self.pixels) / (len(self.pixels) * self.area_tela) if self.area_tela else 0.0,
+        }
+
+def present(rects: list[pygame.Rect] | None, stats: FrameStats | None = None, inicio: float | None = None):
+    """
+    Envia o quadro ao display: `rects=None` envia a tela inteira (flip); uma lista envia só
+    aquelas regiões. Se `stats` for passado, registra o tempo desde `inicio` e a área enviada.
+    """
+    if rects is None:
+        pygame.display.flip()
+        pixels = stats.area_tela if stats else 0
+    else:
+        if rects: pygame.display.update(rects)
+        pixels = sum(r.width * r.height for r in rects) if stats else 0
+    if stats is not None and inicio is not None: stats.registrar(inicio, pixels)
+
+def wait_for_events(bloquear: bool, timeout_ms: int = IDLE_TIMEOUT_MS) -> list:
+    """
+    Retorna os eventos pendentes. Com `bloquear`, dorme até chegar um evento (ou até o timeout),
+    o que deixa telas estáticas praticamente sem uso de CPU.
+    """
+    eventos = pygame.event.get()
+    if eventos or not bloquear: return eventos
+    evento = pygame.event.wait(timeout_ms)
+    if evento.type == pygame.NOEVENT: return []
+    return [evento] + pygame.event.get()
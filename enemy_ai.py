@@ -0,0 +1,179 @@
+# enemy_ai.py
+#
+# IA dos inimigos em lote: posições, tempos de recarga e células da grade de todos os inimigos
+# ficam em arrays, e cada passo da simulação move todo mundo em direção ao alvo, afasta os
+# inimigos sobrepostos e decide quem ataca com operações vetorizadas, em vez de um update()
+# em Python por sprite. Só os sprites que mudaram de pixel têm o rect reescrito, e só os que
+# mudaram de célula são reposicionados na grade espacial.
+# Não depende do pygame: os sprites só precisam ter `.rect` (center, width, height).
+
+import math
+
+try:
+    import numpy as np
+except ImportError: # NumPy é opcional: sem ele o passo usa laços em Python puro
+    np = None
+
+_DESLOCAMENTO_CELULA = 1 << 20 # Mantém as coordenadas de célula positivas ao montar a chave única
+
+class EnemySwarm:
+    """
+    Inimigos que perseguem um alvo e atacam quando estão a até `alcance_ataque` dele.
+    `velocidade` em pixels por segundo; os inimigos param a `distancia_parada` do alvo e são
+    mantidos a pelo menos `separacao` pixels uns dos outros (0 desliga a separação).
+    Cada inimigo só ataca de novo depois de `intervalo_ataque_ms` (o primeiro ataque também espera).
+    Se `grade` (um SpatialHash) for passada, os inimigos são inseridos, mantidos e removidos dela.
+    Com um `campo` (FlowField já atualizado para o alvo) os inimigos seguem o caminho do campo e
+    só andam em linha reta nas duas últimas células; sem ele, vão sempre em linha reta.
+    """
+    def __init__(self, velocidade: float, intervalo_ataque_ms: float, alcance_ataque: float,
+                 distancia_parada: float = 0.0, separacao: float = 0.0, grade=None, campo=None, capacidade: int = 64):
+        self.velocidade = velocidade; self.intervalo_ataque_ms = intervalo_ataque_ms
+        self.alcance_ataque = alcance_ataque; self.distancia_parada = distancia_parada
+        self.separacao = separacao; self.grade = grade; self.campo = campo
+        self.sprites: list = []
+        if np is not None:
+            self.pos = np.zeros((capacidade, 2))              # centro em ponto flutuante
+            self.centro = np.zeros((capacidade, 2), np.int64) # centro do rect (pixels)
+            self.tamanho = np.zeros((capacidade, 2), np.int64)
+            self.celulas = np.zeros((capacidade, 4), np.int64) # x0, y0, x1, y1 na grade
+            self.recarga = np.zeros(capacidade)
+        else:
+            self.pos = []; self.recarga = []
+
+    def __len__(self) -> int: return len(self.sprites)
+    def __contains__(self, sprite) -> bool: return getattr(sprite, "indice_enxame", None) is not None
+
+    def _arrays(self) -> tuple:
+        return self.pos, self.centro, self.tamanho, self.celulas, self.recarga
+
+    def adicionar(self, sprite):
+        i = len(self.sprites)
+        self.sprites.append(sprite); sprite.indice_enxame = i
+        if self.grade is not None: self.grade.inserir(sprite)
+        x, y = sprite.rect.center
+        if np is None:
+            self.pos.append([float(x), float(y)]); self.recarga.append(float(self.intervalo_ataque_ms)); return
+        if i == len(self.recarga): # Dobra a capacidade dos arrays
+            self.pos, self.centro, self.tamanho, self.celulas, self.recarga = (np.concatenate((a, np.zeros_like(a))) for a in self._arrays())
+        self.pos[i] = (x, y); self.centro[i] = (x, y); self.tamanho[i] = sprite.rect.size
+        self.recarga[i] = self.intervalo_ataque_ms
+        if self.grade is not None: self.celulas[i] = self._celulas(self.centro[i:i + 1], self.tamanho[i:i + 1])[0]
+
+    def remover(self, sprite):
+        """Remove em O(1): o último inimigo ocupa o lugar do removido."""
+        i = getattr(sprite, "indice_enxame", None)
+        if i is None: return
+        if self.grade is not None: self.grade.remover(sprite)
+        ultimo = len(self.sprites) - 1
+        if i != ultimo:
+            movido = self.sprites[ultimo]
+            self.sprites[i] = movido; movido.indice_enxame = i
+            if np is None: self.pos[i] = self.pos[ultimo]; self.recarga[i] = self.recarga[ultimo]
+            else:
+                for array in self._arrays(): array[i] = array[ultimo]
+        self.sprites.pop(); sprite.indice_enxame = None
+        if np is None: self.pos.pop(); self.recarga.pop()
+
+    def _celulas(self, centro, tamanho):
+        """Faixa de células (x0, y0, x1, y1) coberta por cada rect, com a mesma conta do SpatialHash."""
+        c = self.grade.tamanho_celula
+        topo_esq = centro - tamanho // 2
+        return np.concatenate((topo_esq // c, (topo_esq + tamanho - 1) // c), axis=1)
+
+    def _separar(self, pos):
+        """Afasta pares mais próximos que `separacao`, cada um metade da sobreposição (vetorizado)."""
+        n, d = len(pos), self.separacao
+        # Grade própria com células do tamanho da separação: vizinhos possíveis estão nas 3x3 células ao redor
+        celula = np.floor(pos / d).astype(np.int64) + _DESLOCAMENTO_CELULA
+        chave = celula[:, 0] * (2 * _DESLOCAMENTO_CELULA) + celula[:, 1]
+        ordem = np.argsort(chave, kind="stable"); chaves_ordenadas = chave[ordem]
+        vizinhas = (chave[:, None] + (np.arange(-1, 2)[:, None] * (2 * _DESLOCAMENTO_CELULA) + np.arange(-1, 2)).ravel()).ravel()
+        inicio = np.searchsorted(chaves_ordenadas, vizinhas, "left")
+        contagem = np.searchsorted(chaves_ordenadas, vizinhas, "right") - inicio
+        total = int(contagem.sum())
+        if total == 0: return
+        # Expande cada faixa [inicio, inicio + contagem) em pares (i, j) sem laço em Python
+        i = np.repeat(np.repeat(np.arange(n), 9), contagem)
+        j = ordem[np.repeat(inicio, contagem) + np.arange(total) - np.repeat(np.cumsum(contagem) - contagem, contagem)]
+        manter = i < j; i, j = i[manter], j[manter]
+        delta = pos[i] - pos[j]
+        distancia = np.hypot(delta[:, 0], delta[:, 1])
+        perto = distancia < d
+        if not perto.any(): return
+        i, j, delta, distancia = i[perto], j[perto], delta[perto], distancia[perto]
+        coincidentes = distancia == 0
+        delta[coincidentes] = (1.0, 0.0); distancia[coincidentes] = 1.0
+        empurrao = delta * ((d - np.where(coincidentes, 0.0, distancia)) / (2 * distancia))[:, None]
+        np.add.at(pos, i, empurrao); np.add.at(pos, j, -empurrao)
+
+    def step(self, dt: float, alvo: tuple[float, float]) -> list:
+        """Avança `dt` segundos perseguindo `alvo` e retorna os sprites que atacam neste passo."""
+        if not self.sprites: return []
+        if np is None: return self._step_python(dt, alvo)
+        n = len(self.sprites)
+        pos, recarga = self.pos[:n], self.recarga[:n]
+        delta = np.asarray(alvo, dtype=float) - pos
+        distancia = np.hypot(delta[:, 0], delta[:, 1])
+        passo = np.minimum(self.velocidade * dt, np.maximum(distancia - self.distancia_parada, 0.0))
+        direcao = delta / np.where(distancia > 0, distancia, 1.0)[:, None]
+        if self.campo is not None:
+            # Longe do alvo, a direção vem do campo de fluxo (uma leitura por inimigo)
+            campo = self.campo.direcoes_em(pos)
+            usar_campo = (distancia > 2 * self.campo.tamanho_celula) & campo.any(axis=1)
+            direcao[usar_campo] = campo[usar_campo]
+        pos += direcao * passo[:, None]
+        if self.separacao > 0 and n > 1: self._separar(pos)
+
+        recarga -= dt * 1000; np.maximum(recarga, 0.0, out=recarga)
+        prontos = np.flatnonzero((recarga <= 0) & (distancia - passo <= self.alcance_ataque))
+        recarga[prontos] = self.intervalo_ataque_ms
+
+        # Só reescreve o rect de quem mudou de pixel, e só mexe na grade para quem mudou de célula
+        centro = np.rint(pos).astype(np.int64)
+        mudou = np.flatnonzero((centro != self.centro[:n]).any(axis=1))
+        if len(mudou):
+            self.centro[mudou] = centro[mudou]
+            sprites = self.sprites
+            for i, c in zip(mudou.tolist(), centro[mudou].tolist()): sprites[i].rect.center = c
+            if self.grade is not None:
+                celulas = self._celulas(centro[mudou], self.tamanho[mudou])
+                trocou = (celulas != self.celulas[mudou]).any(axis=1)
+                self.celulas[mudou[trocou]] = celulas[trocou]
+                for i in mudou[trocou].tolist(): self.grade.atualizar(sprites[i])
+        return [self.sprites[i] for i in prontos.tolist()]
+
+    def _step_python(self, dt: float, alvo: tuple[float, float]) -> list:
+        ax, ay = alvo; atacantes = []
+        maximo = self.velocidade * dt; decorrido = dt * 1000
+        for i, sprite in enumerate(self.sprites):
+            p = self.pos[i]; dx, dy = ax - p[0], ay - p[1]
+            distancia = math.hypot(dx, dy)
+            passo = min(maximo, max(distancia - self.distancia_parada, 0.0))
+            if passo > 0:
+                ux, uy = dx / distancia, dy / distancia
+                if self.campo is not None and distancia > 2 * self.campo.tamanho_celula:
+                    fx, fy = self.campo.direcao(p[0], p[1])
+                    if fx or fy: ux, uy = fx, fy
+                p[0] += ux * passo; p[1] += uy * passo
+            self.recarga[i] = max(self.recarga[i] - decorrido, 0.0)
+            if self.recarga[i] <= 0 and distancia - passo <= self.alcance_ataque:
+                self.recarga[i] = self.intervalo_ataque_ms; atacantes.append(sprite)
+        if self.separacao > 0:
+            d = self.separacao
+            for a in range(len(self.pos)):
+                pa = self.pos[a]
+                for b in range(a + 1, len(self.pos)):
+                    pb = self.pos[b]; dx, dy = pa[0] - pb[0], pa[1] - pb[1]
+                    distancia = math.hypot(dx, dy)
+                    if distancia >= d: continue
+                    if distancia == 0: dx, dy, distancia, sobra = 1.0, 0.0, 1.0, d
+                    else: sobra = d - distancia
+                    fator = sobra / (2 * distancia)
+                    pa[0] += dx * fator; pa[1] += dy * fator; pb[0] -= dx * fator; pb[1] -= dy * fator
+        for sprite, p in zip(self.sprites, self.pos):
+            centro = (round(p[0]), round(p[1]))
+            if sprite.rect.center != centro:
+                sprite.rect.center = centro
+                if self.grade is not None: self.grade.atualizar(sprite)
+        return atacantes
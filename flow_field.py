@@ -0,0 +1,104 @@
+# flow_field.py
+#
+# Campo de fluxo ("flow field") para perseguir um alvo numa grade: um Dijkstra a partir da
+# célula do alvo calcula a distância de todas as células até ele e, para cada célula, a direção
+# do vizinho mais próximo do alvo. Qualquer número de perseguidores lê sua direção em O(1),
+# e o campo só é recalculado quando o alvo muda de célula.
+# Não depende do pygame.
+
+import heapq
+import math
+
+try:
+    import numpy as np
+except ImportError: # NumPy é opcional: sem ele as direções ficam numa lista de tuplas
+    np = None
+
+_VIZINHOS = ((1, 0, 1.0), (-1, 0, 1.0), (0, 1, 1.0), (0, -1, 1.0),
+             (1, 1, math.sqrt(2)), (1, -1, math.sqrt(2)), (-1, 1, math.sqrt(2)), (-1, -1, math.sqrt(2)))
+
+class FlowField:
+    """
+    Grade de `largura` x `altura` pixels em células de `tamanho_celula`. Células em `bloqueadas`
+    (pares (coluna, linha)) não podem ser atravessadas; diagonais não cortam quinas bloqueadas.
+    Depois de `atualizar(alvo)`, `direcao(x, y)` é o vetor unitário a seguir a partir de (x, y)
+    ((0, 0) na célula do alvo ou numa célula sem caminho até ele).
+    """
+    def __init__(self, largura: int, altura: int, tamanho_celula: int = 32, bloqueadas=()):
+        self.tamanho_celula = tamanho_celula
+        self.colunas = max(1, math.ceil(largura / tamanho_celula)); self.linhas = max(1, math.ceil(altura / tamanho_celula))
+        self.bloqueadas = set(bloqueadas)
+        self.origem: tuple[int, int] | None = None
+        self.recalculos = 0
+        self.distancias = [math.inf] * (self.colunas * self.linhas)
+        if np is not None: self.direcoes = np.zeros((self.linhas, self.colunas, 2))
+        else: self.direcoes = [(0.0, 0.0)] * (self.colunas * self.linhas)
+        self._montar_vizinhanca()
+
+    def _montar_vizinhanca(self):
+        """Lista de adjacência (índice, custo, dx, dy) de cada célula, refeita só quando os bloqueios mudam."""
+        colunas, linhas, bloqueadas = self.colunas, self.linhas, self.bloqueadas
+        self._vizinhanca = []
+        for indice in range(colunas * linhas):
+            x, y = indice % colunas, indice // colunas
+            vizinhos = []
+            if (x, y) not in bloqueadas:
+                for dx, dy, custo in _VIZINHOS:
+                    nx, ny = x + dx, y + dy
+                    if not (0 <= nx < colunas and 0 <= ny < linhas) or (nx, ny) in bloqueadas: continue
+                    if dx and dy and ((x + dx, y) in bloqueadas or (x, y + dy) in bloqueadas): continue
+                    vizinhos.append((ny * colunas + nx, custo, dx, dy))
+            self._vizinhanca.append(vizinhos)
+
+    def bloquear(self, celulas, bloqueado: bool = True):
+        """Marca (ou desmarca) células como obstáculo e recalcula o campo na próxima atualização."""
+        if bloqueado: self.bloqueadas.update(celulas)
+        else: self.bloqueadas.difference_update(celulas)
+        self._montar_vizinhanca(); self.origem = None
+
+    def celula(self, x: float, y: float) -> tuple[int, int]:
+        return (min(max(int(x // self.tamanho_celula), 0), self.colunas - 1),
+                min(max(int(y // self.tamanho_celula), 0), self.linhas - 1))
+
+    def atualizar(self, alvo: tuple[float, float]) -> bool:
+        """Recalcula o campo se o alvo mudou de célula. Retorna True se recalculou."""
+        origem = self.celula(*alvo)
+        if origem == self.origem: return False
+        self.origem = origem; self._recalcular(origem[1] * self.colunas + origem[0])
+        return True
+
+    def _recalcular(self, origem: int):
+        self.recalculos += 1
+        distancias = [math.inf] * len(self._vizinhanca); distancias[origem] = 0.0
+        direcoes = [(0.0, 0.0)] * len(self._vizinhanca)
+        vizinhanca = self._vizinhanca
+        fila = [(0.0, origem)]
+        while fila:
+            distancia, indice = heapq.heappop(fila)
+            if distancia > distancias[indice]: continue
+            for vizinho, custo, dx, dy in vizinhanca[indice]:
+                nova = distancia + custo
+                if nova < distancias[vizinho]:
+                    # Quem chega ao vizinho por esta célula deve andar no sentido oposto ao da expansão
+                    distancias[vizinho] = nova; direcoes[vizinho] = (-dx / custo, -dy / custo)
+                    heapq.heappush(fila, (nova, vizinho))
+        self.distancias = distancias
+        if np is not None: self.direcoes[:] = np.array(direcoes).reshape(self.linhas, self.colunas, 2)
+        else: self.direcoes = direcoes
+
+    def distancia(self, x: float, y: float) -> float:
+        """Distância (em células) do caminho de (x, y) até o alvo; inf se não houver caminho."""
+        cx, cy = self.celula(x, y)
+        return self.distancias[cy * self.colunas + cx]
+
+    def direcao(self, x: float, y: float) -> tuple[float, float]:
+        cx, cy = self.celula(x, y)
+        if np is not None: dx, dy = self.direcoes[cy, cx]; return float(dx), float(dy)
+        return self.direcoes[cy * self.colunas + cx]
+
+    def direcoes_em(self, pos):
+        """Versão vetorizada de `direcao` (NumPy): `pos` é um array (n, 2); retorna (n, 2)."""
+        c = self.tamanho_celula
+        cx = np.clip((pos[:, 0] // c).astype(np.int64), 0, self.colunas - 1)
+        cy = np.clip((pos[:, 1] // c).astype(np.int64), 0, self.linhas - 1)
+        return self.direcoes[cy, cx]
@@ -0,0 +1,92 @@
+# frame_profiler.py
+#
+# Instrumentação por fase do game_loop: mede quanto de cada quadro vai para eventos, timers
+# (regeneração de mana, mensagens), colisão, atualização dos sprites, desenho, HUD e envio ao display.
+# Desligado, cada marcação é só uma chamada que testa um booleano e retorna.
+
+import csv
+import json
+import time
+from collections import deque
+
+FASES = ("eventos", "timers", "colisao", "update", "desenho", "hud", "flip")
+PERCENTIS = (50, 95, 99)
+
+def _percentil(valores_ordenados: list[float], p: float) -> float:
+    if not valores_ordenados: return 0.0
+    return valores_ordenados[min(len(valores_ordenados) - 1, int(round(p / 100 * (len(valores_ordenados) - 1))))]
+
+class FrameProfiler:
+    """
+    Uso por quadro: `iniciar_quadro()`, depois `marcar(fase)` ao fim de cada fase (o tempo desde a
+    marcação anterior é somado à fase, então uma fase pode ser marcada várias vezes no mesmo quadro,
+    como acontece com os passos da simulação) e por fim `fim_quadro()`.
+    Mantém uma janela móvel de `janela` quadros para os percentis e, enquanto ativo, o traço
+    completo por quadro (até `limite_traco` quadros) para exportar em CSV/JSON.
+    """
+    def __init__(self, fases: tuple[str, ...] = FASES, janela: int = 300, limite_traco: int = 100_000):
+        self.ativo = False
+        self.fases = fases
+        self._indice = {fase: i for i, fase in enumerate(fases)}
+        self._atual = [0.0] * len(fases)
+        self._ultimo = 0.0
+        self.janela: list[deque[float]] = [deque(maxlen=janela) for _ in fases]
+        self.totais: deque[float] = deque(maxlen=janela)
+        self.traco: deque[tuple[float, ...]] = deque(maxlen=limite_traco)
+        self.quadro = 0
+
+    def alternar(self) -> bool:
+        self.ativo = not self.ativo
+        return self.ativo
+
+    def iniciar_quadro(self):
+        if not self.ativo: return
+        self._atual = [0.0] * len(self.fases)
+        self._ultimo = time.perf_counter()
+
+    def marcar(self, fase: str):
+        if not self.ativo: return
+        agora = time.perf_counter()
+        self._atual[self._indice[fase]] += agora - self._ultimo
+        self._ultimo = agora
+
+    def fim_quadro(self):
+        if not self.ativo: return
+        tempos_ms = [t * 1000 for t in self._atual]
+        for janela, tempo in zip(self.janela, tempos_ms): janela.append(tempo)
+        total = sum(tempos_ms); self.totais.append(total)
+        self.traco.append((self.quadro, *tempos_ms, total))
+        self.quadro += 1
+
+    def resumo(self) -> dict[str, dict[str, float]]:
+        """{fase: {"p50": ms, "p95": ms, "p99": ms}} da janela móvel, incluindo "total"."""
+        resultado = {}
+        for nome, valores in zip(self.fases + ("total",), self.janela + [self.totais]):
+            ordenados = sorted(valores)
+            resultado[nome] = {f"p{p}": _percentil(ordenados, p) for p in PERCENTIS}
+        return resultado
+
+    def linhas_overlay(self) -> list[str]:
+        linhas = [f"{'fase':<8}{'p50':>7}{'p95':>7}{'p99':>7}  (ms)"]
+        for nome, p in self.resumo().items():
+            linhas.append(f"{nome:<8}{p['p50']:>7.2f}{p['p95']:>7.2f}{p['p99']:>7.2f}")
+        return linhas
+
+    def _cabecalho(self) -> list[str]:
+        return ["quadro", *(f"{fase}_ms" for fase in self.fases), "total_ms"]
+
+    def exportar_csv(self, caminho: str):
+        with open(caminho, "w", newline="", encoding="utf-8") as f:
+            escritor = csv.writer(f)
+            escritor.writerow(self._cabecalho())
+            escritor.writerows(self.traco)
+
+    def exportar_json(self, caminho: str):
+        cabecalho = self._cabecalho()
+        with open(caminho, "w", encoding="utf-8") as f:
+            json.dump({"fases": list(self.fases), "resumo": self.resumo(),
+                       "quadros": [dict(zip(cabecalho, linha)) for linha in self.traco]}, f, indent=1)
+
+    def limpar(self):
+        for janela in self.janela: janela.clear()
+        self.totais.clear(); self.traco.clear(); self.quadro = 0
@@ -0,0 +1,86 @@
+# headless.py
+#
+# Executa a simulação do jogo sem janela (driver de vídeo "dummy" do SDL) e sem esperar pelo
+# relógio: os passos de SIM_DT são encadeados o mais rápido que a CPU permitir. Serve para
+# testes automatizados, bots e para medir o custo da lógica isolado do custo de desenho.
+#
+# Uso: python headless.py [segundos_simulados] [classe] [inimigos]
+
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy") # Precisa vir antes do primeiro import do pygame
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import sys
+import time
+from typing import Callable
+import pygame
+
+import db_manager
+from rpg_model import Jogador, NPC
+from main_pygame import GameWorld, SIM_DT, MELEE_RANGE
+
+def bot_simples(world: GameWorld) -> list[str]:
+    """
+    Política de teste: anda em direção ao inimigo e, a cada meio segundo simulado,
+    ataca (se estiver no alcance ou tiver arma de distância) e tenta conjurar.
+    Retorna as ações do passo atual ("atacar", "conjurar").
+    """
+    inimigo = world.enemy_sprite
+    if inimigo is None or not inimigo.alive(): world.set_movement(0, 0); return []
+    px, py = world.player_sprite.rect.center; ix, iy = inimigo.rect.center
+    distancia = ((ix - px) ** 2 + (iy - py) ** 2) ** 0.5
+    if distancia > MELEE_RANGE * 0.8:
+        world.set_movement((ix > px) - (ix < px), (iy > py) - (iy < py))
+    else:
+        world.set_movement(0, 0)
+    if world.passos % max(1, round(0.5 / SIM_DT)): return []
+    return ["atacar", "conjurar"]
+
+def run_headless(jogador: Jogador, segundos: float, dt: float = SIM_DT,
+                 politica: Callable[[GameWorld], list[str]] | None = bot_simples,
+                 inimigos: NPC | list[NPC] | int = 1, parar_sem_inimigos: bool = True) -> dict:
+    """
+    Simula `segundos` de jogo em passos fixos de `dt` sem desenhar nada e retorna estatísticas:
+      segundos_simulados, passos, segundos_reais, velocidade (simulado / real),
+      inimigos_restantes, inimigo_derrotado (todos mortos) e jogador_derrotado.
+    `inimigos` é um NPC, uma lista deles ou a quantidade a sortear do banco.
+    `politica(world)` é chamada antes de cada passo e devolve as ações a executar.
+    A simulação para antes do fim se o jogador morrer.
+    """
+    pygame.init()
+    world = GameWorld(jogador, db_manager.get_random_enemies(inimigos) if isinstance(inimigos, int) else inimigos)
+    acoes = {"atacar": world.atacar, "conjurar": world.conjurar}
+    total_passos = int(round(segundos / dt))
+    inicio = time.perf_counter()
+    for _ in range(total_passos):
+        if politica is not None:
+            for acao in politica(world): acoes[acao]()
+        world.step(dt)
+        if world.jogador_derrotado or (parar_sem_inimigos and not world.enemy_group): break
+    decorrido = time.perf_counter() - inicio
+    simulado = world.tempo_ms / 1000
+    return {
+        "segundos_simulados": simulado, "passos": world.passos, "segundos_reais": decorrido,
+        "velocidade": simulado / decorrido if decorrido > 0 else float("inf"),
+        "inimigos_restantes": len(world.enemy_group), "inimigo_derrotado": not world.enemy_group,
+        "jogador_derrotado": world.jogador_derrotado,
+    }
+
+def main():
+    segundos = float(sys.argv[1]) if len(sys.argv) > 1 else 60.0
+    classe = sys.argv[2] if len(sys.argv) > 2 else "Guerreiro"
+    inimigos = int(sys.argv[3]) if len(sys.argv) > 3 else 1
+    template = db_manager.get_class_template(classe)
+    if not template: print(f"Classe '{classe}' não encontrada."); return
+    jogador = db_manager.create_player_from_template(template, "Bot")
+    armas = db_manager.get_all_weapons()
+    if armas: jogador.usar_item(armas[0])
+    magias = db_manager.get_all_spells()
+    if magias and classe.lower() == "mago": jogador.aprender_magia(magias[0])
+    resultado = run_headless(jogador, segundos, inimigos=inimigos, parar_sem_inimigos=False)
+    print(f"{resultado['segundos_simulados']:.1f}s simulados em {resultado['passos']} passos, "
+          f"{resultado['segundos_reais'] * 1000:.1f} ms reais ({resultado['velocidade']:,.0f}x tempo real). "
+          f"Inimigos restantes: {resultado['inimigos_restantes']}. Jogador derrotado: {resultado['jogador_derrotado']}")
+
+if __name__ == '__main__':
+    main()
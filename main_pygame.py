@@ -5,25 +5,70 @@ import sys
 import time
 import json
 import math
+import random
 from rpg_model import Jogador, Arma, Armadura, Magia, NPC
-from db_manager import get_random_enemy, get_class_template, get_all_armors, get_all_spells, get_all_weapons
+from spatial_hash import SpatialHash
+from render_cache import get_surface, text_cache, HudLabel
+from dirty_render import FrameStats, present, wait_for_events, REDRAW_EVENTS
+from frame_profiler import FrameProfiler
+from enemy_ai import EnemySwarm
+from flow_field import FlowField
+from scheduler import Scheduler
+from autosave import AutosaveService
+from virtual_list import CatalogPager, VirtualList
+from db_manager import get_random_enemies, get_class_template, get_catalog_filters, create_player_from_template
 
 # --- CONSTANTES E INICIALIZAÇÃO ---
 SCREEN_WIDTH, SCREEN_HEIGHT = 800, 600
 FPS = 60
-PLAYER_SPEED = 2
-PROJECTILE_SPEED = 7
+# Velocidades em pixels por SEGUNDO de simulação (não por quadro): o ritmo do jogo
+# não depende mais da taxa de quadros.
+PLAYER_SPEED = 120
+PROJECTILE_SPEED = 420
 MELEE_RANGE = 50 
+SPATIAL_CELL_SIZE = 64 # Tamanho da célula da grade espacial (px), ~1,5x o tamanho de um inimigo
+ENEMY_SEPARATION = 44 # Distância mínima entre centros de inimigos (px)
+SCREEN_RECT = pygame.Rect(0, 0, SCREEN_WIDTH, SCREEN_HEIGHT)
+SPELL_DIRECTIONS = ((0, -1), (0, 1), (-1, 0), (1, 0)) # Magia em quatro direções
 WHITE, BLACK, RED, GREEN, GRAY, YELLOW, BLUE = (255, 255, 255), (0, 0, 0), (255, 0, 0), (0, 150, 0), (100, 100, 100), (255, 255, 0), (0, 100, 255)
 
-ENEMY_SPEED = 1
+ENEMY_SPEED = 60
 ENEMY_ATTACK_INTERVAL = 3000 # 3000 milissegundos = 3 segundos
+ENEMY_ATTACK_RANGE = MELEE_RANGE # Distância (entre centros) a partir da qual o inimigo consegue atacar
+ENEMY_STOP_DISTANCE = 40 # Os inimigos param de avançar quando encostam no jogador
+ENEMY_WAVE_SIZE = 1 # Inimigos sorteados por partida
+FLOW_CELL_SIZE = 32 # Célula do campo de fluxo que guia os inimigos até o jogador (px)
 XP_PER_KILL = 50 # Pontos de experiência por derrotar um inimigo
+MESSAGE_DURATION = 2000 # Tempo (ms) que uma mensagem de combate fica na tela
+
+# Passo fixo da simulação: a lógica sempre avança em passos de SIM_DT segundos, quantos forem
+# necessários para acompanhar o tempo real, independentemente de quantos quadros são desenhados.
+SIM_DT = 1 / 60
+MAX_FRAME_TIME = 0.25 # Limite de tempo real acumulado por quadro (evita a "espiral da morte")
 
 # NOVO: Constantes para a regeneração de mana
 MANA_REGEN_INTERVAL = 10000 # 10000 milissegundos = 10 segundos
 MANA_REGEN_AMOUNT = 5     # Quantidade de mana a regenerar
 
+# Autosave em segundo plano: a cada AUTOSAVE_INTERVAL ms de jogo, e também ao derrotar um inimigo ou subir de nível
+AUTOSAVE_INTERVAL = 60000
+
+# Tela de seleção: área da lista virtualizada (só as linhas que cabem nela são desenhadas)
+SELECTION_LIST_RECT = pygame.Rect(100, 170, SCREEN_WIDTH - 200, 340)
+SELECTION_ROW_HEIGHT = 40
+SELECTION_COST_STEPS = 4 # Opções do filtro de custo (F2), além de "todos": quantis dos custos do catálogo
+
+# Renderização por retângulos sujos: telas estáticas só redesenham quando algo muda e o
+# game_loop envia ao display apenas as regiões alteradas. False volta ao redesenho completo.
+USE_DIRTY_RECTS = True
+# Regiões do HUD (redesenhadas por cima dos sprites a cada quadro no modo dirty rects)
+HUD_RECTS = (pygame.Rect(0, 0, 220, 110), pygame.Rect(SCREEN_WIDTH - 300, 0, 300, 60), pygame.Rect(0, SCREEN_HEIGHT - 60, SCREEN_WIDTH, 40))
+
+# Profiler por fase: F3 liga/desliga a medição e o overlay, F4 exporta o traço em CSV e JSON
+PROFILER_TOGGLE_KEY, PROFILER_EXPORT_KEY = pygame.K_F3, pygame.K_F4
+OVERLAY_RECT = pygame.Rect(SCREEN_WIDTH - 300, 60, 300, 190)
+OVERLAY_REFRESH_FRAMES = 15 # O texto do overlay é refeito a cada N quadros (4x por segundo a 60 FPS)
+
 def initialize_game():
     pygame.init()
     screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
@@ -36,53 +81,100 @@ def initialize_game():
     return screen, clock, fonts
 
 # --- CLASSES DE SPRITE (sem alterações) ---
+def read_movement_keys() -> tuple[int, int]:
+    """Direção de movimento (-1, 0 ou 1 em cada eixo) a partir das teclas pressionadas."""
+    keys = pygame.key.get_pressed(); dx, dy = 0, 0
+    if keys[pygame.K_LEFT] or keys[pygame.K_a]: dx -= 1
+    if keys[pygame.K_RIGHT] or keys[pygame.K_d]: dx += 1
+    if keys[pygame.K_UP] or keys[pygame.K_w]: dy -= 1
+    if keys[pygame.K_DOWN] or keys[pygame.K_s]: dy += 1
+    return dx, dy
+
 class PlayerSprite(pygame.sprite.Sprite):
     def __init__(self, personagem_jogador: Jogador, pos_x, pos_y):
-        super().__init__(); self.personagem_data = personagem_jogador; self.image = pygame.Surface((40, 40)); self.image.fill(GREEN); self.rect = self.image.get_rect(center=(pos_x, pos_y))
-    def update(self):
-        keys = pygame.key.get_pressed(); dx, dy = 0, 0
-        if keys[pygame.K_LEFT] or keys[pygame.K_a]: dx -= PLAYER_SPEED
-        if keys[pygame.K_RIGHT] or keys[pygame.K_d]: dx += PLAYER_SPEED
-        if keys[pygame.K_UP] or keys[pygame.K_w]: dy -= PLAYER_SPEED
-        if keys[pygame.K_DOWN] or keys[pygame.K_s]: dy += PLAYER_SPEED
-        self.rect.move_ip(dx, dy); self.rect.clamp_ip(pygame.display.get_surface().get_rect())
+        super().__init__(); self.personagem_data = personagem_jogador; self.image = get_surface((40, 40), GREEN); self.rect = self.image.get_rect(center=(pos_x, pos_y))
+        self.pos = pygame.math.Vector2(self.rect.center); self.movimento = (0, 0)
+    def update(self, dt: float):
+        dx, dy = self.movimento
+        self.pos.x += dx * PLAYER_SPEED * dt; self.pos.y += dy * PLAYER_SPEED * dt
+        centro = (round(self.pos.x), round(self.pos.y)); self.rect.center = centro; self.rect.clamp_ip(SCREEN_RECT)
+        if self.rect.center != centro: self.pos.update(self.rect.center) # Bateu na borda da tela
 
 class EnemySprite(pygame.sprite.Sprite):
     def __init__(self, personagem_npc: NPC, pos_x, pos_y):
-        super().__init__(); self.personagem_data = personagem_npc; self.image = pygame.Surface((40, 40)); self.image.fill((180, 50, 50)); self.rect = self.image.get_rect(center=(pos_x, pos_y))
+        super().__init__(); self.personagem_data = personagem_npc; self.image = get_surface((40, 40), (180, 50, 50)); self.rect = self.image.get_rect(center=(pos_x, pos_y))
+        self.indice_enxame = None # Posição nos arrays do EnemySwarm (o movimento é feito em lote, não em update())
 
 class WeaponSprite(pygame.sprite.Sprite):
     def __init__(self, player_sprite: PlayerSprite):
-        super().__init__(); self.player_sprite = player_sprite; self.image = pygame.Surface((20, 20)); self.image.fill(RED); self.rect = self.image.get_rect(center=self.player_sprite.rect.center); self.offset_x = 30
-    def update(self):
+        super().__init__(); self.player_sprite = player_sprite; self.image = get_surface((20, 20), RED); self.rect = self.image.get_rect(center=self.player_sprite.rect.center); self.offset_x = 30
+    def update(self, dt: float):
         self.rect.centery = self.player_sprite.rect.centery; self.rect.centerx = self.player_sprite.rect.centerx + self.offset_x
 
 class ProjectileSprite(pygame.sprite.Sprite):
-    def __init__(self, start_pos, direction_vector, damage, color=YELLOW, max_range=400):
-        super().__init__(); self.image = pygame.Surface((10, 10)); self.image.fill(color); self.rect = self.image.get_rect(center=start_pos)
-        self.start_pos = pygame.math.Vector2(start_pos); self.direction = direction_vector.normalize() if direction_vector.length() > 0 else pygame.math.Vector2(0)
+    def __init__(self, start_pos, direction_vector, damage, color=YELLOW, max_range=400, pool: 'ProjectilePool | None' = None):
+        super().__init__(); self.pool = pool
+        self.start_pos = pygame.math.Vector2(); self.pos = pygame.math.Vector2(); self.direction = pygame.math.Vector2()
+        self.reset(start_pos, direction_vector, damage, color, max_range)
+    def reset(self, start_pos, direction_vector, damage, color=YELLOW, max_range=400):
+        """(Re)inicializa o projétil; usado pelo construtor e pelo ProjectilePool ao reaproveitá-lo."""
+        self.image = get_surface((10, 10), color); self.rect = self.image.get_rect(center=start_pos)
+        self.start_pos.update(start_pos); self.pos.update(start_pos); self.direction.update(direction_vector)
+        if self.direction.length_squared() > 0: self.direction.normalize_ip()
         self.speed = PROJECTILE_SPEED; self.damage = damage; self.max_range = max_range
-    def update(self):
-        self.rect.move_ip(self.direction.x * self.speed, self.direction.y * self.speed)
-        if not pygame.display.get_surface().get_rect().colliderect(self.rect) or self.start_pos.distance_to(self.rect.center) > self.max_range:
+    def update(self, dt: float):
+        self.pos.x += self.direction.x * self.speed * dt; self.pos.y += self.direction.y * self.speed * dt
+        self.rect.center = (round(self.pos.x), round(self.pos.y))
+        if not SCREEN_RECT.colliderect(self.rect) or self.start_pos.distance_to(self.rect.center) > self.max_range:
             self.kill()
+    def kill(self):
+        estava_vivo = self.alive()
+        super().kill()
+        if estava_vivo and self.pool is not None: self.pool.devolver(self)
+
+class ProjectilePool:
+    """
+    Reaproveita ProjectileSprites: `kill()` devolve o projétil ao pool em vez de descartá-lo,
+    e `obter` reinicializa um projétil livre antes de criar um novo.
+    """
+    def __init__(self):
+        self._livres: list[ProjectileSprite] = []
+    def __len__(self) -> int: return len(self._livres)
+    def obter(self, start_pos, direction_vector, damage, color=YELLOW, max_range=400, groups=()) -> ProjectileSprite:
+        if self._livres:
+            projetil = self._livres.pop(); projetil.reset(start_pos, direction_vector, damage, color, max_range)
+        else:
+            projetil = ProjectileSprite(start_pos, direction_vector, damage, color, max_range, pool=self)
+        projetil.add(*groups)
+        return projetil
+    def devolver(self, projetil: ProjectileSprite):
+        self._livres.append(projetil)
 
 # --- FUNÇÕES DE INTERFACE (sem alterações) ---
-def draw_text(surface, text, font, color, x, y, center=False, topright=False):
-    textobj = font.render(text, 1, color)
+def blit_text(surface, textobj, x, y, center=False, topright=False):
     if topright: textrect = textobj.get_rect(topright=(x, y))
     elif center: textrect = textobj.get_rect(center=(x, y))
     else: textrect = textobj.get_rect(topleft=(x, y))
     surface.blit(textobj, textrect)
 
+def draw_text(surface, text, font, color, x, y, center=False, topright=False):
+    # O texto renderizado vem do cache LRU: strings repetidas entre quadros não passam pelo font.render
+    blit_text(surface, text_cache.render(font, text, color), x, y, center, topright)
+
+# Rótulos do HUD: só são re-renderizados quando os valores exibidos mudam
+HUD_PLAYER_PV = HudLabel("PV: {} / {}")
+HUD_PLAYER_PM = HudLabel("PM: {} / {}")
+HUD_ENEMY_NAME = HudLabel("{}")
+HUD_ENEMY_PV = HudLabel("PV: {} / {}")
+
 def draw_hud(surface, fonts, jogador_sprite: PlayerSprite):
     jogador_data = jogador_sprite.personagem_data
-    draw_text(surface, f"PV: {jogador_data.pontos_vida_atuais} / {jogador_data.pontos_vida_maximos}", fonts["list"], WHITE, 10, 10)
+    blit_text(surface, HUD_PLAYER_PV.surface(fonts["list"], WHITE, jogador_data.pontos_vida_atuais, jogador_data.pontos_vida_maximos), 10, 10)
     pygame.draw.rect(surface, (100,0,0), (10, 35, 200, 20))
     vida_percentual = jogador_data.pontos_vida_atuais / jogador_data.pontos_vida_maximos if jogador_data.pontos_vida_maximos > 0 else 0
     pygame.draw.rect(surface, GREEN, (10, 35, 200 * vida_percentual, 20))
     if jogador_data.pontos_mana_maximos > 0:
-        draw_text(surface, f"PM: {jogador_data.pontos_mana_atuais} / {jogador_data.pontos_mana_maximos}", fonts["list"], WHITE, 10, 60)
+        blit_text(surface, HUD_PLAYER_PM.surface(fonts["list"], WHITE, jogador_data.pontos_mana_atuais, jogador_data.pontos_mana_maximos), 10, 60)
         pygame.draw.rect(surface, (0,0,100), (10, 85, 150, 20))
         mana_percentual = jogador_data.pontos_mana_atuais / jogador_data.pontos_mana_maximos if jogador_data.pontos_mana_maximos > 0 else 0
         pygame.draw.rect(surface, BLUE, (10, 85, 150 * mana_percentual, 20))
@@ -90,26 +182,49 @@ def draw_hud(surface, fonts, jogador_sprite: PlayerSprite):
 def draw_enemy_hud(surface, fonts, enemy_sprite: EnemySprite):
     if not enemy_sprite or not enemy_sprite.alive(): return
     enemy_data = enemy_sprite.personagem_data
-    draw_text(surface, enemy_data.nome, fonts["list"], WHITE, SCREEN_WIDTH - 10, 10, topright=True)
-    draw_text(surface, f"PV: {enemy_data.pontos_vida_atuais} / {enemy_data.pontos_vida_maximos}", fonts["list"], WHITE, SCREEN_WIDTH - 10, 35, topright=True)
+    blit_text(surface, HUD_ENEMY_NAME.surface(fonts["list"], WHITE, enemy_data.nome), SCREEN_WIDTH - 10, 10, topright=True)
+    blit_text(surface, HUD_ENEMY_PV.surface(fonts["list"], WHITE, enemy_data.pontos_vida_atuais, enemy_data.pontos_vida_maximos), SCREEN_WIDTH - 10, 35, topright=True)
+
+class ProfilerOverlay:
+    """Tabela p50/p95/p99 por fase, desenhada em OVERLAY_RECT. Os textos são refeitos só a cada OVERLAY_REFRESH_FRAMES quadros."""
+    def __init__(self):
+        self.quadros = 0; self.linhas: list[pygame.Surface] = []
+    def desenhar(self, surface, fonte, profiler: FrameProfiler):
+        if self.quadros % OVERLAY_REFRESH_FRAMES == 0 or not self.linhas:
+            # Valores mudam a cada atualização: renderiza direto, sem passar pelo text_cache
+            self.linhas = [[fonte.render(coluna, True, YELLOW) for coluna in linha.split()] for linha in profiler.linhas_overlay()]
+        self.quadros += 1
+        for i, colunas in enumerate(self.linhas):
+            y = OVERLAY_RECT.top + 5 + i * 20
+            surface.blit(colunas[0], (OVERLAY_RECT.left + 10, y))
+            for j, texto in enumerate(colunas[1:4]): surface.blit(texto, texto.get_rect(topright=(OVERLAY_RECT.left + 140 + j * 60, y)))
+
+def export_profile(profiler: FrameProfiler, prefixo: str = "frame_profile") -> tuple[str, str]:
+    base = f"{prefixo}_{time.strftime('%Y%m%d_%H%M%S')}"
+    profiler.exportar_csv(base + ".csv"); profiler.exportar_json(base + ".json")
+    return base + ".csv", base + ".json"
 
 # --- TELAS DO JOGO (sem alterações) ---
 def main_menu(screen, clock, fonts):
     options = ["Novo Jogo", "Sair"]; selected_option = 0
+    precisa_redesenhar = True
     while True:
-        screen.fill(BLACK); draw_text(screen, "Crônicas do Abismo", fonts["menu"], WHITE, SCREEN_WIDTH/2, SCREEN_HEIGHT/4, center=True)
-        for i, option in enumerate(options):
-            color = YELLOW if i == selected_option else WHITE
-            draw_text(screen, option, fonts["main"], color, SCREEN_WIDTH/2, SCREEN_HEIGHT/2 + i * 50, center=True)
-        for event in pygame.event.get():
+        if precisa_redesenhar or not USE_DIRTY_RECTS:
+            screen.fill(BLACK); draw_text(screen, "Crônicas do Abismo", fonts["menu"], WHITE, SCREEN_WIDTH/2, SCREEN_HEIGHT/4, center=True)
+            for i, option in enumerate(options):
+                color = YELLOW if i == selected_option else WHITE
+                draw_text(screen, option, fonts["main"], color, SCREEN_WIDTH/2, SCREEN_HEIGHT/2 + i * 50, center=True)
+            pygame.display.flip(); precisa_redesenhar = False
+        for event in wait_for_events(bloquear=USE_DIRTY_RECTS):
             if event.type == pygame.QUIT: pygame.quit(); sys.exit()
+            if event.type in REDRAW_EVENTS: precisa_redesenhar = True
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_UP: selected_option = (selected_option - 1) % len(options)
                 elif event.key == pygame.K_DOWN: selected_option = (selected_option + 1) % len(options)
                 elif event.key == pygame.K_RETURN:
                     if selected_option == 0: return "new_game"
                     elif selected_option == 1: pygame.quit(); sys.exit()
-        pygame.display.flip(); clock.tick(FPS)
+        clock.tick(FPS)
 
 def character_creation_screen(screen, clock, fonts):
     """
@@ -121,27 +236,32 @@ def character_creation_screen(screen, clock, fonts):
     
     classes_disponiveis = ["Guerreiro", "Mago"]
     classe_idx_selecionada = 0
+    precisa_redesenhar = True
 
     while True:
-        screen.fill(BLACK)
-        draw_text(screen, 'Criação de Personagem', fonts["main"], WHITE, SCREEN_WIDTH/2, 20, center=True)
-
-        if fase_criacao == "nome":
-            draw_text(screen, "Digite o nome e pressione ENTER", fonts["list"], YELLOW, SCREEN_WIDTH/2, 100, center=True)
-            prompt_nome = f"Nome: {nome_personagem}_"
-            draw_text(screen, prompt_nome, fonts["input"], WHITE, 150, 150)
-        
-        elif fase_criacao == "classe":
-            draw_text(screen, f"Nome: {nome_personagem}", fonts["input"], WHITE, 150, 150)
-            draw_text(screen, "Escolha sua classe e pressione ENTER", fonts["list"], YELLOW, SCREEN_WIDTH/2, 200, center=True)
-            for i, classe in enumerate(classes_disponiveis):
-                cor = YELLOW if i == classe_idx_selecionada else WHITE
-                draw_text(screen, classe, fonts["main"], cor, SCREEN_WIDTH/2, 250 + i * 50, center=True)
+        if precisa_redesenhar or not USE_DIRTY_RECTS:
+            screen.fill(BLACK)
+            draw_text(screen, 'Criação de Personagem', fonts["main"], WHITE, SCREEN_WIDTH/2, 20, center=True)
 
-        for event in pygame.event.get():
+            if fase_criacao == "nome":
+                draw_text(screen, "Digite o nome e pressione ENTER", fonts["list"], YELLOW, SCREEN_WIDTH/2, 100, center=True)
+                prompt_nome = f"Nome: {nome_personagem}_"
+                draw_text(screen, prompt_nome, fonts["input"], WHITE, 150, 150)
+            
+            elif fase_criacao == "classe":
+                draw_text(screen, f"Nome: {nome_personagem}", fonts["input"], WHITE, 150, 150)
+                draw_text(screen, "Escolha sua classe e pressione ENTER", fonts["list"], YELLOW, SCREEN_WIDTH/2, 200, center=True)
+                for i, classe in enumerate(classes_disponiveis):
+                    cor = YELLOW if i == classe_idx_selecionada else WHITE
+                    draw_text(screen, classe, fonts["main"], cor, SCREEN_WIDTH/2, 250 + i * 50, center=True)
+
+            pygame.display.flip(); precisa_redesenhar = False
+
+        for event in wait_for_events(bloquear=USE_DIRTY_RECTS):
             if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
                 pygame.quit()
                 sys.exit()
+            if event.type in REDRAW_EVENTS: precisa_redesenhar = True
             
             if event.type == pygame.KEYDOWN:
                 if fase_criacao == "nome":
@@ -168,167 +288,346 @@ def character_creation_screen(screen, clock, fonts):
                             print(f"ERRO: Template para a classe '{classe_selecionada}' não encontrado no DB.")
                             continue
 
-                        novo_jogador = Jogador(
-                            id_entidade=template["id"], nome=nome_personagem, raca=template["raca"],
-                            classe_personagem=template["classe_personagem"], nivel=template["nivel"],
-                            pontos_vida_maximos=template["pontos_vida_maximos"],
-                            pontos_mana_maximos=template["pontos_mana_maximos"],
-                            atributos=json.loads(template["atributos"]), proficiencias=json.loads(template["proficiencias"]),
-                            experiencia=template.get("experiencia", 0), alinhamento=template.get("alinhamento", "Neutro"),
-                            nome_jogador=template.get("nome_jogador", "Jogador")
-                        )
+                        novo_jogador = create_player_from_template(template, nome_personagem)
                         return novo_jogador # Retorna o personagem criado e finaliza a função
 
-        pygame.display.flip()
         clock.tick(FPS)
 
-# Em main_pygame.py, substitua a função antiga por esta versão atualizada
+def describe_item(item, item_type: str) -> str:
+    """Texto de uma linha da tela de seleção."""
+    if item_type == "armor": return f"{item.nome} (CA: {item.bonus_ca_base}, PV: +{item.bonus_pv})"
+    if item_type == "spell": return f"{item.nome} (Custo: {item.custo_mana} PM, Nível: {item.nivel_magia})"
+    if item_type == "weapon": return f"{item.nome} ({item.dado_dano} {item.tipo_dano})"
+    return item.nome
 
-def selection_screen(screen, clock, fonts, player_data, title, items, item_type):
-    if not items:
-        # Adiciona uma mensagem para o jogador saber por que a tela foi pulada
-        print(f"AVISO: Nenhum item do tipo '{item_type}' encontrado no banco de dados. Pulando tela de seleção.")
-        return player_data
-        
-    selected_index = 0
-    while True:
-        screen.fill(BLACK)
-        draw_text(screen, title, fonts["menu"], WHITE, SCREEN_WIDTH / 2, 50, center=True)
-        
-        for i, item in enumerate(items):
-            color = YELLOW if i == selected_index else WHITE
-            
-            # --- LÓGICA DE EXIBIÇÃO MELHORADA ---
-            info_text = ""
-            if item_type == "armor":
-                info_text = f"{item.nome} (CA: {item.bonus_ca_base}, PV: +{item.bonus_pv})"
-            elif item_type == "spell":
-                # Mostra o nome, custo de mana e nível da magia
-                info_text = f"{item.nome} (Custo: {item.custo_mana} PM, Nível: {item.nivel_magia})"
-            else:
-                # Para armas e outros itens, mostra apenas o nome
-                info_text = item.nome
-            # ------------------------------------
-
-            draw_text(screen, info_text, fonts["list"], color, 100, 150 + i * 40)
-            
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_ESCAPE:
-                    return player_data # Permite sair da tela de seleção sem escolher
-                if event.key == pygame.K_UP:
-                    selected_index = (selected_index - 1) % len(items)
-                elif event.key == pygame.K_DOWN:
-                    selected_index = (selected_index + 1) % len(items)
-                elif event.key == pygame.K_RETURN:
-                    chosen_item = items[selected_index]
-                    if item_type in ["weapon", "armor"]:
-                        player_data.usar_item(chosen_item)
-                    elif item_type == "spell":
-                        player_data.aprender_magia(chosen_item)
-                    return player_data
-                    
-        pygame.display.flip()
-        clock.tick(FPS)
+def _proximo_filtro(valores: list, atual):
+    """Próxima opção de um filtro ao apertar a tecla dele: None (todos) -> cada valor -> None."""
+    opcoes = [None] + valores
+    return opcoes[(opcoes.index(atual) + 1) % len(opcoes)] if atual in opcoes else None
+
+def _faixas_de_custo(custos: list, quantidade: int = SELECTION_COST_STEPS) -> list:
+    """
+    Poucos limites de custo máximo para o F2 percorrer, em vez de cada custo distinto do catálogo (centenas num
+    catálogo grande): os quantis dos custos distintos (ex.: 4 -> 20%, 40%, 60% e 80%), sem repetições.
+    """
+    custos = sorted(custos)
+    if len(custos) <= quantidade: return custos
+    return sorted({custos[(len(custos) * (i + 1)) // (quantidade + 1)] for i in range(quantidade)})
+
+def selection_screen(screen, clock, fonts, player_data, title, item_type):
+    """
+    Escolha de arma, armadura ou magia. Os itens vêm do banco em páginas conforme a lista rola
+    (ver virtual_list) e só as linhas visíveis são desenhadas. Digitar busca pelo nome e pela
+    descrição (os resultados mudam a cada tecla, do mais relevante para o menos; BACKSPACE apaga).
+    TAB filtra por tipo, F1 por nível (magias) e F2 por custo máximo; PAGE UP/DOWN rolam uma tela.
+    """
+    pager = CatalogPager(item_type)
+    lista = VirtualList(pager, SELECTION_LIST_RECT, SELECTION_ROW_HEIGHT, lambda item: describe_item(item, item_type))
+    try:
+        pager.prefetch(); pager.atualizar(timeout=None) # A primeira página é esperada: sem ela não há o que mostrar
+        if not pager.itens:
+            # Adiciona uma mensagem para o jogador saber por que a tela foi pulada
+            print(f"AVISO: Nenhum item do tipo '{item_type}' encontrado no banco de dados. Pulando tela de seleção.")
+            return player_data
+        opcoes_filtro = get_catalog_filters(item_type)
+        opcoes_filtro["custo"] = _faixas_de_custo(opcoes_filtro["custo"])
+        filtros = {"tipo": None, "nivel": None, "custo_max": None}
+        teclas_filtro = {pygame.K_TAB: ("tipo", "tipo"), pygame.K_F1: ("nivel", "nivel"), pygame.K_F2: ("custo_max", "custo")}
+        busca = ""
+        precisa_redesenhar = True
+        while True:
+            if pager.atualizar(): precisa_redesenhar = True
+            if precisa_redesenhar or not USE_DIRTY_RECTS:
+                screen.fill(BLACK)
+                draw_text(screen, title, fonts["menu"], WHITE, SCREEN_WIDTH / 2, 50, center=True)
+                resumo = [f"Tipo: {filtros['tipo'] or 'todos'} [TAB]", f"Custo máx.: {'todos' if filtros['custo_max'] is None else filtros['custo_max']} [F2]"]
+                if opcoes_filtro["nivel"]: resumo.insert(1, f"Nível: {'todos' if filtros['nivel'] is None else filtros['nivel']} [F1]")
+                draw_text(screen, "   ".join(resumo), fonts["list"], GRAY, SCREEN_WIDTH / 2, 95, center=True)
+                draw_text(screen, f"Buscar: {busca}_", fonts["list"], WHITE if busca else GRAY, SCREEN_WIDTH / 2, 125, center=True)
+                lista.desenhar(screen, fonts["list"], WHITE, YELLOW)
+                if not pager.itens and not pager.carregando:
+                    draw_text(screen, "Nenhum item encontrado", fonts["list"], GRAY, SELECTION_LIST_RECT.left, SELECTION_LIST_RECT.top)
+                pygame.display.flip(); precisa_redesenhar = False
 
-# --- LOOP PRINCIPAL DO JOGO (COM A LÓGICA DE REGENERAÇÃO) ---
+            for event in wait_for_events(bloquear=USE_DIRTY_RECTS):
+                if event.type == pygame.QUIT:
+                    pygame.quit()
+                    sys.exit()
+                if event.type in REDRAW_EVENTS: precisa_redesenhar = True
+                if event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_ESCAPE:
+                        return player_data # Permite sair da tela de seleção sem escolher
+                    if event.key == pygame.K_UP: lista.mover(-1)
+                    elif event.key == pygame.K_DOWN: lista.mover(1)
+                    elif event.key == pygame.K_PAGEUP: lista.mover(-lista.linhas_visiveis)
+                    elif event.key == pygame.K_PAGEDOWN: lista.mover(lista.linhas_visiveis)
+                    elif event.key in teclas_filtro:
+                        filtro, opcao = teclas_filtro[event.key]
+                        if opcoes_filtro[opcao]:
+                            filtros[filtro] = _proximo_filtro(opcoes_filtro[opcao], filtros[filtro])
+                            pager.filtrar(busca, **filtros); lista.reiniciar()
+                    elif event.key == pygame.K_BACKSPACE:
+                        if busca: busca = busca[:-1]; pager.filtrar(busca, **filtros); lista.reiniciar()
+                    elif event.key == pygame.K_RETURN:
+                        if lista.item_selecionado is None: pager.atualizar(timeout=None) # ENTER antes da página chegar: espera por ela
+                        chosen_item = lista.item_selecionado
+                        if chosen_item is None: continue
+                        if item_type in ["weapon", "armor"]:
+                            player_data.usar_item(chosen_item)
+                        elif item_type == "spell":
+                            player_data.aprender_magia(chosen_item)
+                        return player_data
+                    elif event.unicode and event.unicode.isprintable():
+                        # Busca enquanto digita: cada tecla troca a lista pelos resultados mais relevantes
+                        busca += event.unicode; pager.filtrar(busca, **filtros); lista.reiniciar()
+
+            clock.tick(FPS)
+    finally:
+        pager.fechar()
+
+# --- SIMULAÇÃO (passo fixo, independente da renderização) ---
+class GameWorld:
+    """
+    Estado e regras de uma partida, sem nenhuma dependência de tela ou de tempo real.
+    `step(dt)` avança a simulação em `dt` segundos; o game_loop chama quantos passos forem
+    necessários por quadro, e o headless.py chama o mais rápido que a CPU permitir.
+    Tudo o que depende de tempo (regeneração de mana, mensagens, efeitos futuros) é agendado no
+    `scheduler`, cujo relógio é o da simulação: só os timers que vencem custam algo por passo.
+    `enemy_data` pode ser um NPC ou uma lista deles (uma onda); `enemy_sprite` é o alvo atual
+    (HUD e flechas), trocado pelo inimigo vivo mais próximo quando morre.
+    Com um `autosave`, o jogador é salvo em segundo plano no intervalo e a cada inimigo derrotado.
+    """
+    def __init__(self, jogador_data: Jogador, enemy_data: NPC | list[NPC] | None = None, all_sprites: pygame.sprite.Group | None = None,
+                 autosave: AutosaveService | None = None):
+        self.jogador_data = jogador_data
+        self.all_sprites = all_sprites if all_sprites is not None else pygame.sprite.Group()
+        self.player_sprite = PlayerSprite(jogador_data, SCREEN_WIDTH / 4, SCREEN_HEIGHT / 2)
+        self.all_sprites.add(self.player_sprite)
+        # Sprites com update() próprio; os inimigos são movidos em lote pelo enemy_swarm
+        self.actors = pygame.sprite.Group(self.player_sprite)
+
+        self.enemy_group = pygame.sprite.Group()
+        # Grade espacial dos inimigos: usada para acertos de projéteis, alcance corpo a corpo e separação
+        self.enemy_grid = SpatialHash(SPATIAL_CELL_SIZE)
+        # Campo de fluxo até o jogador: recalculado só quando ele muda de célula, lido em O(1) por inimigo
+        self.flow_field = FlowField(SCREEN_WIDTH, SCREEN_HEIGHT, FLOW_CELL_SIZE)
+        # Movimento, separação e ataques de todos os inimigos em lote (o enxame mantém a grade atualizada)
+        self.enemy_swarm = EnemySwarm(ENEMY_SPEED, ENEMY_ATTACK_INTERVAL, ENEMY_ATTACK_RANGE, ENEMY_STOP_DISTANCE,
+                                      ENEMY_SEPARATION, self.enemy_grid, self.flow_field)
+        self.enemy_sprite = None
+        inimigos = enemy_data if isinstance(enemy_data, list) else [enemy_data] if enemy_data else []
+        for i, npc in enumerate(inimigos):
+            # O primeiro fica na posição de sempre; o resto da onda se espalha pela metade direita da tela
+            x, y = (SCREEN_WIDTH * 3 / 4, SCREEN_HEIGHT / 2) if i == 0 else (random.uniform(SCREEN_WIDTH / 2, SCREEN_WIDTH - 20), random.uniform(20, SCREEN_HEIGHT - 20))
+            self.spawn_enemy(npc, x, y)
+        self.enemy_sprite = self._inimigo_mais_proximo()
+        self.jogador_derrotado = False
+
+        self.projectiles = pygame.sprite.Group()
+        self.projectile_pool = ProjectilePool()
+        if isinstance(jogador_data.equipamento.get("Arma"), Arma):
+            weapon = WeaponSprite(self.player_sprite)
+            self.all_sprites.add(weapon); self.actors.add(weapon)
+
+        self.scheduler = Scheduler() # Relógio da simulação (ms) e timers do jogo
+        self.passos = 0
+        self.combat_message = None; self._message_timer = None
+        self.scheduler.schedule_repeating(MANA_REGEN_INTERVAL, self._regenerar_mana)
+        self.autosave = autosave
+        if autosave is not None: self.scheduler.schedule_repeating(AUTOSAVE_INTERVAL, self.salvar, "intervalo")
+        self.profiler = FrameProfiler() # Inativo por padrão: as marcações não custam quase nada
+
+    @property
+    def tempo_ms(self) -> float: return self.scheduler.agora
+
+    def mostrar_mensagem(self, mensagem: str):
+        """Mostra `mensagem` por MESSAGE_DURATION ms; uma mensagem nova substitui a anterior e reinicia o prazo."""
+        self.scheduler.cancel(self._message_timer)
+        self.combat_message = mensagem; self._message_timer = self.scheduler.schedule(MESSAGE_DURATION, self._apagar_mensagem)
+
+    def _apagar_mensagem(self):
+        self.combat_message = None; self._message_timer = None
+
+    @property
+    def mensagem_visivel(self) -> str | None:
+        return self.combat_message
+
+    def set_movement(self, dx: int, dy: int):
+        self.player_sprite.movimento = (dx, dy)
+
+    def spawn_enemy(self, npc: NPC, x: float, y: float) -> EnemySprite:
+        enemy = EnemySprite(npc, x, y)
+        self.all_sprites.add(enemy); self.enemy_group.add(enemy); self.enemy_swarm.adicionar(enemy)
+        return enemy
+
+    def _inimigo_mais_proximo(self) -> EnemySprite | None:
+        if not self.enemy_group: return None
+        centro = pygame.math.Vector2(self.player_sprite.rect.center)
+        return min(self.enemy_group, key=lambda e: centro.distance_squared_to(e.rect.center))
+
+    def _matar_inimigo(self, enemy: EnemySprite):
+        self.enemy_swarm.remover(enemy); enemy.kill()
+        if enemy is self.enemy_sprite: self.enemy_sprite = self._inimigo_mais_proximo()
+        jogador_data = self.jogador_data
+        if jogador_data.ganhar_experiencia(XP_PER_KILL):
+            self.mostrar_mensagem(f"{jogador_data.nome} subiu para o nível {jogador_data.nivel}!")
+            self.salvar("nível")
+        else: self.salvar("inimigo derrotado")
+
+    def salvar(self, motivo: str = "intervalo"):
+        """Pede um autosave (só tira um snapshot aqui; a gravação é feita na thread do AutosaveService)."""
+        if self.autosave is not None and not self.jogador_derrotado: self.autosave.request(self.jogador_data, motivo)
+
+    def _inimigos_atacam(self, atacantes: list[EnemySprite]):
+        jogador_data = self.jogador_data
+        for enemy in atacantes:
+            if jogador_data.pontos_vida_atuais <= 0: break
+            self.mostrar_mensagem(enemy.personagem_data.atacar(jogador_data))
+        if jogador_data.pontos_vida_atuais <= 0 and not self.jogador_derrotado:
+            self.jogador_derrotado = True; self.mostrar_mensagem(f"{jogador_data.nome} foi derrotado!")
+
+    def atacar(self):
+        """Ataque com a arma equipada (tecla ESPAÇO): corpo a corpo no inimigo mais próximo ou flecha."""
+        if not self.enemy_sprite or not self.enemy_sprite.alive(): return
+        jogador_data, player_sprite = self.jogador_data, self.player_sprite
+        arma = jogador_data.equipamento.get("Arma")
+        if not arma or "Distância" not in arma.alcance:
+            alvo = self.enemy_grid.mais_proximo(player_sprite.rect.center, MELEE_RANGE)
+            if alvo:
+                self.mostrar_mensagem(jogador_data.atacar(alvo.personagem_data))
+                if alvo.personagem_data.pontos_vida_atuais <= 0: self._matar_inimigo(alvo)
+            else: self.mostrar_mensagem("Inimigo fora de alcance!")
+        else:
+            direcao = pygame.math.Vector2(self.enemy_sprite.rect.center) - pygame.math.Vector2(player_sprite.rect.center)
+            self.projectile_pool.obter(player_sprite.rect.center, direcao, arma.calcular_dano_rolagem(), color=WHITE, groups=(self.projectiles, self.all_sprites))
+            self.mostrar_mensagem(f"{jogador_data.nome} atirou uma flecha!")
+
+    def conjurar(self):
+        """Magia em quatro direções (tecla E), só para magos com alguma magia aprendida."""
+        jogador_data = self.jogador_data
+        if jogador_data.classe_personagem.lower() != 'mago' or not jogador_data.magias: return
+        magia = jogador_data.magias[0]
+        if jogador_data.pode_conjurar(magia):
+            jogador_data.gastar_mana(magia.custo_mana)
+            for direcao in SPELL_DIRECTIONS:
+                self.projectile_pool.obter(self.player_sprite.rect.center, direcao, damage=5, color=BLUE, groups=(self.projectiles, self.all_sprites))
+            self.mostrar_mensagem(f"{jogador_data.nome} conjurou {magia.nome}!")
+        else:
+            self.mostrar_mensagem("Mana insuficiente!")
+
+    def handle_event(self, event) -> bool:
+        """Aplica um evento de teclado à simulação. Retorna False se o jogador pediu para sair."""
+        if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE): return False
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_SPACE: self.atacar()
+            elif event.key == pygame.K_e: self.conjurar()
+        return True
+
+    def _regenerar_mana(self):
+        """Timer repetido a cada MANA_REGEN_INTERVAL ms."""
+        jogador_data = self.jogador_data
+        if jogador_data.pontos_mana_atuais < jogador_data.pontos_mana_maximos:
+            jogador_data.pontos_mana_atuais = min(jogador_data.pontos_mana_atuais + MANA_REGEN_AMOUNT, jogador_data.pontos_mana_maximos)
+            print(f"{jogador_data.nome} regenerou {MANA_REGEN_AMOUNT} de mana.")
+
+    def _resolver_colisoes(self):
+        # Cada projétil consulta só as células da grade que toca (O(projéteis), não O(projéteis × inimigos))
+        for projectile in self.projectiles.sprites():
+            enemies_hit = self.enemy_grid.colisoes(projectile.rect)
+            if not enemies_hit: continue
+            projectile.kill()
+            for enemy in enemies_hit:
+                enemy.personagem_data.receber_dano(projectile.damage)
+                self.mostrar_mensagem(f"Inimigo atingido por {projectile.damage} de dano!")
+                if enemy.personagem_data.pontos_vida_atuais <= 0: self._matar_inimigo(enemy)
+
+    def step(self, dt: float):
+        """Avança a simulação em `dt` segundos."""
+        profiler = self.profiler
+        self.passos += 1
+        self.scheduler.advance(dt * 1000); profiler.marcar("timers")
+        self._resolver_colisoes(); profiler.marcar("colisao")
+        self.actors.update(dt); self.projectiles.update(dt)
+        if not self.jogador_derrotado:
+            self.flow_field.atualizar(self.player_sprite.rect.center)
+            self._inimigos_atacam(self.enemy_swarm.step(dt, self.player_sprite.rect.center))
+        profiler.marcar("update")
+
+    def desenhar(self, screen, fonts, background, extra_rects: tuple[pygame.Rect, ...] = ()) -> list[pygame.Rect] | None:
+        """
+        Desenha o estado atual. Retorna os retângulos alterados (modo dirty rects) ou None (tela cheia).
+        `extra_rects` são regiões que o chamador vai desenhar por cima (ex.: overlay): são limpas e enviadas junto.
+        """
+        dirty_rects = None
+        if USE_DIRTY_RECTS and isinstance(self.all_sprites, pygame.sprite.RenderUpdates):
+            self.all_sprites.clear(screen, background) # Apaga os sprites nas posições do quadro anterior
+            for rect in HUD_RECTS + extra_rects: screen.blit(background, rect, rect)
+            dirty_rects = self.all_sprites.draw(screen) + list(HUD_RECTS + extra_rects)
+        else:
+            screen.blit(background, (0, 0))
+            self.all_sprites.draw(screen)
+        self.profiler.marcar("desenho")
+        draw_hud(screen, fonts, self.player_sprite)
+        draw_enemy_hud(screen, fonts, self.enemy_sprite)
+        mensagem = self.mensagem_visivel
+        if mensagem: draw_text(screen, mensagem, fonts["list"], YELLOW, SCREEN_WIDTH/2, SCREEN_HEIGHT - 40, center=True)
+        self.profiler.marcar("hud")
+        return dirty_rects
+
+# --- LOOP PRINCIPAL DO JOGO ---
 def game_loop(screen, clock, fonts, jogador_data: Jogador):
     pygame.display.set_caption(f"Crônicas do Abismo - {jogador_data.nome}")
     
-    all_sprites = pygame.sprite.Group()
-    player_sprite = PlayerSprite(jogador_data, SCREEN_WIDTH / 4, SCREEN_HEIGHT / 2)
-    all_sprites.add(player_sprite)
-    
-    enemy_group = pygame.sprite.Group()
-    enemy_data = get_random_enemy()
-    if enemy_data:
-        enemy_sprite = EnemySprite(enemy_data, SCREEN_WIDTH * 3 / 4, SCREEN_HEIGHT / 2)
-        all_sprites.add(enemy_sprite)
-        enemy_group.add(enemy_sprite)
-    else:
-        enemy_sprite = None
-        
-    projectiles = pygame.sprite.Group()
-    if isinstance(jogador_data.equipamento.get("Arma"), Arma):
-        all_sprites.add(WeaponSprite(player_sprite))
-
-    combat_message = ""
-    message_time = 0
-    
-    # NOVO: Variável para controlar o tempo da regeneração de mana
-    last_mana_regen_time = pygame.time.get_ticks()
-    
+    # RenderUpdates devolve, em draw(), só os retângulos que mudaram (posição antiga + nova)
+    all_sprites = pygame.sprite.RenderUpdates() if USE_DIRTY_RECTS else pygame.sprite.Group()
+    background = get_surface(SCREEN_RECT.size, BLACK)
+    frame_stats = FrameStats(SCREEN_WIDTH * SCREEN_HEIGHT)
+    screen.blit(background, (0, 0)); pygame.display.flip()
+    autosave = AutosaveService()
+    world = GameWorld(jogador_data, get_random_enemies(ENEMY_WAVE_SIZE), all_sprites, autosave)
+    profiler = world.profiler; overlay = ProfilerOverlay()
+    limpar_overlay = False # Um quadro a mais limpando OVERLAY_RECT depois que o overlay é desligado
+
+    # Acumulador do passo fixo: o tempo real de cada quadro vira N passos de SIM_DT
+    acumulador = 0.0
+    anterior = time.perf_counter()
     running = True
     while running:
-        # --- LÓGICA DE REGENERAÇÃO DE MANA ---
-        current_time = pygame.time.get_ticks()
-        if current_time - last_mana_regen_time > MANA_REGEN_INTERVAL:
-            if jogador_data.pontos_mana_atuais < jogador_data.pontos_mana_maximos:
-                # Regenera a mana
-                jogador_data.pontos_mana_atuais += MANA_REGEN_AMOUNT
-                # Garante que não ultrapasse o máximo
-                jogador_data.pontos_mana_atuais = min(jogador_data.pontos_mana_atuais, jogador_data.pontos_mana_maximos)
-                print(f"{jogador_data.nome} regenerou {MANA_REGEN_AMOUNT} de mana.")
-            # Reinicia o contador de tempo
-            last_mana_regen_time = current_time
+        agora = time.perf_counter()
+        acumulador += min(agora - anterior, MAX_FRAME_TIME); anterior = agora
+        profiler.iniciar_quadro()
 
         # --- PROCESSAMENTO DE EVENTOS ---
         for event in pygame.event.get():
-            if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
-                running = False
-            
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_SPACE: # Lógica de ataque
-                    if not enemy_sprite or not enemy_sprite.alive(): continue
-                    arma = jogador_data.equipamento.get("Arma")
-                    if not arma or "Distância" not in arma.alcance:
-                        if pygame.math.Vector2(player_sprite.rect.center).distance_to(enemy_sprite.rect.center) <= MELEE_RANGE:
-                            combat_message = jogador_data.atacar(enemy_sprite.personagem_data); message_time = pygame.time.get_ticks() + 2000
-                        else: combat_message = "Inimigo fora de alcance!"; message_time = pygame.time.get_ticks() + 2000
-                    else:
-                        direcao = pygame.math.Vector2(enemy_sprite.rect.center) - pygame.math.Vector2(player_sprite.rect.center)
-                        flecha = ProjectileSprite(player_sprite.rect.center, direcao, arma.calcular_dano_rolagem(), color=WHITE)
-                        projectiles.add(flecha); all_sprites.add(flecha)
-                        combat_message = f"{jogador_data.nome} atirou uma flecha!"; message_time = pygame.time.get_ticks() + 2000
-                
-                if event.key == pygame.K_e: # Lógica de magia
-                    if jogador_data.classe_personagem.lower() == 'mago' and jogador_data.magias:
-                        magia = jogador_data.magias[0]
-                        if jogador_data.pode_conjurar(magia):
-                            jogador_data.gastar_mana(magia.custo_mana)
-                            directions = [pygame.math.Vector2(0,-1), pygame.math.Vector2(0,1), pygame.math.Vector2(-1,0), pygame.math.Vector2(1,0)]
-                            for direcao in directions:
-                                proj_magico = ProjectileSprite(player_sprite.rect.center, direcao, damage=5, color=BLUE)
-                                projectiles.add(proj_magico); all_sprites.add(proj_magico)
-                            combat_message = f"{jogador_data.nome} conjurou {magia.nome}!"; message_time = pygame.time.get_ticks() + 2000
-                        else:
-                            combat_message = "Mana insuficiente!"; message_time = pygame.time.get_ticks() + 2000
-        
-        # --- LÓGICA DE COLISÃO ---
-        hits = pygame.sprite.groupcollide(projectiles, enemy_group, True, False)
-        for projectile, enemies_hit in hits.items():
-            for enemy in enemies_hit:
-                enemy.personagem_data.receber_dano(projectile.damage)
-                combat_message = f"Inimigo atingido por {projectile.damage} de dano!"
-                message_time = pygame.time.get_ticks() + 2000
-                if enemy.personagem_data.pontos_vida_atuais <= 0: enemy.kill()
-        
-        # --- ATUALIZAÇÃO E DESENHO ---
-        all_sprites.update()
-        screen.fill(BLACK)
-        all_sprites.draw(screen)
-        draw_hud(screen, fonts, player_sprite)
-        draw_enemy_hud(screen, fonts, enemy_sprite)
-
-        if pygame.time.get_ticks() < message_time:
-            draw_text(screen, combat_message, fonts["list"], YELLOW, SCREEN_WIDTH/2, SCREEN_HEIGHT - 40, center=True)
-
-        pygame.display.flip()
+            if event.type == pygame.KEYDOWN and event.key == PROFILER_TOGGLE_KEY:
+                if not profiler.alternar(): limpar_overlay = True
+                else: profiler.iniciar_quadro()
+            elif event.type == pygame.KEYDOWN and event.key == PROFILER_EXPORT_KEY:
+                if profiler.traco: print("Perfil de quadros exportado para {} e {}".format(*export_profile(profiler)))
+                else: print("Nenhum quadro medido ainda (ligue o profiler com F3).")
+            elif not world.handle_event(event): running = False
+        if world.jogador_derrotado and world.mensagem_visivel is None: running = False # Fim de jogo depois da mensagem
+        world.set_movement(*read_movement_keys())
+        profiler.marcar("eventos")
+
+        # --- SIMULAÇÃO ---
+        while acumulador >= SIM_DT:
+            world.step(SIM_DT); acumulador -= SIM_DT
+
+        # --- DESENHO ---
+        inicio_render = time.perf_counter()
+        extra_rects = (OVERLAY_RECT,) if profiler.ativo or limpar_overlay else ()
+        dirty_rects = world.desenhar(screen, fonts, background, extra_rects)
+        if profiler.ativo: overlay.desenhar(screen, fonts["list"], profiler); profiler.marcar("hud")
+        limpar_overlay = False
+        present(dirty_rects, frame_stats, inicio_render)
+        profiler.marcar("flip"); profiler.fim_quadro()
         clock.tick(FPS)
 
+    world.salvar("saída"); autosave.close()
+    print(f"Autosave: {autosave.salvos} gravações, {autosave.agrupados} pedidos agrupados")
+    print(f"Estatísticas de renderização ({'dirty rects' if USE_DIRTY_RECTS else 'tela cheia'}): {frame_stats.resumo()}")
+
 # --- PONTO DE ENTRADA ---
 def main():
     screen, clock, fonts = initialize_game()
@@ -337,7 +636,7 @@ def main():
         if choice == "new_game":
             player_data = character_creation_screen(screen, clock, fonts)
             if player_data:
-                player_data = selection_screen(screen, clock, fonts, player_data, "Escolha sua Arma Inicial", get_all_weapons(), "weapon")
+                player_data = selection_screen(screen, clock, fonts, player_data, "Escolha sua Arma Inicial", "weapon")
                 
                 print(f"--- DEBUG INFO ---")
                 print(f"Classe do personagem para verificação: '{player_data.classe_personagem}'")
@@ -345,9 +644,9 @@ def main():
                 print(f"--------------------")
 
                 if player_data.classe_personagem.lower() == 'guerreiro':
-                    player_data = selection_screen(screen, clock, fonts, player_data, "Escolha sua Armadura", get_all_armors(), "armor")
+                    player_data = selection_screen(screen, clock, fonts, player_data, "Escolha sua Armadura", "armor")
                 elif player_data.classe_personagem.lower() == 'mago':
-                    player_data = selection_screen(screen, clock, fonts, player_data, "Escolha sua Magia Inicial", get_all_spells(), "spell")
+                    player_data = selection_screen(screen, clock, fonts, player_data, "Escolha sua Magia Inicial", "spell")
                 game_loop(screen, clock, fonts, player_data)
 
 if __name__ == '__main__':
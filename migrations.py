@@ -0,0 +1,264 @@
+# migrations.py
+#
+# Esquema do banco versionado. Cada migração tem um número; o banco guarda em PRAGMA user_version
+# a última aplicada, e `migrar` aplica só as que faltam, em ordem, numa única transação.
+# Bancos antigos (criados pelo setup_database antes das migrações, com user_version 0) passam
+# pelas mesmas migrações: todas toleram tabelas, colunas e índices que já existam.
+#
+# Uso: python migrations.py [arquivo.db]   (migra e mostra o EXPLAIN QUERY PLAN das consultas)
+
+import re
+import sqlite3
+import sys
+from typing import Callable
+
+DB_FILE = "rpg_database.db"
+
+def _colunas(conn: sqlite3.Connection, tabela: str) -> set[str]:
+    return {linha[1] for linha in conn.execute(f"PRAGMA table_info({tabela})")}
+
+def _adicionar_coluna(conn: sqlite3.Connection, tabela: str, coluna: str, definicao: str):
+    """ALTER TABLE ADD COLUMN só se a coluna ainda não existir."""
+    if coluna not in _colunas(conn, tabela): conn.execute(f"ALTER TABLE {tabela} ADD COLUMN {coluna} {definicao}")
+
+def _esquema_inicial(conn: sqlite3.Connection):
+    """As tabelas como o setup_database as criava originalmente."""
+    for sql in (
+        "CREATE TABLE IF NOT EXISTS Item (id INTEGER PRIMARY KEY AUTOINCREMENT, nome TEXT NOT NULL, descricao TEXT, peso REAL, valor_moedas INTEGER, "
+        "tipo_item TEXT NOT NULL CHECK(tipo_item IN ('Arma', 'Armadura', 'Pocao', 'Outro')))",
+        "CREATE TABLE IF NOT EXISTS Arma (item_id INTEGER PRIMARY KEY, tipo_dano TEXT, dado_dano TEXT, propriedades TEXT, alcance TEXT, "
+        "FOREIGN KEY (item_id) REFERENCES Item (id) ON DELETE CASCADE)",
+        "CREATE TABLE IF NOT EXISTS Armadura (item_id INTEGER PRIMARY KEY, tipo_armadura TEXT, bonus_ca_base INTEGER, requer_destreza_bonus BOOLEAN, "
+        "max_bonus_destreza INTEGER, penalidade_furtividade BOOLEAN, requisito_forca INTEGER, bonus_pv INTEGER DEFAULT 0, "
+        "FOREIGN KEY (item_id) REFERENCES Item (id) ON DELETE CASCADE)",
+        "CREATE TABLE IF NOT EXISTS Pocao (item_id INTEGER PRIMARY KEY, efeito TEXT, duracao_efeito TEXT, quantidade_cura INTEGER, "
+        "FOREIGN KEY (item_id) REFERENCES Item (id) ON DELETE CASCADE)",
+        "CREATE TABLE IF NOT EXISTS Magia (id INTEGER PRIMARY KEY AUTOINCREMENT, nome TEXT NOT NULL UNIQUE, nivel_magia INTEGER, escola_magia TEXT, "
+        "tempo_conjuracao TEXT, alcance_magia TEXT, componentes TEXT, duracao_magia TEXT, descricao_efeito TEXT, requer_concentracao BOOLEAN)",
+        "CREATE TABLE IF NOT EXISTS Personagem (id INTEGER PRIMARY KEY AUTOINCREMENT, nome TEXT NOT NULL, raca TEXT, classe_personagem TEXT, "
+        "nivel INTEGER DEFAULT 1, pontos_vida_maximos INTEGER, pontos_vida_atuais INTEGER, atributos TEXT, proficiencias TEXT, "
+        "tipo_personagem TEXT NOT NULL CHECK(tipo_personagem IN ('Jogador', 'NPC')))",
+        "CREATE TABLE IF NOT EXISTS Jogador (personagem_id INTEGER PRIMARY KEY, experiencia INTEGER DEFAULT 0, alinhamento TEXT, nome_jogador TEXT, "
+        "FOREIGN KEY (personagem_id) REFERENCES Personagem (id) ON DELETE CASCADE)",
+        "CREATE TABLE IF NOT EXISTS NPC (personagem_id INTEGER PRIMARY KEY, tipo_npc TEXT, comportamento TEXT, dialogo TEXT, "
+        "FOREIGN KEY (personagem_id) REFERENCES Personagem (id) ON DELETE CASCADE)",
+        "CREATE TABLE IF NOT EXISTS Inventario (personagem_id INTEGER NOT NULL, item_id INTEGER NOT NULL, quantidade INTEGER DEFAULT 1, "
+        "FOREIGN KEY (personagem_id) REFERENCES Personagem (id) ON DELETE CASCADE, FOREIGN KEY (item_id) REFERENCES Item (id) ON DELETE CASCADE, "
+        "PRIMARY KEY (personagem_id, item_id))",
+        "CREATE TABLE IF NOT EXISTS Equipamento (personagem_id INTEGER NOT NULL, slot TEXT NOT NULL CHECK(slot IN ('Arma', 'Armadura', 'Escudo', 'Amuleto', 'Anel1', 'Anel2')), "
+        "item_id INTEGER, FOREIGN KEY (personagem_id) REFERENCES Personagem (id) ON DELETE CASCADE, FOREIGN KEY (item_id) REFERENCES Item (id) ON DELETE SET NULL, "
+        "PRIMARY KEY (personagem_id, slot))",
+        "CREATE TABLE IF NOT EXISTS MagiasPersonagem (personagem_id INTEGER NOT NULL, magia_id INTEGER NOT NULL, status TEXT CHECK(status IN ('Conhecida', 'Preparada')), "
+        "FOREIGN KEY (personagem_id) REFERENCES Personagem (id) ON DELETE CASCADE, FOREIGN KEY (magia_id) REFERENCES Magia (id) ON DELETE CASCADE, "
+        "PRIMARY KEY (personagem_id, magia_id))",
+    ): conn.execute(sql)
+
+def _colunas_de_mana(conn: sqlite3.Connection):
+    """Colunas que o db_manager lê mas que o esquema inicial não criava."""
+    _adicionar_coluna(conn, "Personagem", "pontos_mana_maximos", "INTEGER DEFAULT 0")
+    _adicionar_coluna(conn, "Personagem", "pontos_mana_atuais", "INTEGER DEFAULT 0")
+    _adicionar_coluna(conn, "Magia", "custo_mana", "INTEGER DEFAULT 10")
+
+def _personagens_salvos(conn: sqlite3.Connection):
+    """Marca os personagens gravados pelo character_repository (distintos dos modelos de classe)."""
+    conn.execute("CREATE TABLE IF NOT EXISTS PersonagemSalvo (personagem_id INTEGER PRIMARY KEY, modelo_id INTEGER, salvo_em REAL, "
+                 "FOREIGN KEY (personagem_id) REFERENCES Personagem (id) ON DELETE CASCADE)")
+
+def _indices(conn: sqlite3.Connection):
+    """
+    Índices das colunas de filtro e JOIN. Arma.item_id, Armadura.item_id, NPC.personagem_id e
+    Jogador.personagem_id são INTEGER PRIMARY KEY (o próprio rowid) e não precisam de índice;
+    Inventario, Equipamento e MagiasPersonagem já começam a chave primária por personagem_id.
+    """
+    for sql in (
+        "CREATE INDEX IF NOT EXISTS idx_item_tipo ON Item (tipo_item)",
+        "CREATE INDEX IF NOT EXISTS idx_npc_tipo ON NPC (tipo_npc)",
+        # get_class_template filtra por lower(classe_personagem): índice na mesma expressão
+        "CREATE INDEX IF NOT EXISTS idx_personagem_tipo_classe ON Personagem (tipo_personagem, lower(classe_personagem))",
+        "CREATE INDEX IF NOT EXISTS idx_personagem_salvo_data ON PersonagemSalvo (salvo_em)",
+    ): conn.execute(sql)
+
+def fts5_disponivel(conn: sqlite3.Connection) -> bool:
+    try: return bool(conn.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')").fetchone()[0])
+    except sqlite3.Error: return False
+
+# rowid do CatalogoBusca = (código do tipo << BITS_ID_BUSCA) | id da linha de origem. Cada tipo ocupa uma faixa
+# contínua de rowids, e o FTS5 restringe a busca a uma faixa pulando direto para ela nas listas de documentos.
+BITS_ID_BUSCA = 40
+CODIGOS_BUSCA = {"Arma": 1, "Armadura": 2, "Magia": 3, "Pocao": 4, "Outro": 5}
+
+def faixa_busca(tipo: str) -> tuple[int, int]:
+    """Primeiro e último rowid do CatalogoBusca reservados a `tipo` (tipo_item ou 'Magia')."""
+    codigo = CODIGOS_BUSCA[tipo]
+    return codigo << BITS_ID_BUSCA, ((codigo + 1) << BITS_ID_BUSCA) - 1
+
+def _rowid_item(linha: str) -> str:
+    """Expressão SQL do rowid do CatalogoBusca para a linha `linha` (new, old ou Item) da tabela Item."""
+    codigo = "CASE {0}.tipo_item " + " ".join(f"WHEN '{tipo}' THEN {codigo}" for tipo, codigo in CODIGOS_BUSCA.items() if tipo != "Magia") + " END"
+    return f"(({codigo.format(linha)}) << {BITS_ID_BUSCA}) | {linha}.id"
+
+def _rowid_magia(linha: str) -> str:
+    return f"({CODIGOS_BUSCA['Magia']} << {BITS_ID_BUSCA}) | {linha}.id"
+
+def _preencher_busca(conn: sqlite3.Connection):
+    """Reconstrói o conteúdo do CatalogoBusca a partir de Item e Magia e junta os segmentos do índice."""
+    for sql in (
+        "DELETE FROM CatalogoBusca",
+        f"INSERT INTO CatalogoBusca (rowid, nome, texto, escola) SELECT {_rowid_item('Item')}, nome, descricao, NULL FROM Item",
+        f"INSERT INTO CatalogoBusca (rowid, nome, texto, escola) SELECT {_rowid_magia('Magia')}, nome, descricao_efeito, escola_magia FROM Magia",
+        "INSERT INTO CatalogoBusca (CatalogoBusca) VALUES ('optimize')",
+    ): conn.execute(sql)
+
+def _busca_textual(conn: sqlite3.Connection):
+    """
+    Índice FTS5 CatalogoBusca sobre nome/descrição dos itens e nome/efeito/escola das magias, mantido pelos
+    gatilhos abaixo; o rowid codifica tipo e id (ver faixa_busca), então atualizar ou apagar uma linha é uma
+    busca pela chave. Sem acentos na comparação ("misseis" acha "Mísseis") e com índices de prefixo de 1 a 3
+    letras para a busca enquanto se digita (1 a 8 desde a migração 7). Sem FTS5 no SQLite, não cria nada
+    (o db_manager busca sem o índice).
+    """
+    if not fts5_disponivel(conn): return
+    inserir_item = f"INSERT INTO CatalogoBusca (rowid, nome, texto, escola) VALUES ({_rowid_item('new')}, new.nome, new.descricao, NULL)"
+    inserir_magia = f"INSERT INTO CatalogoBusca (rowid, nome, texto, escola) VALUES ({_rowid_magia('new')}, new.nome, new.descricao_efeito, new.escola_magia)"
+    apagar_item = f"DELETE FROM CatalogoBusca WHERE rowid = {_rowid_item('old')}"
+    apagar_magia = f"DELETE FROM CatalogoBusca WHERE rowid = {_rowid_magia('old')}"
+    for sql in (
+        "CREATE VIRTUAL TABLE IF NOT EXISTS CatalogoBusca USING fts5(nome, texto, escola, "
+        "tokenize = 'unicode61 remove_diacritics 2', prefix = '1 2 3')",
+        f"CREATE TRIGGER IF NOT EXISTS busca_item_insert AFTER INSERT ON Item BEGIN {inserir_item}; END",
+        f"CREATE TRIGGER IF NOT EXISTS busca_item_update AFTER UPDATE OF id, nome, descricao, tipo_item ON Item BEGIN {apagar_item}; {inserir_item}; END",
+        f"CREATE TRIGGER IF NOT EXISTS busca_item_delete AFTER DELETE ON Item BEGIN {apagar_item}; END",
+        f"CREATE TRIGGER IF NOT EXISTS busca_magia_insert AFTER INSERT ON Magia BEGIN {inserir_magia}; END",
+        f"CREATE TRIGGER IF NOT EXISTS busca_magia_update AFTER UPDATE OF id, nome, descricao_efeito, escola_magia ON Magia BEGIN {apagar_magia}; {inserir_magia}; END",
+        f"CREATE TRIGGER IF NOT EXISTS busca_magia_delete AFTER DELETE ON Magia BEGIN {apagar_magia}; END",
+    ): conn.execute(sql)
+    _preencher_busca(conn) # Conteúdo que já existia antes dos gatilhos
+
+def _prefixos_longos(conn: sqlite3.Connection):
+    """
+    Recria o CatalogoBusca com índices de prefixo de 1 a 8 letras. Um prefixo mais longo que o maior índice
+    ("raio"* com prefix='1 2 3') junta as listas de documentos de todos os termos que começam com ele, inteiras,
+    antes de aplicar a faixa de rowids e o LIMIT. Os gatilhos da migração 5 continuam valendo (usam só o nome da tabela).
+    """
+    if not conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'CatalogoBusca'").fetchone(): return
+    conn.execute("DROP TABLE CatalogoBusca")
+    conn.execute("CREATE VIRTUAL TABLE CatalogoBusca USING fts5(nome, texto, escola, "
+                 "tokenize = 'unicode61 remove_diacritics 2', prefix = '1 2 3 4 5 6 7 8')")
+    _preencher_busca(conn)
+
+# Tabelas do catálogo (somente leitura para o jogo) -> grupo da CatalogoVersao cujo contador elas incrementam.
+# Personagem só conta para os NPCs: gravar o personagem do jogador não invalida o cache do catálogo.
+VERSOES_CATALOGO = {"Item": "item", "Arma": "item", "Armadura": "item", "Magia": "magia", "NPC": "monstro", "Personagem": "monstro"}
+
+def _versoes_do_catalogo(conn: sqlite3.Connection):
+    """
+    Contador de alterações por grupo do catálogo (item, magia, monstro), incrementado por gatilhos em cada escrita,
+    de qualquer conexão ou processo. O db_manager.Catalog compara os contadores para saber o que recarregar.
+    """
+    conn.execute("CREATE TABLE IF NOT EXISTS CatalogoVersao (grupo TEXT PRIMARY KEY, versao INTEGER NOT NULL DEFAULT 0) WITHOUT ROWID")
+    conn.executemany("INSERT OR IGNORE INTO CatalogoVersao (grupo) VALUES (?)", [(g,) for g in sorted(set(VERSOES_CATALOGO.values()))])
+    for tabela, grupo in VERSOES_CATALOGO.items():
+        incrementar = f"UPDATE CatalogoVersao SET versao = versao + 1 WHERE grupo = '{grupo}'"
+        for evento, linha in (("INSERT", "new"), ("UPDATE", "new"), ("DELETE", "old")):
+            quando = f" WHEN {linha}.tipo_personagem = 'NPC'" if tabela == "Personagem" else ""
+            if tabela == "Personagem" and evento == "UPDATE": quando = " WHEN old.tipo_personagem = 'NPC' OR new.tipo_personagem = 'NPC'"
+            conn.execute(f"CREATE TRIGGER IF NOT EXISTS versao_{tabela.lower()}_{evento.lower()} AFTER {evento} ON {tabela}{quando} "
+                         f"BEGIN {incrementar}; END")
+
+# (versão, descrição, aplicar) em ordem crescente. Nunca altere uma migração já publicada: acrescente outra.
+MIGRACOES: list[tuple[int, str, Callable[[sqlite3.Connection], None]]] = [
+    (1, "esquema inicial", _esquema_inicial),
+    (2, "colunas de mana (Personagem.pontos_mana_*, Magia.custo_mana)", _colunas_de_mana),
+    (3, "tabela PersonagemSalvo", _personagens_salvos),
+    (4, "índices de filtro/JOIN", _indices),
+    (5, "busca textual (FTS5) no catálogo", _busca_textual),
+    (6, "contadores de alteração do catálogo (CatalogoVersao)", _versoes_do_catalogo),
+    (7, "índices de prefixo de 1 a 8 letras no CatalogoBusca", _prefixos_longos),
+]
+VERSAO_ESQUEMA = MIGRACOES[-1][0]
+
+def versao_atual(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+def migrar(conn: sqlite3.Connection, verbose: bool = False) -> int:
+    """
+    Aplica as migrações pendentes numa única transação (ou todas entram, ou nada muda) e
+    retorna a versão final. Um banco já atualizado custa só a leitura do user_version.
+    """
+    if versao_atual(conn) >= VERSAO_ESQUEMA: return versao_atual(conn)
+    isolamento = conn.isolation_level
+    conn.isolation_level = None # Controle manual da transação (DDL incluído)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        versao = versao_atual(conn) # Relida com a trava: outra conexão pode ter migrado antes
+        for numero, descricao, aplicar in MIGRACOES:
+            if numero <= versao: continue
+            if verbose: print(f"  migração {numero}: {descricao}")
+            aplicar(conn)
+            conn.execute(f"PRAGMA user_version = {numero}"); versao = numero
+        conn.execute("COMMIT")
+        return versao
+    except Exception:
+        if conn.in_transaction: conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.isolation_level = isolamento
+
+# --- Verificação dos planos de consulta ---
+
+# Consultas que leem uma tabela inteira de propósito (carga do catálogo, valores dos filtros da tela de seleção,
+# listagem de saves, o sqlite_master para saber se o índice de busca existe, os três contadores da CatalogoVersao)
+VARREDURAS_ESPERADAS = {"db_manager.SQL_ALL_SPELLS", "db_manager.SQL_WEAPON_FILTERS", "db_manager.SQL_ARMOR_FILTERS",
+                        "db_manager.SQL_SPELL_FILTERS", "db_manager.SQL_HAS_SEARCH_INDEX", "db_manager.SQL_CATALOG_VERSIONS",
+                        "character_repository.SQL_LISTAR"}
+
+def consultas_do_jogo() -> dict[str, str]:
+    """Todas as constantes SQL_* com uma instrução completa (sem DDL e fragmentos) do db_manager e do character_repository."""
+    import db_manager, character_repository
+    consultas = {}
+    for modulo in (db_manager, character_repository):
+        for nome, sql in vars(modulo).items():
+            if nome.startswith("SQL_") and isinstance(sql, str) and re.match(r"\s*(SELECT|INSERT|UPDATE|DELETE)\b", sql, re.I):
+                consultas[f"{modulo.__name__}.{nome}"] = sql
+    return consultas
+
+def planos_de_consulta(conn: sqlite3.Connection, consultas: dict[str, str] | None = None) -> dict[str, list[str]]:
+    """EXPLAIN QUERY PLAN de cada consulta (os parâmetros são preenchidos com NULL)."""
+    consultas = consultas_do_jogo() if consultas is None else consultas
+    if not fts5_disponivel(conn): consultas = {nome: sql for nome, sql in consultas.items() if "CatalogoBusca" not in sql}
+    return {nome: [linha[3] for linha in conn.execute(f"EXPLAIN QUERY PLAN {sql}", (None,) * sql.count("?"))]
+            for nome, sql in consultas.items()}
+
+def varreduras_completas(planos: dict[str, list[str]]) -> dict[str, list[str]]:
+    """
+    Passos "SCAN <tabela>" (leitura da tabela ou do índice inteiro) em cada plano. Varrer o json_each (a lista de ids passada
+    como parâmetro) não conta, nem a tabela virtual do FTS5 (o MATCH é resolvido pelo índice invertido), nem as consultas
+    de VARREDURAS_ESPERADAS.
+    """
+    encontradas = {}
+    for nome, passos in planos.items():
+        if nome in VARREDURAS_ESPERADAS: continue
+        varreduras = [p for p in passos if re.match(r"SCAN \w+", p) and "json_each" not in p and "VIRTUAL TABLE" not in p]
+        if varreduras: encontradas[nome] = varreduras
+    return encontradas
+
+def main():
+    db_file = sys.argv[1] if len(sys.argv) > 1 else DB_FILE
+    conn = sqlite3.connect(db_file)
+    try:
+        print(f"Banco '{db_file}' na versão {versao_atual(conn)} do esquema.")
+        print(f"Versão após as migrações: {migrar(conn, verbose=True)}")
+        planos = planos_de_consulta(conn)
+        for nome, passos in planos.items():
+            print(f"\n{nome}"); print("\n".join(f"  {passo}" for passo in passos))
+        varreduras = varreduras_completas(planos)
+        if varreduras:
+            print("\nVarreduras completas encontradas:")
+            for nome, passos in varreduras.items(): print(f"  {nome}: {'; '.join(passos)}")
+            sys.exit(1)
+        print(f"\nNenhuma varredura completa inesperada em {len(planos)} consultas.")
+    finally:
+        conn.close()
+
+if __name__ == '__main__':
+    main()
@@ -2,53 +2,229 @@
 
 import sqlite3
 import json
+import csv
+import os
+import sys
+import migrations
 
 DB_FILE = "rpg_database.db"
 
+# Pasta com os arquivos de conteúdo. Cada tipo pode vir em <nome>.json (lista de objetos)
+# ou <nome>.csv (cabeçalho com os mesmos campos).
+CATALOG_DIR = "catalogo"
+
+# Campos que guardam listas/dicionários (no CSV: texto JSON ou valores separados por ';')
+CAMPOS_JSON = {"propriedades", "componentes", "atributos", "proficiencias"}
+CAMPOS_BOOL = {"requer_destreza_bonus", "penalidade_furtividade", "requer_concentracao"}
+# Campos numéricos: convertidos já na leitura, para que um valor inválido ("12a") falhe a importação
+# em vez de ser gravado como TEXT (a afinidade da coluna aceitaria) e quebrar comparações depois
+CAMPOS_INT = {"nivel", "pontos_vida_maximos", "pontos_vida_atuais", "pontos_mana_maximos", "pontos_mana_atuais", "experiencia",
+              "valor_moedas", "bonus_ca_base", "max_bonus_destreza", "requisito_forca", "bonus_pv", "nivel_magia", "custo_mana"}
+CAMPOS_FLOAT = {"peso"}
+
 def create_connection(db_file):
     conn = None;
     try: conn = sqlite3.connect(db_file); return conn
     except sqlite3.Error as e: print(e)
     return conn
 
-def insert_item(conn, item_data):
-    sql = ''' INSERT INTO Item(nome, descricao, peso, valor_moedas, tipo_item) VALUES(?,?,?,?,?) '''
-    cur = conn.cursor(); cur.execute(sql, item_data); conn.commit(); return cur.lastrowid
+# --- Leitura dos arquivos de catálogo ---
+
+def _converter_campo(campo: str, valor):
+    """Normaliza um valor lido de CSV (sempre texto) para o tipo esperado pelo banco."""
+    if not isinstance(valor, str): return valor
+    valor = valor.strip()
+    if valor == "": return [] if campo in CAMPOS_JSON else None
+    if campo in CAMPOS_JSON:
+        try: return json.loads(valor)
+        except json.JSONDecodeError: return [parte.strip() for parte in valor.split(";") if parte.strip()]
+    if campo in CAMPOS_BOOL: return valor.lower() in ("1", "true", "sim", "verdadeiro")
+    try:
+        if campo in CAMPOS_INT: return int(valor)
+        if campo in CAMPOS_FLOAT: return float(valor)
+    except ValueError: raise ValueError(f"valor inválido para '{campo}': {valor!r}") from None
+    return valor
+
+def ler_registros(pasta: str, nome: str) -> list[dict]:
+    """Lê <pasta>/<nome>.json ou <pasta>/<nome>.csv. Retorna [] se nenhum dos dois existir."""
+    caminho_json = os.path.join(pasta, f"{nome}.json")
+    caminho_csv = os.path.join(pasta, f"{nome}.csv")
+    if os.path.exists(caminho_json):
+        with open(caminho_json, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    if os.path.exists(caminho_csv):
+        with open(caminho_csv, 'r', encoding='utf-8', newline='') as f:
+            leitor = csv.DictReader(f)
+            try: return [{campo: _converter_campo(campo, valor) for campo, valor in linha.items()} for linha in leitor]
+            except ValueError as e: raise ValueError(f"{caminho_csv}, linha {leitor.line_num}: {e}") from None
+    return []
+
+def _deduplicar(registros: list[dict]) -> list[dict]:
+    """Mantém apenas a última ocorrência de cada nome (a chave natural do upsert)."""
+    return list({r["nome"]: r for r in registros}.values())
+
+# --- Upserts em lote ---
+
+def _upsert_por_nome(conn, tabela: str, campo_tipo: str, tipo: str, colunas: list[str], registros: list[dict],
+                     filtro: str = "") -> list[int]:
+    """
+    Insere ou atualiza linhas de Item/Personagem identificadas por (nome, tipo).
+    Essas tabelas não têm restrição UNIQUE no nome, então os ids existentes são lidos uma vez
+    e os novos recebem ids explícitos; tudo vai para o banco em dois executemany.
+    Retorna os ids na mesma ordem de `registros`.
+    """
+    existentes = {nome: id_ for id_, nome in conn.execute(f"SELECT id, nome FROM {tabela} WHERE {campo_tipo} = ? {filtro}", (tipo,))}
+    proximo_id = conn.execute(f"SELECT COALESCE(MAX(id), 0) + 1 FROM {tabela}").fetchone()[0]
+    ids, inserir, atualizar = [], [], []
+    for r in registros:
+        valores = [r.get(c) for c in colunas]
+        if r["nome"] in existentes:
+            id_ = existentes[r["nome"]]; atualizar.append((*valores, id_))
+        else:
+            id_ = proximo_id; proximo_id += 1; inserir.append((id_, *valores, tipo))
+        ids.append(id_)
+    conn.executemany(f"INSERT INTO {tabela} (id, {', '.join(colunas)}, {campo_tipo}) VALUES ({', '.join('?' * (len(colunas) + 2))})", inserir)
+    conn.executemany(f"UPDATE {tabela} SET {', '.join(f'{c} = ?' for c in colunas)} WHERE id = ?", atualizar)
+    return ids
+
+def _upsert_filhos(conn, tabela: str, chave: str, colunas: list[str], linhas: list[tuple]):
+    """Upsert em tabelas cuja chave primária é o id do pai (Arma, Armadura, NPC, Jogador)."""
+    todas = [chave, *colunas]
+    conn.executemany(
+        f"INSERT INTO {tabela} ({', '.join(todas)}) VALUES ({', '.join('?' * len(todas))}) "
+        f"ON CONFLICT({chave}) DO UPDATE SET {', '.join(f'{c} = excluded.{c}' for c in colunas)}", linhas)
+
+COLUNAS_ITEM = ["nome", "descricao", "peso", "valor_moedas"]
+COLUNAS_ARMA = ["tipo_dano", "dado_dano", "propriedades", "alcance"]
+COLUNAS_ARMADURA = ["tipo_armadura", "bonus_ca_base", "requer_destreza_bonus", "max_bonus_destreza",
+                    "penalidade_furtividade", "requisito_forca", "bonus_pv"]
+COLUNAS_MAGIA = ["nome", "nivel_magia", "escola_magia", "tempo_conjuracao", "alcance_magia", "componentes",
+                 "duracao_magia", "descricao_efeito", "requer_concentracao", "custo_mana"]
+COLUNAS_PERSONAGEM = ["nome", "raca", "classe_personagem", "nivel", "pontos_vida_maximos", "pontos_vida_atuais",
+                      "pontos_mana_maximos", "pontos_mana_atuais", "atributos", "proficiencias"]
+
+def _serializar(registro: dict) -> dict:
+    return {c: json.dumps(v, ensure_ascii=False) if c in CAMPOS_JSON else v for c, v in registro.items()}
+
+def importar_armas(conn, registros: list[dict]) -> int:
+    registros = [_serializar(r) for r in _deduplicar(registros)]
+    ids = _upsert_por_nome(conn, "Item", "tipo_item", "Arma", COLUNAS_ITEM, registros)
+    _upsert_filhos(conn, "Arma", "item_id", COLUNAS_ARMA, [(id_, *(r.get(c) for c in COLUNAS_ARMA)) for id_, r in zip(ids, registros)])
+    return len(registros)
+
+def importar_armaduras(conn, registros: list[dict]) -> int:
+    registros = _deduplicar(registros)
+    ids = _upsert_por_nome(conn, "Item", "tipo_item", "Armadura", COLUNAS_ITEM, registros)
+    _upsert_filhos(conn, "Armadura", "item_id", COLUNAS_ARMADURA,
+                   [(id_, *(r.get(c, 0 if c == "bonus_pv" else None) for c in COLUNAS_ARMADURA)) for id_, r in zip(ids, registros)])
+    return len(registros)
+
+def importar_magias(conn, registros: list[dict]) -> int:
+    # Magia.nome já é UNIQUE no schema, então o upsert é direto
+    registros = [_serializar(r) for r in _deduplicar(registros)]
+    colunas = COLUNAS_MAGIA[1:]
+    conn.executemany(
+        f"INSERT INTO Magia ({', '.join(COLUNAS_MAGIA)}) VALUES ({', '.join('?' * len(COLUNAS_MAGIA))}) "
+        f"ON CONFLICT(nome) DO UPDATE SET {', '.join(f'{c} = excluded.{c}' for c in colunas)}",
+        [tuple(r.get(c) for c in COLUNAS_MAGIA) for r in registros])
+    return len(registros)
+
+def _preparar_personagens(registros: list[dict]) -> list[dict]:
+    preparados = []
+    for r in _deduplicar(registros):
+        r = dict(r)
+        r.setdefault("pontos_vida_atuais", r.get("pontos_vida_maximos"))
+        r.setdefault("pontos_mana_maximos", 0)
+        r.setdefault("pontos_mana_atuais", r["pontos_mana_maximos"])
+        preparados.append(_serializar(r))
+    return preparados
+
+def importar_npcs(conn, registros: list[dict]) -> int:
+    registros = _preparar_personagens(registros)
+    ids = _upsert_por_nome(conn, "Personagem", "tipo_personagem", "NPC", COLUNAS_PERSONAGEM, registros)
+    _upsert_filhos(conn, "NPC", "personagem_id", ["tipo_npc", "comportamento", "dialogo"],
+                   [(id_, r.get("tipo_npc", "Monstro"), r.get("comportamento"), r.get("dialogo")) for id_, r in zip(ids, registros)])
+    return len(registros)
+
+def importar_classes(conn, registros: list[dict]) -> int:
+    """Modelos de classe jogável (lidos por db_manager.get_class_template)."""
+    registros = _preparar_personagens(registros)
+    # Personagens salvos (tabela PersonagemSalvo) também são 'Jogador': nunca são confundidos com um modelo de mesmo nome
+    salvos = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'PersonagemSalvo'").fetchone()
+    filtro = "AND id NOT IN (SELECT personagem_id FROM PersonagemSalvo)" if salvos else ""
+    ids = _upsert_por_nome(conn, "Personagem", "tipo_personagem", "Jogador", COLUNAS_PERSONAGEM, registros, filtro)
+    _upsert_filhos(conn, "Jogador", "personagem_id", ["experiencia", "alinhamento", "nome_jogador"],
+                   [(id_, r.get("experiencia", 0), r.get("alinhamento"), r.get("nome_jogador")) for id_, r in zip(ids, registros)])
+    return len(registros)
+
+# Ordem de importação: nome do arquivo -> função
+IMPORTADORES = {
+    "armas": importar_armas,
+    "armaduras": importar_armaduras,
+    "magias": importar_magias,
+    "npcs": importar_npcs,
+    "classes": importar_classes,
+}
 
-def insert_arma(conn, arma_data):
-    sql = ''' INSERT INTO Arma(item_id, tipo_dano, dado_dano, propriedades, alcance) VALUES(?,?,?,?,?) '''
-    cur = conn.cursor(); arma_data_processed = list(arma_data); arma_data_processed[3] = json.dumps(arma_data_processed[3]); cur.execute(sql, tuple(arma_data_processed)); conn.commit()
+TABELAS_CATALOGO = ("Item", "Arma", "Armadura", "Magia", "Personagem", "NPC", "Jogador")
 
-def insert_armadura(conn, armadura_data):
-    # MODIFICADO: Adicionada a coluna bonus_pv
-    sql = ''' INSERT INTO Armadura(item_id, tipo_armadura, bonus_ca_base, requer_destreza_bonus, max_bonus_destreza, penalidade_furtividade, requisito_forca, bonus_pv) VALUES(?,?,?,?,?,?,?,?) '''
-    cur = conn.cursor(); cur.execute(sql, armadura_data); conn.commit()
+def _remover_indices(conn) -> list[str]:
+    """
+    Remove os índices secundários das tabelas do catálogo e retorna o SQL para recriá-los.
+    Índices UNIQUE e os automáticos (chaves primárias/UNIQUE inline) são mantidos,
+    pois garantem a integridade durante a carga.
+    """
+    marcadores = ", ".join("?" * len(TABELAS_CATALOGO))
+    indices = conn.execute(
+        f"SELECT name, sql FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL AND tbl_name IN ({marcadores})",
+        TABELAS_CATALOGO).fetchall()
+    recriar = []
+    for nome, sql in indices:
+        if sql.upper().startswith("CREATE UNIQUE"): continue
+        conn.execute(f'DROP INDEX "{nome}"'); recriar.append(sql)
+    return recriar
 
-# ... (outras funções de insert) ...
+def importar_catalogo(conn, pasta: str = CATALOG_DIR) -> dict[str, int]:
+    """
+    Importa todos os arquivos de `pasta` numa única transação: ou tudo entra, ou nada muda.
+    Pode ser executado várias vezes; registros já existentes (mesmo nome) são atualizados.
+    Retorna a quantidade de registros processados por arquivo.
+    """
+    isolamento = conn.isolation_level
+    conn.isolation_level = None # Controle manual da transação (DROP/CREATE INDEX incluídos)
+    try:
+        conn.execute("BEGIN")
+        indices = _remover_indices(conn)
+        contagem = {nome: importar(conn, ler_registros(pasta, nome)) for nome, importar in IMPORTADORES.items()}
+        for sql in indices: conn.execute(sql)
+        # O índice de busca (migração 5) foi atualizado linha a linha pelos gatilhos: junta os segmentos num só
+        if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'CatalogoBusca'").fetchone():
+            conn.execute("INSERT INTO CatalogoBusca (CatalogoBusca) VALUES ('optimize')")
+        conn.execute("COMMIT")
+        return contagem
+    except Exception:
+        if conn.in_transaction: conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.isolation_level = isolamento
 
 def main():
+    pasta = sys.argv[1] if len(sys.argv) > 1 else CATALOG_DIR
     conn = create_connection(DB_FILE)
     if conn is not None:
-        print("Populando banco de dados...")
-        
-        # Arma: Espada Longa
-        espada_longa_id = insert_item(conn, ("Espada Longa", "Uma espada versátil.", 1.4, 15, "Arma"))
-        insert_arma(conn, (espada_longa_id, "Cortante", "1d8", ["Versátil (1d10)"], "Corpo a corpo"))
-        
-        # Armadura: Corselete de Couro com bônus de vida
-        couro_id = insert_item(conn, ("Corselete de Couro", "Peitoral de couro endurecido.", 4.5, 10, "Armadura"))
-        insert_armadura(conn, (couro_id, "Leve", 11, True, None, False, 0, 2)) # +2 PV
-
-        # Armadura: Cota de Malha com bônus de vida
-        cota_malha_id = insert_item(conn, ("Cota de Malha", "Armadura de anéis metálicos.", 18.0, 50, "Armadura"))
-        insert_armadura(conn, (cota_malha_id, "Pesada", 16, False, None, True, 13, 5)) # +5 PV
-
-        # ... (código para inserir personagens, etc.)
-        
-        print("Banco de dados populado com sucesso!")
-        conn.close()
+        print(f"Populando banco de dados a partir de '{pasta}'...")
+        try:
+            migrations.migrar(conn) # Garante as tabelas/colunas que a importação usa
+            contagem = importar_catalogo(conn, pasta)
+            for nome, quantidade in contagem.items():
+                print(f"  {nome}: {quantidade} registro(s)")
+            print("Banco de dados populado com sucesso!")
+        except (sqlite3.Error, OSError, ValueError, KeyError) as e:
+            print(f"Erro ao importar o catálogo (nenhuma alteração foi gravada): {e}")
+        finally:
+            conn.close()
     else:
         print("Erro! Não foi possível criar a conexão com o banco de dados.")
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,82 @@
+# render_cache.py
+#
+# Caches de superfícies compartilhadas pelos sprites e telas (blocos sólidos e textos renderizados).
+
+import pygame
+from collections import OrderedDict
+
+_superficies: dict[tuple[tuple[int, int], tuple], pygame.Surface] = {}
+
+def get_surface(tamanho: tuple[int, int], cor: tuple) -> pygame.Surface:
+    """
+    Retorna uma superfície sólida de `tamanho` preenchida com `cor`, criada uma única vez e
+    compartilhada por todos os sprites que pedirem a mesma combinação. Quando já existe uma
+    janela, a superfície é convertida para o formato da tela (blit mais rápido).
+    Não desenhe sobre a superfície retornada: ela é compartilhada.
+    """
+    chave = (tuple(tamanho), tuple(cor))
+    superficie = _superficies.get(chave)
+    if superficie is None:
+        superficie = pygame.Surface(chave[0])
+        superficie.fill(cor)
+        if pygame.display.get_init() and pygame.display.get_surface() is not None:
+            superficie = superficie.convert()
+        _superficies[chave] = superficie
+    return superficie
+
+def clear_surfaces():
+    """Esvazia o cache (necessário se o modo de vídeo for recriado com outro formato de pixel)."""
+    _superficies.clear()
+
+class TextCache:
+    """
+    Cache LRU de textos renderizados, indexado por (fonte, texto, cor, antialias).
+    Textos que se repetem entre quadros (menus, rótulos, HUD) são renderizados uma vez só;
+    ao passar de `tamanho_maximo` entradas, a menos usada recentemente é descartada.
+    """
+    def __init__(self, tamanho_maximo: int = 512):
+        self.tamanho_maximo = tamanho_maximo
+        self._entradas: OrderedDict = OrderedDict()
+        self.hits = 0; self.misses = 0
+
+    def __len__(self) -> int: return len(self._entradas)
+
+    def render(self, fonte: pygame.font.Font, texto: str, cor: tuple, antialias: bool = True) -> pygame.Surface:
+        chave = (fonte, texto, tuple(cor), antialias)
+        superficie = self._entradas.get(chave)
+        if superficie is not None:
+            self.hits += 1; self._entradas.move_to_end(chave)
+            return superficie
+        self.misses += 1
+        superficie = fonte.render(texto, antialias, cor)
+        self._entradas[chave] = superficie
+        if len(self._entradas) > self.tamanho_maximo: self._entradas.popitem(last=False)
+        return superficie
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {"entradas": len(self._entradas), "hits": self.hits, "misses": self.misses,
+                "taxa_acerto": self.hits / total if total else 0.0}
+
+    def clear(self):
+        self._entradas.clear(); self.hits = 0; self.misses = 0
+
+text_cache = TextCache()
+
+class HudLabel:
+    """
+    Rótulo de HUD formatado a partir de valores (ex.: "PV: {} / {}"). O texto só é
+    reformatado e buscado no cache quando os valores, a fonte ou a cor mudam.
+    """
+    __slots__ = ("formato", "_chave", "_superficie", "cache")
+
+    def __init__(self, formato: str, cache: TextCache | None = None):
+        self.formato = formato; self.cache = cache if cache is not None else text_cache
+        self._chave = None; self._superficie = None
+
+    def surface(self, fonte: pygame.font.Font, cor: tuple, *valores) -> pygame.Surface:
+        chave = (fonte, cor, valores)
+        if chave != self._chave:
+            self._superficie = self.cache.render(fonte, self.formato.format(*valores), cor)
+            self._chave = chave
+        return self._superficie
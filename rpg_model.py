@@ -1,14 +1,47 @@
 # rpg_model.py
 
 import random
+import dice
 from abc import ABC, abstractmethod
-from typing import List, Dict, Optional, Any
+from array import array
+from collections.abc import MutableMapping
+from typing import List, Dict, Optional, Any, Iterable, Iterator, NamedTuple
 
 class Entidade(ABC):
+    # Todas as entidades usam __slots__: sem __dict__ por instância, o que reduz a memória
+    # e acelera o acesso aos atributos quando há centenas de NPCs/itens carregados.
+    __slots__ = ("id", "nome")
     def __init__(self, id_entidade: int, nome: str):
         self.id = id_entidade; self.nome = nome
 
-class Magia(Entidade):
+class Congelavel:
+    """
+    Conteúdo estático do catálogo (itens e magias): depois de `congelar()` a instância não aceita
+    mais atribuições, e as listas viram tuplas. Assim uma única instância por id pode ser
+    compartilhada por todos os personagens sem que um deles altere a dos outros.
+    As subclasses precisam declarar o slot `_congelado`.
+    """
+    __slots__ = ()
+    def __setattr__(self, nome: str, valor):
+        if getattr(self, "_congelado", False): raise AttributeError(f"{type(self).__name__} do catálogo é imutável")
+        object.__setattr__(self, nome, valor)
+    def __delattr__(self, nome: str):
+        if getattr(self, "_congelado", False): raise AttributeError(f"{type(self).__name__} do catálogo é imutável")
+        object.__delattr__(self, nome)
+    def __setstate__(self, estado):
+        # pickle (ex.: ProcessPoolExecutor do combat_sim) restaura os slots sem passar por __setattr__
+        dicionario, slots = estado if isinstance(estado, tuple) else (estado, None)
+        for nome, valor in {**(dicionario or {}), **(slots or {})}.items(): object.__setattr__(self, nome, valor)
+    def congelar(self):
+        for classe in type(self).__mro__:
+            for nome in getattr(classe, "__slots__", ()):
+                if isinstance(getattr(self, nome, None), list): object.__setattr__(self, nome, tuple(getattr(self, nome)))
+        object.__setattr__(self, "_congelado", True)
+        return self
+
+class Magia(Congelavel, Entidade):
+    __slots__ = ("nivel_magia", "escola_magia", "tempo_conjuracao", "alcance_magia", "componentes",
+                 "duracao_magia", "descricao_efeito", "requer_concentracao", "custo_mana", "_congelado")
     def __init__(self, id_entidade: int, nome: str, nivel_magia: int, escola_magia: str,
                  tempo_conjuracao: str, alcance_magia: str, componentes: List[str],
                  duracao_magia: str, descricao_efeito: str, requer_concentracao: bool,
@@ -20,7 +53,8 @@ class Magia(Entidade):
         self.descricao_efeito = descricao_efeito; self.requer_concentracao = requer_concentracao
         self.custo_mana = custo_mana
 
-class Item(Entidade):
+class Item(Congelavel, Entidade):
+    __slots__ = ("descricao", "peso", "valor_moedas", "_congelado")
     def __init__(self, id_entidade: int, nome: str, descricao: str, peso: float, valor_moedas: int):
         super().__init__(id_entidade, nome)
         self.descricao = descricao; self.peso = peso; self.valor_moedas = valor_moedas
@@ -28,20 +62,30 @@ class Item(Entidade):
     def ser_usado(self, usuario: 'Personagem'): pass
 
 class Arma(Item):
+    __slots__ = ("tipo_dano", "dado_dano", "propriedades", "alcance")
     def __init__(self, id_entidade: int, nome: str, descricao: str, peso: float, valor_moedas: int,
                  tipo_dano: str, dado_dano: str, propriedades: List[str], alcance: str):
         super().__init__(id_entidade, nome, descricao, peso, valor_moedas)
         self.tipo_dano = tipo_dano; self.dado_dano = dado_dano
         self.propriedades = propriedades; self.alcance = alcance
     def ser_usado(self, usuario: 'Personagem'):
-        usuario.equipamento['Arma'] = self
-    def calcular_dano_rolagem(self) -> int:
-        try:
-            num_dados, tipo_dado = map(int, self.dado_dano.lower().split('d'))
-            return sum(random.randint(1, tipo_dado) for _ in range(num_dados))
-        except: return 1
+        usuario.equipar('Arma', self)
+    @property
+    def usa_destreza(self) -> bool:
+        """Armas de distância e com Acuidade atacam com Destreza (Acuidade: o melhor entre Força e Destreza)."""
+        return "Distância" in self.alcance or any(p.startswith("Acuidade") for p in self.propriedades)
+    def calcular_dano_rolagem(self, vantagem: bool = False) -> int:
+        try: return max(1, dice.compilar(self.dado_dano).rolar(vantagem))
+        except (ValueError, TypeError): return 1
+    def rolar(self, n: int, vantagem: bool = False):
+        """Rola `n` danos de uma vez (numpy.ndarray se o NumPy estiver instalado, senão list[int])."""
+        try: resultado = dice.compilar(self.dado_dano).rolar_lote(n, vantagem)
+        except (ValueError, TypeError): return [1] * n
+        return resultado.clip(min=1) if dice.np is not None else [max(1, r) for r in resultado]
 
 class Armadura(Item):
+    __slots__ = ("tipo_armadura", "bonus_ca_base", "requer_destreza_bonus", "max_bonus_destreza",
+                 "penalidade_furtividade", "requisito_forca", "bonus_pv")
     def __init__(self, id_entidade: int, nome: str, descricao: str, peso: float, valor_moedas: int,
                  tipo_armadura: str, bonus_ca_base: int, requer_destreza_bonus: bool,
                  max_bonus_destreza: Optional[int], penalidade_furtividade: bool, requisito_forca: int,
@@ -52,36 +96,239 @@ class Armadura(Item):
         self.penalidade_furtividade = penalidade_furtividade; self.requisito_forca = requisito_forca
         self.bonus_pv = bonus_pv
     def ser_usado(self, usuario: 'Personagem'):
-        armadura_antiga = usuario.equipamento.get('Armadura')
-        if isinstance(armadura_antiga, Armadura): usuario.pontos_vida_maximos -= armadura_antiga.bonus_pv
-        usuario.equipamento['Armadura'] = self
-        usuario.pontos_vida_maximos += self.bonus_pv
-        usuario.pontos_vida_atuais = min(usuario.pontos_vida_atuais, usuario.pontos_vida_maximos)
-        usuario.calcular_classe_armadura()
+        usuario.equipar('Armadura', self) # CA e PV máximos são recalculados a partir do equipamento
+    def classe_armadura_com(self, modificador_destreza: int) -> int:
+        if not self.requer_destreza_bonus: return self.bonus_ca_base
+        if self.max_bonus_destreza is not None: modificador_destreza = min(modificador_destreza, self.max_bonus_destreza)
+        return self.bonus_ca_base + modificador_destreza
+
+# --- Estatísticas derivadas ---
+
+def modificador_atributo(valor: int) -> int:
+    return (valor - 10) // 2
+
+def bonus_proficiencia(nivel: int) -> int:
+    return 2 + (max(nivel, 1) - 1) // 4
+
+# XP total necessária para chegar a cada nível (índice 0 = nível 1), tabela do D&D 5e
+XP_POR_NIVEL = (0, 300, 900, 2700, 6500, 14000, 23000, 34000, 48000, 64000,
+                85000, 100000, 120000, 140000, 165000, 195000, 225000, 265000, 305000, 355000)
+
+# --- Coleções indexadas por id (inventário e grimório) ---
+
+class ColecaoPorId:
+    """
+    Coleção ordenada de entidades indexada pelo id. Pertinência, contagem e remoção custam O(1):
+    repetições do mesmo id viram uma quantidade, e a iteração devolve cada objeto `quantidade`
+    vezes, na ordem em que o id entrou. Guarda só referências às instâncias compartilhadas do catálogo.
+    Aceita as operações de lista usadas pelo jogo (append, extend, remove, pop, [i], len, +).
+    """
+    __slots__ = ("_objetos", "_quantidades", "_total")
+
+    def __init__(self, entidades: Iterable = ()):
+        self._objetos: Dict[Any, Entidade] = {}; self._quantidades: Dict[Any, int] = {}; self._total = 0
+        for entidade in entidades: self.adicionar(entidade)
+
+    def adicionar(self, entidade: Entidade, quantidade: int = 1):
+        if quantidade <= 0: return
+        chave = entidade.id
+        if chave not in self._objetos: self._objetos[chave] = entidade; self._quantidades[chave] = 0
+        self._quantidades[chave] += quantidade; self._total += quantidade
+
+    def remover(self, entidade: Entidade, quantidade: int = 1):
+        """Remove `quantidade` unidades (ValueError se a entidade não estiver na coleção)."""
+        chave = getattr(entidade, "id", None)
+        restante = self._quantidades.get(chave)
+        if restante is None: raise ValueError(f"{entidade!r} não está na coleção")
+        quantidade = min(quantidade, restante); self._total -= quantidade
+        if restante > quantidade: self._quantidades[chave] = restante - quantidade
+        else: del self._quantidades[chave]; del self._objetos[chave]
+
+    def append(self, entidade: Entidade): self.adicionar(entidade)
+    def remove(self, entidade: Entidade): self.remover(entidade)
+    def extend(self, entidades: Iterable):
+        for entidade in entidades: self.adicionar(entidade)
+    def __iadd__(self, entidades: Iterable) -> 'ColecaoPorId':
+        self.extend(entidades); return self
+    def pop(self, indice: int = -1) -> Entidade:
+        entidade = self[indice]; self.remover(entidade); return entidade
+    def clear(self):
+        self._objetos.clear(); self._quantidades.clear(); self._total = 0
+    def copy(self) -> 'ColecaoPorId':
+        copia = ColecaoPorId()
+        copia._objetos = dict(self._objetos); copia._quantidades = dict(self._quantidades); copia._total = self._total
+        return copia
+
+    def get(self, id_entidade) -> Optional[Entidade]: return self._objetos.get(id_entidade)
+    def quantidade(self, entidade: Entidade) -> int: return self._quantidades.get(getattr(entidade, "id", None), 0)
+    count = quantidade
+    def quantidades(self) -> Dict[Any, int]:
+        """{id: quantidade}, na ordem da coleção (cópia)."""
+        return dict(self._quantidades)
+    def unicos(self) -> List[Entidade]:
+        """Cada entidade uma vez só, na ordem da coleção."""
+        return list(self._objetos.values())
+
+    def __contains__(self, entidade) -> bool: return getattr(entidade, "id", None) in self._objetos
+    def __len__(self) -> int: return self._total
+    def __iter__(self) -> Iterator[Entidade]:
+        quantidades = self._quantidades
+        for chave, entidade in self._objetos.items():
+            for _ in range(quantidades[chave]): yield entidade
+    def __getitem__(self, indice):
+        if isinstance(indice, slice): return list(self)[indice]
+        if indice < 0: indice += self._total
+        if not 0 <= indice < self._total: raise IndexError("índice fora da coleção")
+        for chave, entidade in self._objetos.items():
+            indice -= self._quantidades[chave]
+            if indice < 0: return entidade
+    def __add__(self, outros: Iterable) -> list: return list(self) + list(outros)
+    def __radd__(self, outros: Iterable) -> list: return list(outros) + list(self)
+    def __eq__(self, outro) -> bool:
+        if isinstance(outro, ColecaoPorId): return self._quantidades == outro._quantidades
+        if isinstance(outro, (list, tuple)): return list(self) == list(outro)
+        return NotImplemented
+    __hash__ = None
+    def __repr__(self) -> str: return f"ColecaoPorId({[getattr(e, 'nome', e) for e in self]!r})"
+
+def _colecao(slot: str) -> property:
+    """Propriedade para uma ColecaoPorId criada só no primeiro acesso (NPCs sem itens não pagam nada)."""
+    def ler(self) -> ColecaoPorId:
+        colecao = getattr(self, slot)
+        if colecao is None: colecao = ColecaoPorId(); setattr(self, slot, colecao)
+        return colecao
+    def escrever(self, entidades: Iterable):
+        setattr(self, slot, entidades if isinstance(entidades, ColecaoPorId) else ColecaoPorId(entidades))
+    return property(ler, escrever)
+
+class Estatisticas(NamedTuple):
+    """Valores derivados de um personagem, calculados por Personagem.estatisticas."""
+    classe_armadura: int
+    pontos_vida_maximos: int
+    pontos_mana_maximos: int
+    bonus_ataque: int
 
 class Personagem(Entidade):
+    # pontos_vida_maximos, pontos_mana_maximos, classe_armadura e bonus_ataque são derivados dos valores
+    # base, dos atributos, do equipamento, do nível e dos modificadores. O resultado fica em cache
+    # (`_estatisticas`) e só é refeito depois de equipar(), mudar o nível ou os modificadores.
+    __slots__ = ("raca", "classe_personagem", "_nivel", "_pv_base", "pontos_vida_atuais",
+                 "_pm_base", "pontos_mana_atuais", "atributos", "proficiencias",
+                 "_inventario", "_magias", "equipamento", "modificadores", "_estatisticas")
+    # Inventário e grimório indexados pelo id (ver ColecaoPorId); atribuir uma lista converte
+    inventario = _colecao("_inventario")
+    magias = _colecao("_magias")
     def __init__(self, id_entidade: int, nome: str, raca: str, classe_personagem: str, nivel: int,
                  pontos_vida_maximos: int, atributos: Dict[str, int], proficiencias: List[str],
                  pontos_mana_maximos: int = 0):
         super().__init__(id_entidade, nome)
+        self._estatisticas: Optional[Estatisticas] = None
+        self.modificadores: Optional[Dict[str, Dict[str, int]]] = None # Criado no primeiro modificador
         self.raca = raca; self.classe_personagem = classe_personagem; self.nivel = nivel
         self.pontos_vida_maximos = pontos_vida_maximos; self.pontos_vida_atuais = pontos_vida_maximos
         self.pontos_mana_maximos = pontos_mana_maximos; self.pontos_mana_atuais = pontos_mana_maximos
         self.atributos = atributos; self.proficiencias = proficiencias
-        self.inventario: List[Item] = []; self.magias: List[Magia] = []
+        self._inventario: Optional[ColecaoPorId] = None; self._magias: Optional[ColecaoPorId] = None
         self.equipamento: Dict[str, Optional[Item]] = {"Arma": None, "Armadura": None}
-        self.calcular_classe_armadura()
 
-    def calcular_classe_armadura(self): self.classe_armadura = 10 # Simplificado
+    # --- Estatísticas derivadas (com cache) ---
+
+    def invalidar_estatisticas(self):
+        """Descarta o cache. Chame depois de alterar `atributos` ou `equipamento` diretamente."""
+        self._estatisticas = None
+
+    def _calcular_estatisticas(self) -> Estatisticas:
+        atributos = self.atributos
+        mod_forca = modificador_atributo(atributos.get("Força", 10))
+        mod_destreza = modificador_atributo(atributos.get("Destreza", 10))
+        bonus = {"ca": 0, "pv_max": 0, "pm_max": 0, "ataque": 0}
+        for efeitos in (self.modificadores or {}).values():
+            for estatistica, valor in efeitos.items(): bonus[estatistica] = bonus.get(estatistica, 0) + valor
+        armadura = self.equipamento.get("Armadura"); arma = self.equipamento.get("Arma")
+        if isinstance(armadura, Armadura):
+            ca = armadura.classe_armadura_com(mod_destreza); pv_armadura = armadura.bonus_pv
+        else:
+            ca = 10 + mod_destreza; pv_armadura = 0
+        if isinstance(arma, Arma) and arma.usa_destreza:
+            mod_ataque = max(mod_forca, mod_destreza) if "Distância" not in arma.alcance else mod_destreza
+        else:
+            mod_ataque = mod_forca
+        self._estatisticas = Estatisticas(
+            classe_armadura=ca + bonus["ca"],
+            pontos_vida_maximos=max(1, self._pv_base + pv_armadura + bonus["pv_max"]),
+            pontos_mana_maximos=max(0, self._pm_base + bonus["pm_max"]),
+            bonus_ataque=bonus_proficiencia(self._nivel) + mod_ataque + bonus["ataque"],
+        )
+        return self._estatisticas
+
+    @property
+    def estatisticas(self) -> Estatisticas:
+        return self._estatisticas or self._calcular_estatisticas()
+
+    @property
+    def classe_armadura(self) -> int: return (self._estatisticas or self._calcular_estatisticas()).classe_armadura
+    @property
+    def bonus_ataque(self) -> int: return (self._estatisticas or self._calcular_estatisticas()).bonus_ataque
+
+    @property
+    def pontos_vida_maximos(self) -> int: return (self._estatisticas or self._calcular_estatisticas()).pontos_vida_maximos
+    @pontos_vida_maximos.setter
+    def pontos_vida_maximos(self, valor: int):
+        """Define os PV máximos BASE (sem armadura e modificadores)."""
+        self._pv_base = valor; self._estatisticas = None
+
+    @property
+    def pontos_mana_maximos(self) -> int: return (self._estatisticas or self._calcular_estatisticas()).pontos_mana_maximos
+    @pontos_mana_maximos.setter
+    def pontos_mana_maximos(self, valor: int):
+        """Define os PM máximos BASE (sem modificadores)."""
+        self._pm_base = valor; self._estatisticas = None
+
+    @property
+    def pontos_vida_base(self) -> int: return self._pv_base
+    @property
+    def pontos_mana_base(self) -> int: return self._pm_base
+
+    @property
+    def nivel(self) -> int: return self._nivel
+    @nivel.setter
+    def nivel(self, valor: int):
+        self._nivel = valor; self._estatisticas = None
+
+    def calcular_classe_armadura(self) -> int:
+        self._estatisticas = None
+        return self.classe_armadura
+
+    def equipar(self, slot: str, item: Optional[Item]):
+        self.equipamento[slot] = item; self._estatisticas = None
+        self.pontos_vida_atuais = min(self.pontos_vida_atuais, self.pontos_vida_maximos)
+        self.pontos_mana_atuais = min(self.pontos_mana_atuais, self.pontos_mana_maximos)
+
+    def aplicar_modificador(self, origem: str, **bonus: int):
+        """Aplica (ou substitui) os bônus de `origem`, ex.: aplicar_modificador("Bênção", ataque=1, ca=2).
+        Estatísticas aceitas: ca, pv_max, pm_max, ataque."""
+        if self.modificadores is None: self.modificadores = {}
+        self.modificadores[origem] = bonus; self._estatisticas = None
+
+    def remover_modificador(self, origem: str):
+        if self.modificadores and self.modificadores.pop(origem, None) is not None:
+            self._estatisticas = None
+            self.pontos_vida_atuais = min(self.pontos_vida_atuais, self.pontos_vida_maximos)
+            self.pontos_mana_atuais = min(self.pontos_mana_atuais, self.pontos_mana_maximos)
+
+    def resolver_ataque(self, alvo: 'Personagem') -> Optional[int]:
+        """Rola o ataque contra `alvo` e aplica o dano. Retorna o dano rolado (mesmo que passe dos PV do alvo) ou None se errou."""
+        rolagem_ataque = random.randint(1, 20) + (self._estatisticas or self._calcular_estatisticas()).bonus_ataque
+        if rolagem_ataque < alvo.classe_armadura: return None
+        arma = self.equipamento.get('Arma')
+        dano = arma.calcular_dano_rolagem() if isinstance(arma, Arma) else 1
+        alvo.receber_dano(dano)
+        return dano
 
     def atacar(self, alvo: 'Personagem') -> str:
-        rolagem_ataque = random.randint(1, 20)
-        if rolagem_ataque >= alvo.classe_armadura:
-            arma = self.equipamento.get('Arma')
-            dano = arma.calcular_dano_rolagem() if isinstance(arma, Arma) else 1
-            alvo.receber_dano(dano)
-            return f"{self.nome} acertou e causou {dano} de dano!"
-        return f"{self.nome} errou o ataque."
+        dano = self.resolver_ataque(alvo)
+        if dano is None: return f"{self.nome} errou o ataque."
+        return f"{self.nome} acertou e causou {dano} de dano!"
 
     def receber_dano(self, quantidade: int):
         self.pontos_vida_atuais -= quantidade
@@ -99,17 +346,144 @@ class Personagem(Entidade):
         self.pontos_mana_atuais -= custo
 
 class Jogador(Personagem):
+    __slots__ = ("experiencia", "alinhamento", "nome_jogador", "save_id", "personagem_id", "_magias_preparadas")
+    magias_preparadas = _colecao("_magias_preparadas")
     def __init__(self, id_entidade: int, nome: str, raca: str, classe_personagem: str, nivel: int,
                  pontos_vida_maximos: int, atributos: Dict[str, int], proficiencias: List[str],
                  experiencia: int, alinhamento: str, nome_jogador: str, pontos_mana_maximos: int = 0):
         super().__init__(id_entidade, nome, raca, classe_personagem, nivel, pontos_vida_maximos, atributos, proficiencias, pontos_mana_maximos)
         self.experiencia = experiencia; self.alinhamento = alinhamento; self.nome_jogador = nome_jogador
+        self.save_id: Optional[int] = None
+        self.personagem_id: Optional[int] = None # Linha do personagem no banco (character_repository)
+        self._magias_preparadas: Optional[ColecaoPorId] = None
     def aprender_magia(self, magia: Magia):
         if magia not in self.magias: self.magias.append(magia)
 
+    def preparar_magia(self, magia: Magia):
+        """Marca uma magia conhecida como preparada (aprende a magia se ainda não conhecia)."""
+        self.aprender_magia(magia)
+        if magia not in self.magias_preparadas: self.magias_preparadas.append(magia)
+
+    def ganhar_experiencia(self, quantidade: int) -> bool:
+        """Soma `quantidade` de XP e sobe de nível quantas vezes couber. Retorna True se subiu."""
+        self.experiencia += quantidade
+        subiu = False
+        while self.nivel < len(XP_POR_NIVEL) and self.experiencia >= XP_POR_NIVEL[self.nivel]:
+            self.subir_nivel(); subiu = True
+        return subiu
+
+    def subir_nivel(self):
+        """Um nível a mais: PV (e PM, para conjuradores) base crescem e os atuais acompanham."""
+        self.nivel += 1
+        ganho_pv = max(1, 5 + modificador_atributo(self.atributos.get("Constituição", 10)))
+        self.pontos_vida_maximos = self._pv_base + ganho_pv; self.pontos_vida_atuais += ganho_pv
+        if self._pm_base > 0:
+            ganho_pm = 5 + max(0, modificador_atributo(self.atributos.get("Inteligência", 10)))
+            self.pontos_mana_maximos = self._pm_base + ganho_pm; self.pontos_mana_atuais += ganho_pm
+
 class NPC(Personagem):
+    __slots__ = ("tipo", "comportamento", "dialogo")
     def __init__(self, id_entidade: int, nome: str, raca: str, classe_personagem: str, nivel: int,
                  pontos_vida_maximos: int, atributos: Dict[str, int], proficiencias: List[str],
                  tipo: str, comportamento: str, dialogo: Optional[Any] = None, pontos_mana_maximos: int = 0):
         super().__init__(id_entidade, nome, raca, classe_personagem, nivel, pontos_vida_maximos, atributos, proficiencias, pontos_mana_maximos)
-        self.tipo = tipo; self.comportamento = comportamento; self.dialogo = dialogo
\ No newline at end of file
+        self.tipo = tipo; self.comportamento = comportamento; self.dialogo = dialogo
+
+# --- Armazenamento compacto de NPCs ---
+
+ATRIBUTOS_PADRAO = ("Força", "Destreza", "Constituição", "Inteligência", "Sabedoria", "Carisma")
+
+class NPCPool:
+    """
+    Guarda PV e PM atuais e os atributos de muitos NPCs em arrays contíguos (um array por coluna),
+    em vez de um objeto completo com dicionário de atributos para cada um.
+    `adicionar` devolve um NPCDoPool, que continua sendo um NPC: receber_dano, atacar, etc.
+    funcionam normalmente, mas leem e escrevem direto nos arrays. CA e PV/PM máximos não são
+    colunas: dependem de equipamento e modificadores e vêm das Estatisticas de cada NPC.
+    """
+    COLUNAS = ("pv", "pm")
+
+    def __init__(self, atributos: tuple[str, ...] = ATRIBUTOS_PADRAO):
+        self.nomes_atributos = atributos
+        self._indice_atributo = {nome: i for i, nome in enumerate(atributos)}
+        self.pv = array('i'); self.pm = array('i')
+        # Atributos de todos os NPCs em um único array: NPC i ocupa [i*k, (i+1)*k)
+        self.atributos = array('i')
+        self._livres: list[int] = []
+        self._npcs: list[Optional['NPCDoPool']] = []
+
+    def __len__(self) -> int: return len(self._npcs) - len(self._livres)
+
+    def __iter__(self) -> Iterator['NPCDoPool']:
+        return (npc for npc in self._npcs if npc is not None)
+
+    def adicionar(self, npc: 'NPC') -> 'NPCDoPool':
+        """Copia os dados de `npc` para o pool e retorna o NPC equivalente armazenado nele."""
+        k = len(self.nomes_atributos)
+        valores_atributos = [int(npc.atributos.get(nome, 10)) for nome in self.nomes_atributos]
+        if self._livres:
+            indice = self._livres.pop()
+            self.pv[indice] = npc.pontos_vida_atuais; self.pm[indice] = npc.pontos_mana_atuais
+            self.atributos[indice * k:(indice + 1) * k] = array('i', valores_atributos)
+        else:
+            indice = len(self._npcs)
+            self.pv.append(npc.pontos_vida_atuais); self.pm.append(npc.pontos_mana_atuais)
+            self.atributos.extend(valores_atributos)
+            self._npcs.append(None)
+        npc_do_pool = NPCDoPool(self, indice, npc)
+        self._npcs[indice] = npc_do_pool
+        return npc_do_pool
+
+    def remover(self, npc: 'NPCDoPool'):
+        """Libera a posição do NPC para ser reaproveitada. O objeto removido não deve mais ser usado."""
+        if self._npcs[npc._indice] is npc:
+            self._npcs[npc._indice] = None; self._livres.append(npc._indice)
+
+class _AtributosDoPool(MutableMapping):
+    """Visão tipo dicionário dos atributos de um NPC guardados no NPCPool."""
+    __slots__ = ("_pool", "_base")
+
+    def __init__(self, pool: NPCPool, indice: int):
+        self._pool = pool; self._base = indice * len(pool.nomes_atributos)
+    def __getitem__(self, nome: str) -> int:
+        return self._pool.atributos[self._base + self._pool._indice_atributo[nome]]
+    def __setitem__(self, nome: str, valor: int):
+        self._pool.atributos[self._base + self._pool._indice_atributo[nome]] = valor
+    def __delitem__(self, nome: str): raise TypeError("Atributos do NPCPool não podem ser removidos")
+    def __iter__(self): return iter(self._pool.nomes_atributos)
+    def __len__(self) -> int: return len(self._pool.nomes_atributos)
+
+def _coluna_do_pool(coluna: str) -> property:
+    def ler(self): return getattr(self._pool, coluna)[self._indice]
+    def escrever(self, valor): getattr(self._pool, coluna)[self._indice] = valor
+    return property(ler, escrever)
+
+class NPCDoPool(NPC):
+    """
+    NPC cujos PV/PM atuais e atributos vivem nos arrays de um NPCPool (ver NPCPool.adicionar).
+    CA, PV/PM máximos e bônus de ataque continuam sendo as propriedades derivadas de Personagem.
+    """
+    __slots__ = ("_pool", "_indice")
+    pontos_vida_atuais = _coluna_do_pool("pv")
+    pontos_mana_atuais = _coluna_do_pool("pm")
+
+    def __init__(self, pool: NPCPool, indice: int, origem: NPC):
+        # Não chama NPC.__init__: os valores numéricos já estão no pool
+        self._pool = pool; self._indice = indice
+        self._estatisticas = None; self.modificadores = dict(origem.modificadores) if origem.modificadores else None
+        self._pv_base = origem.pontos_vida_base; self._pm_base = origem.pontos_mana_base
+        self.id = origem.id; self.nome = origem.nome; self.raca = origem.raca
+        self.classe_personagem = origem.classe_personagem; self.nivel = origem.nivel
+        self.proficiencias = origem.proficiencias
+        self._inventario = origem._inventario.copy() if origem._inventario else None
+        self._magias = origem._magias.copy() if origem._magias else None
+        self.equipamento = dict(origem.equipamento)
+        self.tipo = origem.tipo; self.comportamento = origem.comportamento; self.dialogo = origem.dialogo
+
+    @property
+    def atributos(self) -> _AtributosDoPool: return _AtributosDoPool(self._pool, self._indice)
+    @atributos.setter
+    def atributos(self, valores: Dict[str, int]):
+        visao = _AtributosDoPool(self._pool, self._indice)
+        for nome, valor in valores.items(): visao[nome] = valor
+        self._estatisticas = None
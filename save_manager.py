@@ -1,102 +1,296 @@
 # save_manager.py
+#
+# Formato de save (versão 2): o estado completo do Jogador (PV/PM, experiência, nível, atributos,
+# modificadores, inventário, equipamento e magias). Itens e magias são gravados só pelo id do
+# catálogo e reconstruídos a partir do db_manager.catalog ao carregar.
+# O arquivo é JSON compacto (.json) ou JSON comprimido com gzip (.json.gz) e é sempre gravado
+# de forma atômica: arquivo temporário + fsync + rename, então uma queda no meio da gravação
+# deixa o save anterior intacto. Saves antigos (sem "versao") continuam sendo carregados.
+#
+# Um índice (saves/.index.json) guarda os metadados de cada save (nome, classe, nível, data,
+# tamanho e checksum) e é atualizado por save_game; list_saved_games lê só o índice e o
+# reconstrói a partir dos arquivos se ele não existir.
 
+import gzip
+import hashlib
 import json
 import os
+import tempfile
+import threading
 import time
-from rpg_model import Jogador, Arma, Magia
-# O save_manager pode precisar do db_manager para carregar itens/magias no futuro
-# from db_manager import get_weapon_by_id 
+from rpg_model import Jogador, Item, Arma, Armadura, Magia
+from db_manager import catalog
 
 SAVES_DIR = "saves"
+SAVE_FORMAT_VERSION = 2
+EXTENSAO_JSON, EXTENSAO_GZIP = ".json", ".json.gz"
+SAVE_INDEX_FILE = ".index.json" # Começa com ponto: nunca é confundido com um save
+SAVE_INDEX_VERSION = 1
+_GZIP_MAGICO = b"\x1f\x8b"
+
+# Tipo do item -> nome usado pelo catálogo
+_TIPOS_CATALOGO = ((Arma, "weapon"), (Armadura, "armor"), (Magia, "spell"))
 
 def ensure_saves_dir_exists():
     """Garante que o diretório de saves exista."""
     if not os.path.exists(SAVES_DIR):
         os.makedirs(SAVES_DIR)
 
-def save_game(player: Jogador):
-    """
-    Salva o estado atual do jogador em um arquivo JSON.
-    Se for a primeira vez, cria um novo arquivo; senão, sobrescreve o existente.
-    """
-    ensure_saves_dir_exists()
-    
-    # Gera um ID para o save se o personagem ainda não tiver um
-    if not hasattr(player, 'save_id') or not player.save_id:
-        player.save_id = int(time.time())
+# --- Serialização ---
+
+def _referencia(item: Item | Magia | None) -> list | None:
+    """[tipo no catálogo, id] de um item/magia, ou None se não for um objeto do catálogo."""
+    if item is None: return None
+    for classe, kind in _TIPOS_CATALOGO:
+        if isinstance(item, classe): return [kind, item.id]
+    return None
 
-    save_filename = f"save_{player.save_id}.json"
-    filepath = os.path.join(SAVES_DIR, save_filename)
+def _resolver(referencia: list | None):
+    if not referencia: return None
+    kind, id_entidade = referencia
+    objeto = catalog.get(kind, id_entidade)
+    if objeto is None: print(f"Aviso: {kind} {id_entidade} não existe mais no catálogo e foi ignorado.")
+    return objeto
 
-    # Coleta os dados do personagem para salvar
-    player_state = {
+def snapshot_player(player: Jogador) -> dict:
+    """
+    Cópia rasa e barata do estado do jogador (as coleções/dicionários são copiados, os itens do
+    catálogo são compartilhados). Feita na thread do jogo; `finalize_state` termina a conversão
+    para o formato serializável, e pode rodar em outra thread.
+    """
+    return {
+        "versao": SAVE_FORMAT_VERSION,
         "save_id": player.save_id,
+        "salvo_em": time.time(),
+        "id_entidade": player.id,
         "nome": player.nome,
         "raca": player.raca,
         "classe_personagem": player.classe_personagem,
         "nivel": player.nivel,
-        "pontos_vida_maximos": player.pontos_vida_maximos,
+        "experiencia": player.experiencia,
+        "alinhamento": player.alinhamento,
+        "nome_jogador": player.nome_jogador,
+        "pontos_vida_base": player.pontos_vida_base,
         "pontos_vida_atuais": player.pontos_vida_atuais,
-        "atributos": player.atributos,
-        "proficiencias": player.proficiencias
-        # Adicionar aqui outros dados para salvar, como inventário, etc.
+        "pontos_mana_base": player.pontos_mana_base,
+        "pontos_mana_atuais": player.pontos_mana_atuais,
+        "atributos": dict(player.atributos),
+        "proficiencias": list(player.proficiencias),
+        "modificadores": {origem: dict(bonus) for origem, bonus in (player.modificadores or {}).items()},
+        "inventario": player.inventario.copy(),
+        "equipamento": dict(player.equipamento),
+        "magias": player.magias.copy(),
+        "magias_preparadas": player.magias_preparadas.copy(),
+        "personagem_id": player.personagem_id,
     }
 
+def finalize_state(snapshot: dict) -> dict:
+    """Troca os objetos de um snapshot_player pelas referências [tipo, id] do catálogo."""
+    estado = dict(snapshot)
+    estado["inventario"] = [r for r in (_referencia(item) for item in snapshot["inventario"]) if r is not None]
+    estado["equipamento"] = {slot: _referencia(item) for slot, item in snapshot["equipamento"].items()}
+    estado["magias"] = [magia.id for magia in snapshot["magias"]]
+    estado["magias_preparadas"] = [magia.id for magia in snapshot["magias_preparadas"]]
+    return estado
+
+def player_to_state(player: Jogador) -> dict:
+    """Estado completo do jogador como um dicionário serializável (formato versão 2)."""
+    return finalize_state(snapshot_player(player))
+
+def state_to_player(data: dict) -> Jogador:
+    """Reconstrói o Jogador a partir de um estado (versão 2 ou o formato antigo, sem "versao")."""
+    if data.get("versao", 1) < 2:
+        player = Jogador(
+            id_entidade=data.get("id_entidade", 1), nome=data["nome"], raca=data["raca"],
+            classe_personagem=data["classe_personagem"], nivel=data["nivel"],
+            pontos_vida_maximos=data["pontos_vida_maximos"], atributos=data["atributos"],
+            proficiencias=data["proficiencias"], experiencia=data.get("experiencia", 0),
+            alinhamento=data.get("alinhamento", "Neutro"), nome_jogador=data.get("nome_jogador", "Jogador"))
+        player.pontos_vida_atuais = data["pontos_vida_atuais"]
+        player.save_id = data.get("save_id")
+        return player
+    if data["versao"] > SAVE_FORMAT_VERSION:
+        raise ValueError(f"Save na versão {data['versao']}, mais nova que a suportada ({SAVE_FORMAT_VERSION}).")
+
+    player = Jogador(
+        id_entidade=data["id_entidade"], nome=data["nome"], raca=data["raca"],
+        classe_personagem=data["classe_personagem"], nivel=data["nivel"],
+        pontos_vida_maximos=data["pontos_vida_base"], atributos=data["atributos"],
+        proficiencias=data["proficiencias"], experiencia=data["experiencia"],
+        alinhamento=data["alinhamento"], nome_jogador=data["nome_jogador"],
+        pontos_mana_maximos=data["pontos_mana_base"])
+    for origem, bonus in data.get("modificadores", {}).items(): player.aplicar_modificador(origem, **bonus)
+    player.inventario = [item for item in map(_resolver, data["inventario"]) if item is not None]
+    for slot, referencia in data["equipamento"].items(): player.equipar(slot, _resolver(referencia))
+    player.magias = [magia for magia in (_resolver(["spell", i]) for i in data["magias"]) if magia is not None]
+    player.magias_preparadas = [magia for magia in (_resolver(["spell", i]) for i in data.get("magias_preparadas", ())) if magia is not None]
+    # Por último: equipar limita os PV/PM atuais aos máximos de cada momento
+    player.pontos_vida_atuais = data["pontos_vida_atuais"]; player.pontos_mana_atuais = data["pontos_mana_atuais"]
+    player.save_id = data.get("save_id"); player.personagem_id = data.get("personagem_id")
+    return player
+
+def encode_state(state: dict, compactar: bool = False) -> bytes:
+    dados = json.dumps(state, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return gzip.compress(dados, compresslevel=6, mtime=0) if compactar else dados
+
+def decode_state(dados: bytes) -> dict:
+    """Aceita JSON puro (compacto ou indentado, de qualquer versão) ou JSON comprimido com gzip."""
+    if dados[:2] == _GZIP_MAGICO: dados = gzip.decompress(dados)
+    return json.loads(dados.decode("utf-8"))
+
+# --- Arquivos ---
+
+def write_atomic(filepath: str, dados: bytes):
+    """
+    Grava `dados` em `filepath` sem nunca deixar um arquivo pela metade: escreve num temporário
+    no mesmo diretório, força a gravação em disco (fsync) e só então o renomeia por cima do destino.
+    """
+    diretorio = os.path.dirname(os.path.abspath(filepath))
+    fd, temporario = tempfile.mkstemp(dir=diretorio, prefix=".tmp_", suffix=".save")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(dados); f.flush(); os.fsync(f.fileno())
+        os.replace(temporario, filepath)
+    except BaseException:
+        try: os.remove(temporario)
+        except OSError: pass
+        raise
+    try: # Garante que o rename em si também chegue ao disco (não suportado em todos os sistemas)
+        fd_dir = os.open(diretorio, os.O_RDONLY)
+        try: os.fsync(fd_dir)
+        finally: os.close(fd_dir)
+    except OSError:
+        pass
+
+def save_path(save_id: int, compactar: bool = False) -> str:
+    return os.path.join(SAVES_DIR, f"save_{save_id}{EXTENSAO_GZIP if compactar else EXTENSAO_JSON}")
+
+def save_game(player: Jogador, compactar: bool = False) -> bool:
+    """
+    Salva o estado completo do jogador. Se for a primeira vez, cria um novo save; senão, substitui
+    o existente de forma atômica. Com `compactar`, grava JSON comprimido (.json.gz).
+    """
+    assign_save_id(player)
     try:
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(player_state, f, indent=4, ensure_ascii=False)
+        filepath = write_state(player_to_state(player), compactar)
         print(f"Jogo salvo com sucesso em {filepath}")
         return True
     except Exception as e:
         print(f"Erro ao salvar o jogo: {e}")
         return False
 
+def assign_save_id(player: Jogador) -> int:
+    """Gera um ID para o save se o personagem ainda não tiver um."""
+    if not player.save_id:
+        player.save_id = int(time.time())
+    return player.save_id
+
+def write_state(estado: dict, compactar: bool = False) -> str:
+    """Codifica e grava (de forma atômica) um estado de `player_to_state`, atualiza o índice e retorna o caminho."""
+    ensure_saves_dir_exists()
+    filepath = save_path(estado["save_id"], compactar)
+    dados = encode_state(estado, compactar)
+    write_atomic(filepath, dados)
+    # Se o save mudou de codificação, remove a versão na codificação antiga
+    antigo = save_path(estado["save_id"], not compactar)
+    if os.path.exists(antigo): os.remove(antigo)
+    _atualizar_indice({os.path.basename(filepath): _entrada_indice(estado, dados, estado["salvo_em"]),
+                       os.path.basename(antigo): None})
+    return filepath
+
+def read_save(filepath: str) -> dict:
+    with open(filepath, 'rb') as f:
+        return decode_state(f.read())
+
+# --- Índice de saves ---
+
+_indice_lock = threading.Lock() # Protege o ler-modificar-gravar do índice
+
+def _eh_save(filename: str) -> bool:
+    return filename.endswith((EXTENSAO_JSON, EXTENSAO_GZIP)) and not filename.startswith(".")
+
+def _entrada_indice(data: dict, dados: bytes, salvo_em: float) -> dict:
+    return {
+        "char_name": data.get("nome", "Desconhecido"),
+        "level": data.get("nivel", "?"),
+        "class": data.get("classe_personagem", "N/A"),
+        "timestamp": salvo_em,
+        "size": len(dados),
+        "sha256": hashlib.sha256(dados).hexdigest(),
+    }
+
+def _entrada_do_arquivo(filename: str) -> dict | None:
+    """Lê um save do disco só para montar a sua entrada no índice (None se estiver ilegível)."""
+    filepath = os.path.join(SAVES_DIR, filename)
+    try:
+        with open(filepath, 'rb') as f: dados = f.read()
+        data = decode_state(dados)
+        return _entrada_indice(data, dados, data.get("salvo_em") or os.path.getmtime(filepath))
+    except Exception:
+        return None
+
+def _ler_indice() -> dict | None:
+    try:
+        with open(os.path.join(SAVES_DIR, SAVE_INDEX_FILE), 'r', encoding='utf-8') as f:
+            indice = json.load(f)
+        return indice["saves"] if indice.get("versao") == SAVE_INDEX_VERSION else None
+    except (OSError, ValueError, KeyError, AttributeError):
+        return None # Ausente ou corrompido: será reconstruído
+
+def _gravar_indice(entradas: dict):
+    dados = json.dumps({"versao": SAVE_INDEX_VERSION, "saves": entradas}, ensure_ascii=False, separators=(",", ":"))
+    write_atomic(os.path.join(SAVES_DIR, SAVE_INDEX_FILE), dados.encode("utf-8"))
+
+def rebuild_save_index() -> dict:
+    """Relê todos os saves do diretório e regrava o índice do zero."""
+    ensure_saves_dir_exists()
+    with _indice_lock:
+        entradas = {}
+        for filename in os.listdir(SAVES_DIR):
+            if _eh_save(filename):
+                entrada = _entrada_do_arquivo(filename)
+                if entrada is not None: entradas[filename] = entrada
+        _gravar_indice(entradas)
+        return entradas
+
+def _atualizar_indice(mudancas: dict[str, dict | None]):
+    """Aplica `mudancas` ({arquivo: entrada, ou None para remover}) ao índice e o regrava."""
+    with _indice_lock:
+        entradas = _ler_indice()
+        if entradas is None: entradas = {}
+        for filename, entrada in mudancas.items():
+            if entrada is None: entradas.pop(filename, None)
+            else: entradas[filename] = entrada
+        _gravar_indice(entradas)
+
 def list_saved_games() -> list[dict]:
-    """Lista todos os jogos salvos no diretório 'saves'."""
+    """
+    Lista os jogos salvos a partir do índice, do mais recente para o mais antigo. Só os nomes dos
+    arquivos são consultados no disco: saves que surgiram ou sumiram por fora do save_game são
+    acrescentados/removidos do índice, e só esses novos arquivos são abertos.
+    """
     ensure_saves_dir_exists()
-    saved_games = []
-    for filename in os.listdir(SAVES_DIR):
-        if filename.endswith(".json"):
-            filepath = os.path.join(SAVES_DIR, filename)
-            try:
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    saved_games.append({
-                        "char_name": data.get("nome", "Desconhecido"),
-                        "level": data.get("nivel", "?"),
-                        "class": data.get("classe_personagem", "N/A"),
-                        "filepath": filepath
-                    })
-            except Exception:
-                continue
+    entradas = _ler_indice()
+    if entradas is None: entradas = rebuild_save_index()
+    else:
+        arquivos = {filename for filename in os.listdir(SAVES_DIR) if _eh_save(filename)}
+        mudancas = {filename: None for filename in entradas.keys() - arquivos}
+        for filename in arquivos - entradas.keys():
+            entrada = _entrada_do_arquivo(filename)
+            if entrada is not None: mudancas[filename] = entrada
+        if mudancas:
+            _atualizar_indice(mudancas)
+            entradas = {f: e for f, e in {**entradas, **mudancas}.items() if e is not None}
+    saved_games = [dict(entrada, filepath=os.path.join(SAVES_DIR, filename)) for filename, entrada in entradas.items()]
+    saved_games.sort(key=lambda s: s["timestamp"], reverse=True)
     return saved_games
 
 def load_game(filepath: str) -> Jogador | None:
-    """Carrega um personagem a partir de um arquivo de save."""
+    """Carrega um personagem a partir de um arquivo de save (qualquer versão/codificação)."""
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-
-        # Recriando o objeto Jogador com os dados básicos
-        loaded_player = Jogador(
-            id_entidade=1,
-            nome=data["nome"],
-            raca=data["raca"],
-            classe_personagem=data["classe_personagem"],
-            nivel=data["nivel"],
-            pontos_vida_maximos=data["pontos_vida_maximos"],
-            atributos=data["atributos"],
-            proficiencias=data["proficiencias"],
-            experiencia=data.get("experiencia", 0),
-            alinhamento=data.get("alinhamento", "Neutro"),
-            nome_jogador=data.get("nome_jogador", "Jogador")
-        )
-        loaded_player.pontos_vida_atuais = data["pontos_vida_atuais"]
-        if hasattr(loaded_player, 'save_id'):
-            loaded_player.save_id = data.get("save_id")
-
-        print(f"Jogo {data['nome']} carregado.")
+        loaded_player = state_to_player(read_save(filepath))
+        print(f"Jogo {loaded_player.nome} carregado.")
         return loaded_player
     except Exception as e:
         print(f"Falha ao carregar o save: {e}")
-        return None
\ No newline at end of file
+        return None
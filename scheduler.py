@@ -0,0 +1,70 @@
+# scheduler.py
+#
+# Agendador de eventos por tempo (heap de prazos) para regeneração, mensagens, efeitos etc.
+# Em vez de cada sistema comparar o relógio a cada quadro, os timers ficam ordenados pelo
+# prazo e `advance` só olha o topo do heap: um quadro em que nada vence custa uma comparação.
+# O relógio é o da simulação (milissegundos), avançado por quem chama `advance`.
+
+import heapq
+import itertools
+from typing import Any, Callable
+
+class Timer:
+    """Timer agendado. Guarde-o para poder cancelar com `Scheduler.cancel(timer)`."""
+    __slots__ = ("prazo", "intervalo", "callback", "args", "ativo", "_ordem")
+
+    def __init__(self, prazo: float, intervalo: float | None, callback: Callable, args: tuple, ordem: int):
+        self.prazo = prazo; self.intervalo = intervalo; self.callback = callback; self.args = args
+        self.ativo = True; self._ordem = ordem
+
+    def __lt__(self, outro: 'Timer') -> bool:
+        return (self.prazo, self._ordem) < (outro.prazo, outro._ordem)
+
+class Scheduler:
+    def __init__(self, agora: float = 0.0):
+        self.agora = agora
+        self._fila: list[Timer] = []
+        self._ordem = itertools.count() # Desempata timers com o mesmo prazo na ordem de agendamento
+        self._cancelados = 0
+
+    def __len__(self) -> int: return len(self._fila) - self._cancelados
+
+    def schedule(self, delay: float, callback: Callable, *args: Any) -> Timer:
+        """Chama `callback(*args)` daqui a `delay` ms (de simulação)."""
+        timer = Timer(self.agora + delay, None, callback, args, next(self._ordem))
+        heapq.heappush(self._fila, timer)
+        return timer
+
+    def schedule_repeating(self, interval: float, callback: Callable, *args: Any, delay: float | None = None) -> Timer:
+        """Chama `callback(*args)` a cada `interval` ms, a primeira vez depois de `delay` (padrão: `interval`)."""
+        if interval <= 0: raise ValueError("O intervalo de um timer repetido precisa ser positivo.")
+        timer = Timer(self.agora + (interval if delay is None else delay), interval, callback, args, next(self._ordem))
+        heapq.heappush(self._fila, timer)
+        return timer
+
+    def cancel(self, timer: Timer | None):
+        """Cancela o timer (ignorado se for None ou já tiver disparado). A remoção do heap é preguiçosa."""
+        if timer is None or not timer.ativo: return
+        timer.ativo = False; self._cancelados += 1
+        if self._cancelados > 64 and self._cancelados > len(self._fila) // 2:
+            self._fila = [t for t in self._fila if t.ativo]; heapq.heapify(self._fila); self._cancelados = 0
+
+    def advance(self, dt: float) -> int:
+        """
+        Avança o relógio `dt` ms e dispara, em ordem de prazo, todos os timers vencidos.
+        Um timer repetido que venceu várias vezes no intervalo dispara uma vez por vencimento.
+        Retorna quantos callbacks foram chamados.
+        """
+        self.agora += dt
+        fila = self._fila; disparados = 0
+        while fila and fila[0].prazo <= self.agora:
+            timer = heapq.heappop(fila)
+            if not timer.ativo: self._cancelados -= 1; continue
+            if timer.intervalo is None: timer.ativo = False
+            else: timer.prazo += timer.intervalo; heapq.heappush(fila, timer)
+            timer.callback(*timer.args); disparados += 1
+        return disparados
+
+    def clear(self):
+        for timer in self._fila: timer.ativo = False
+        self._fila.clear(); self._cancelados = 0
@@ -0,0 +1,106 @@
+# spatial_hash.py
+#
+# Grade uniforme para consultas espaciais (colisão, alcance, vizinhança).
+# Cada objeto registrado ocupa as células cobertas pelo seu retângulo; uma consulta só
+# examina os objetos das células tocadas, em vez de comparar todos contra todos.
+# Não depende do pygame: funciona com qualquer objeto que tenha `.rect` com
+# left/top/right/bottom/centerx/centery e colliderect (ex.: pygame.Rect).
+
+import math
+from typing import Any, Iterable, Iterator
+
+class SpatialHash:
+    def __init__(self, tamanho_celula: int = 64):
+        self.tamanho_celula = tamanho_celula
+        self._celulas: dict[tuple[int, int], set] = {}
+        self._celulas_do_objeto: dict[Any, tuple[tuple[int, int], ...]] = {}
+
+    def __len__(self) -> int: return len(self._celulas_do_objeto)
+    def __contains__(self, obj) -> bool: return obj in self._celulas_do_objeto
+    def __iter__(self) -> Iterator: return iter(self._celulas_do_objeto)
+
+    def _faixa(self, left: float, top: float, right: float, bottom: float) -> tuple[tuple[int, int], ...]:
+        c = self.tamanho_celula
+        x0, x1 = int(left // c), int((right - 1) // c)
+        y0, y1 = int(top // c), int((bottom - 1) // c)
+        return tuple((x, y) for x in range(x0, max(x0, x1) + 1) for y in range(y0, max(y0, y1) + 1))
+
+    def _celulas_de(self, rect) -> tuple[tuple[int, int], ...]:
+        return self._faixa(rect.left, rect.top, rect.right, rect.bottom)
+
+    def inserir(self, obj):
+        """Registra `obj` (que precisa ter `.rect`). Inserir de novo equivale a `atualizar`."""
+        if obj in self._celulas_do_objeto: self.atualizar(obj); return
+        celulas = self._celulas_de(obj.rect)
+        for celula in celulas: self._celulas.setdefault(celula, set()).add(obj)
+        self._celulas_do_objeto[obj] = celulas
+
+    def remover(self, obj):
+        celulas = self._celulas_do_objeto.pop(obj, None)
+        if celulas is None: return
+        for celula in celulas:
+            ocupantes = self._celulas.get(celula)
+            if ocupantes is not None:
+                ocupantes.discard(obj)
+                if not ocupantes: del self._celulas[celula]
+
+    def atualizar(self, obj):
+        """Recalcula as células de `obj` depois que ele se moveu (não faz nada se não mudou de célula)."""
+        antigas = self._celulas_do_objeto.get(obj)
+        if antigas is None: self.inserir(obj); return
+        novas = self._celulas_de(obj.rect)
+        if novas == antigas: return
+        self.remover(obj)
+        for celula in novas: self._celulas.setdefault(celula, set()).add(obj)
+        self._celulas_do_objeto[obj] = novas
+
+    def atualizar_todos(self, objetos: Iterable):
+        for obj in objetos: self.atualizar(obj)
+
+    def limpar(self):
+        self._celulas.clear(); self._celulas_do_objeto.clear()
+
+    def _candidatos(self, celulas: Iterable[tuple[int, int]]) -> set:
+        encontrados = set()
+        for celula in celulas:
+            ocupantes = self._celulas.get(celula)
+            if ocupantes: encontrados |= ocupantes
+        return encontrados
+
+    def colisoes(self, rect) -> list:
+        """Objetos cujo retângulo colide com `rect`."""
+        c = self.tamanho_celula
+        x0, y0 = int(rect.left // c), int(rect.top // c)
+        if x0 == int((rect.right - 1) // c) and y0 == int((rect.bottom - 1) // c):
+            # Caso comum (projéteis pequenos): o retângulo cabe numa só célula
+            ocupantes = self._celulas.get((x0, y0))
+            if not ocupantes: return []
+            return [obj for obj in ocupantes if obj.rect.colliderect(rect)]
+        return [obj for obj in self._candidatos(self._celulas_de(rect)) if obj.rect.colliderect(rect)]
+
+    def no_raio(self, centro: tuple[float, float], raio: float) -> list:
+        """Objetos cujo centro está a no máximo `raio` de `centro`, do mais próximo ao mais distante."""
+        cx, cy = centro
+        candidatos = self._candidatos(self._faixa(cx - raio, cy - raio, cx + raio + 1, cy + raio + 1))
+        resultado = []
+        for obj in candidatos:
+            distancia = math.hypot(obj.rect.centerx - cx, obj.rect.centery - cy)
+            if distancia <= raio: resultado.append((distancia, id(obj), obj))
+        resultado.sort()
+        return [obj for _, _, obj in resultado]
+
+    def mais_proximo(self, centro: tuple[float, float], raio: float):
+        proximos = self.no_raio(centro, raio)
+        return proximos[0] if proximos else None
+
+    def pares_proximos(self, distancia: float) -> Iterator[tuple[Any, Any]]:
+        """
+        Pares de objetos cujos centros estão a menos de `distancia` um do outro; cada par aparece uma vez.
+        Cada objeto só é comparado com os das células ao redor do seu centro.
+        Não mova objetos durante a iteração (use list(...) antes de alterar a grade).
+        """
+        for a in self._celulas_do_objeto:
+            ax, ay = a.rect.centerx, a.rect.centery
+            for b in self._candidatos(self._faixa(ax - distancia, ay - distancia, ax + distancia + 1, ay + distancia + 1)):
+                if id(b) <= id(a): continue
+                if math.hypot(ax - b.rect.centerx, ay - b.rect.centery) < distancia: yield a, b
@@ -0,0 +1,142 @@
+# virtual_list.py
+#
+# Lista virtualizada para as telas de seleção: os itens vêm do banco em páginas (paginação por
+# chave, ver db_manager.get_catalog_page) à medida que o jogador desce a lista, a página seguinte
+# é buscada numa thread antes de ser necessária, e só as linhas visíveis são desenhadas.
+# Com um texto de busca, a lista passa a mostrar os resultados mais relevantes da busca textual
+# (db_manager.search_catalog), buscados na mesma thread a cada tecla.
+
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Callable
+
+import pygame
+
+import db_manager
+from render_cache import text_cache
+
+PAGE_SIZE = 20 # Itens por consulta
+PREFETCH_MARGIN = 10 # Busca a próxima página quando a seleção chega a esta distância do fim do que já foi lido
+SEARCH_LIMIT = 20 # Resultados mostrados de uma busca textual (os mais relevantes; mais do que cabe na tela)
+
+# Uma única thread de busca para o processo inteiro, compartilhada por todas as telas de seleção: ela mantém
+# uma só conexão do pool do db_manager (uma thread nova por tela abriria, configuraria e deixaria para trás uma conexão a cada tela)
+_executor: ThreadPoolExecutor | None = None
+
+def _executor_compartilhado() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None: _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="catalogo")
+    return _executor
+
+class CatalogPager:
+    """
+    Itens de um tipo do catálogo ("weapon", "armor", "spell") carregados sob demanda, página a página.
+    `itens` só cresce até `filtrar` ser chamado; `atualizar()` (chamado a cada volta do laço da tela)
+    incorpora a página que a thread terminou de buscar e diz se a lista mudou.
+    Com `busca` (ver `filtrar`), a lista é o resultado da busca textual, numa única "página" ordenada por relevância.
+    """
+    def __init__(self, kind: str, tamanho_pagina: int = PAGE_SIZE,
+                 buscar: Callable[..., list] = db_manager.get_catalog_page,
+                 pesquisar: Callable[..., list] = db_manager.search_catalog):
+        self.kind = kind; self.tamanho_pagina = tamanho_pagina; self._buscar = buscar; self._pesquisar = pesquisar
+        self.itens: list = []; self.filtros: dict[str, Any] = {}
+        self.busca = "" # Texto da busca textual; vazio = navegação em ordem de id
+        self.esgotado = False # A última página veio incompleta: não há mais nada no banco
+        self._executor = _executor_compartilhado()
+        self._futuro: Future | None = None
+        self.paginas = 0 # Páginas incorporadas desde o último filtro (estatística)
+
+    @property
+    def carregando(self) -> bool: return self._futuro is not None
+
+    def filtrar(self, busca: str = "", **filtros):
+        """Troca o texto de busca e os filtros (tipo, nivel, custo_max; None = todos) e recomeça do primeiro item."""
+        self.busca = busca.strip()
+        self.filtros = {chave: valor for chave, valor in filtros.items() if valor is not None}
+        self.itens = []; self.esgotado = False; self.paginas = 0
+        self._descartar() # Uma busca em andamento com os filtros antigos é descartada ao terminar
+        self.prefetch()
+
+    def prefetch(self):
+        """Agenda a busca da próxima página, se ainda houver itens e nenhuma busca estiver pendente."""
+        if self.esgotado or self._futuro is not None: return
+        if self.busca:
+            self._futuro = self._executor.submit(self._pesquisar, self.busca, (self.kind,), SEARCH_LIMIT, **self.filtros)
+            return
+        depois_id = self.itens[-1].id if self.itens else 0
+        self._futuro = self._executor.submit(self._buscar, self.kind, depois_id, self.tamanho_pagina, **self.filtros)
+
+    def garantir(self, indice: int, margem: int = PREFETCH_MARGIN):
+        """Pede a próxima página se `indice` estiver a menos de `margem` itens do fim do que já foi lido."""
+        if indice + margem >= len(self.itens): self.prefetch()
+
+    def atualizar(self, timeout: float | None = 0) -> bool:
+        """Incorpora a página buscada, se já estiver pronta (ou esperando até `timeout` segundos; None = sem limite)."""
+        futuro = self._futuro
+        if futuro is None: return False
+        if timeout == 0 and not futuro.done(): return False
+        try: pagina = futuro.result(timeout)
+        except FutureTimeoutError: return False # Antes do Python 3.11 não é o TimeoutError embutido
+        if futuro is not self._futuro: return False # Os filtros mudaram enquanto esperávamos
+        self._futuro = None
+        self.itens.extend(pagina); self.paginas += 1
+        self.esgotado = bool(self.busca) or len(pagina) < self.tamanho_pagina
+        return True
+
+    def _descartar(self):
+        # Cancela a busca pendente se ainda não começou (digitar rápido não enfileira buscas obsoletas)
+        if self._futuro is not None: self._futuro.cancel()
+        self._futuro = None
+
+    def fechar(self):
+        """Descarta a busca pendente. A thread (e a sua conexão) continua disponível para a próxima tela."""
+        self._descartar()
+
+class VirtualList:
+    """
+    Lista rolável desenhada em `rect`: mantém a seleção e a primeira linha visível e desenha só as
+    `linhas_visiveis` linhas a partir dela. `formatar(item)` gera o texto de cada linha.
+    """
+    def __init__(self, pager: CatalogPager, rect: pygame.Rect, altura_linha: int = 40,
+                 formatar: Callable[[Any], str] = str):
+        self.pager = pager; self.rect = pygame.Rect(rect); self.altura_linha = altura_linha; self.formatar = formatar
+        self.selecionado = 0; self.primeiro = 0
+
+    @property
+    def linhas_visiveis(self) -> int: return max(1, self.rect.height // self.altura_linha)
+
+    @property
+    def item_selecionado(self):
+        itens = self.pager.itens
+        return itens[self.selecionado] if 0 <= self.selecionado < len(itens) else None
+
+    def reiniciar(self):
+        self.selecionado = 0; self.primeiro = 0
+
+    def mover(self, delta: int):
+        """
+        Move a seleção `delta` linhas. Um passo de uma linha além da ponta dá a volta, mas só quando a lista
+        inteira já foi lida (senão o "último" item ainda não é conhecido); saltos maiores param na ponta.
+        Descer perto do fim do que já foi lido pede a próxima página.
+        """
+        total = len(self.pager.itens)
+        if total == 0: return
+        destino = self.selecionado + delta
+        volta = abs(delta) == 1 and self.pager.esgotado
+        if destino >= total: destino = 0 if volta and self.selecionado == total - 1 else total - 1
+        elif destino < 0: destino = total - 1 if volta and self.selecionado == 0 else 0
+        self.selecionado = destino
+        if self.selecionado < self.primeiro: self.primeiro = self.selecionado
+        elif self.selecionado >= self.primeiro + self.linhas_visiveis: self.primeiro = self.selecionado - self.linhas_visiveis + 1
+        self.pager.garantir(self.selecionado + self.linhas_visiveis)
+
+    def desenhar(self, surface: pygame.Surface, fonte: pygame.font.Font, cor: tuple, cor_selecao: tuple):
+        itens = self.pager.itens
+        for linha, indice in enumerate(range(self.primeiro, min(len(itens), self.primeiro + self.linhas_visiveis))):
+            texto = text_cache.render(fonte, self.formatar(itens[indice]), cor_selecao if indice == self.selecionado else cor)
+            surface.blit(texto, (self.rect.left, self.rect.top + linha * self.altura_linha))
+        # Indicadores de rolagem: há linhas acima ou abaixo da janela visível (ou ainda no banco)
+        if self.primeiro > 0:
+            surface.blit(text_cache.render(fonte, "...", cor), (self.rect.left, self.rect.top - self.altura_linha // 2 - 10))
+        if self.primeiro + self.linhas_visiveis < len(itens) or not self.pager.esgotado:
+            rotulo = "carregando..." if self.pager.carregando and self.primeiro + self.linhas_visiveis >= len(itens) else "..."
+            surface.blit(text_cache.render(fonte, rotulo, cor), (self.rect.left, self.rect.top + self.linhas_visiveis * self.altura_linha))